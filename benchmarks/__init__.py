@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"Performance benchmarks for the cost model; run with `python -m benchmarks.run`"
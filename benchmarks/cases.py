@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Benchmark cases for the cost model hot paths
+
+Each case is a setup function, registered with `benchmark`, that prepares its inputs
+and returns the zero-argument callable to be timed. Setup time is not measured.
+"""
+
+import numpy as np
+from car_cost_calculator.calibration import calibrate
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.compound_interest import compound_interest
+from car_cost_calculator.depreciation import FlatRate, TwoStageRate, calculate
+from car_cost_calculator.energy_costs import TimeOfUseTariff
+from car_cost_calculator.financing import yearly_interest
+from car_cost_calculator.fleet_costs import FleetCosts, iter_fleet_costs
+from car_cost_calculator.monte_carlo import Normal, Uniform, simulate
+from car_cost_calculator.running_costs import RunningCosts
+from car_cost_calculator.scenario import Scenario
+from car_cost_calculator.standing_costs import StandingCosts
+
+# name -> (group, setup function, included in quick runs)
+CASES = {}
+
+
+def benchmark(name, group, quick=True):
+    """Registers a benchmark setup function under the given name"""
+
+    def register(setup):
+        CASES[name] = (group, setup, quick)
+        return setup
+
+    return register
+
+
+def _running_costs(running_costs):
+    # results are lazy, so touch every series
+    return (
+        running_costs.depreciated_value,
+        running_costs.fuel_cost,
+        running_costs.tyre_cost,
+        running_costs.service_cost,
+    )
+
+
+def _fleet_parameters(scenarios, seed=0):
+    generator = np.random.default_rng(seed)
+    return {
+        "initial_vehicle_value": generator.uniform(10000, 80000, scenarios),
+        "initial_vehicle_age": generator.integers(0, 10, scenarios),
+        "km_per_year": generator.uniform(5000, 50000, scenarios),
+        "litres_per_100km": generator.uniform(4, 14, scenarios),
+    }
+
+
+@benchmark("compound_interest.scalar", "latency")
+def compound_interest_scalar():
+    return lambda: compound_interest(1000.0, 0.03, 10)
+
+
+@benchmark("compound_interest.batch_1m", "throughput")
+def compound_interest_batch():
+    principal = np.linspace(100, 1000, 1000000)
+    return lambda: compound_interest(principal, 0.03, 10)
+
+
+@benchmark("depreciation.flat_rate", "latency")
+def depreciation_flat_rate():
+    rate = FlatRate(0.15)
+    return lambda: calculate(40000, 10, 0, rate)
+
+
+@benchmark("depreciation.plain_function", "latency")
+def depreciation_plain_function():
+    return lambda: calculate(40000, 10, 0, lambda age: 0.15 if age < 3 else 0.1)
+
+
+@benchmark("depreciation.two_stage_100k", "throughput")
+def depreciation_batch():
+    parameters = _fleet_parameters(100000)
+    rate = TwoStageRate()
+    return lambda: calculate(
+        parameters["initial_vehicle_value"], 10, parameters["initial_vehicle_age"], rate
+    )
+
+
+@benchmark("running_costs.single", "latency")
+def running_costs_single():
+    return lambda: _running_costs(RunningCosts())
+
+
+@benchmark("running_costs.short_intervals", "stress")
+def running_costs_short_intervals():
+    # many interval events per year over a long horizon
+    return lambda: _running_costs(
+        RunningCosts(
+            years=100,
+            km_per_year=200000,
+            service_interval_km=500,
+            tyre_replacement_interval=1000,
+        )
+    )
+
+
+@benchmark("standing_costs.single", "latency")
+def standing_costs_single():
+    def run():
+        standing_costs = StandingCosts()
+        return (
+            standing_costs.insurance_cost,
+            standing_costs.registration_cost,
+            standing_costs.roadside_assist_cost,
+            standing_costs.detailing_cost,
+        )
+
+    return run
+
+
+@benchmark("car_costs.total_cost", "latency")
+def car_costs_total_cost():
+    return lambda: CarCosts(depreciation_rate=TwoStageRate()).total_cost
+
+
+@benchmark("car_costs.yearly_costs", "latency")
+def car_costs_yearly_costs():
+    return lambda: CarCosts(depreciation_rate=TwoStageRate()).yearly_costs
+
+
+@benchmark("scenario.update_fuel", "latency")
+def scenario_update():
+    scenario = Scenario()
+    values = iter(np.tile([8.0, 9.0], 10**7))
+    return lambda: scenario.update(litres_per_100km=next(values))
+
+
+@benchmark("fleet_costs.1k", "throughput")
+def fleet_costs_1k():
+    parameters = _fleet_parameters(1000)
+    return lambda: FleetCosts(depreciation_rate=TwoStageRate(), **parameters).total_cost
+
+
+@benchmark("fleet_costs.100k", "throughput")
+def fleet_costs_100k():
+    parameters = _fleet_parameters(100000)
+    return lambda: FleetCosts(depreciation_rate=TwoStageRate(), **parameters).total_cost
+
+
+@benchmark("fleet_costs.1m_chunked", "throughput", quick=False)
+def fleet_costs_1m():
+    parameters = _fleet_parameters(1000000)
+
+    def run():
+        total = 0.0
+        for _, chunk in iter_fleet_costs(
+            chunk_size=100000, depreciation_rate=TwoStageRate(), **parameters
+        ):
+            total += chunk.total_cost.sum()
+        return total
+
+    return run
+
+
+@benchmark("fleet_costs.daily_50_years", "stress")
+def fleet_costs_long_horizon():
+    parameters = _fleet_parameters(100)
+    return lambda: FleetCosts(
+        years=50, steps_per_year="daily", dtype=np.float32, **parameters
+    ).total_cost
+
+
+@benchmark("calibration.listings_1m", "throughput")
+def calibration_listings():
+    generator = np.random.default_rng(0)
+    listings = {
+        "make": generator.choice(["Ford", "Holden", "Mazda", "Toyota"], 1000000),
+        "model": generator.choice(["a", "b", "c", "d", "e"], 1000000),
+        "age": generator.uniform(0, 20, 1000000),
+        "km": generator.uniform(0, 300000, 1000000),
+        "price": generator.uniform(1000, 60000, 1000000),
+    }
+    return lambda: calibrate(listings, breakpoints=(3,))
+
+
+@benchmark("energy.tariff_hourly_year_1k", "throughput")
+def energy_tariff_hourly():
+    tariff = TimeOfUseTariff([0, 7, 16, 21], [0.15, 0.25, 0.45, 0.25])
+    energy = np.random.default_rng(0).uniform(0, 2, (1000, 365 * 24))
+    return lambda: tariff.cost(energy)
+
+
+@benchmark("financing.loan_book_100k", "throughput")
+def financing_loan_book():
+    generator = np.random.default_rng(0)
+    principal = generator.uniform(5000, 80000, 100000)
+    rate = generator.uniform(0.0, 0.12, 100000)
+    term = generator.choice([3, 5, 7], 100000)
+    balloon = principal * generator.choice([0.0, 0.3], 100000)
+    return lambda: yearly_interest(principal, rate, term, balloon, years=10)
+
+
+@benchmark("monte_carlo.100k", "throughput")
+def monte_carlo_100k():
+    return lambda: simulate(
+        samples=100000,
+        seed=0,
+        km_per_year=Uniform(5000, 40000),
+        litres_per_100km=Normal(8, 2),
+        depreciation_rate=Uniform(0.05, 0.25),
+    )
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Runs the benchmark cases, and compares the results with a saved baseline
+
+Examples:
+
+    python -m benchmarks.run                       # run and print every case
+    python -m benchmarks.run --quick -k fleet      # quick cases matching "fleet"
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 1.25
+
+With --compare, the exit status is 1 if any case is slower than the baseline by more
+than the threshold ratio, or uses more than the threshold ratio of its peak memory.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+from .cases import CASES
+
+
+def measure(setup, repeat: int = 5, min_time: float = 0.2):
+    """Times a benchmark case, and measures its peak memory use.
+    Args:
+        setup (callable): the case's setup function.
+        repeat (int): number of timing repeats; the fastest is reported.
+        min_time (float): minimum duration in seconds of each repeat.
+    Returns:
+        dict: "seconds" per call and "peak_bytes" allocated during a single call.
+    """
+    function = setup()
+    function()  # warm up
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 10**6:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    times = [elapsed] + timer.repeat(repeat=max(repeat - 1, 0), number=number)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times) / number, "peak_bytes": peak}
+
+
+def run(names, repeat, min_time, stream):
+    """Runs the named cases, printing each result as it completes"""
+    results = {}
+    for name in names:
+        group, setup, _ = CASES[name]
+        result = measure(setup, repeat, min_time)
+        result["group"] = group
+        results[name] = result
+        stream.write(
+            "{:<36} {:>12} {:>10}\n".format(
+                name,
+                _format_time(result["seconds"]),
+                _format_bytes(result["peak_bytes"]),
+            )
+        )
+        stream.flush()
+    return results
+
+
+def compare(baseline, results, threshold, stream):
+    """Writes a comparison report, returning the names of the regressed cases"""
+    regressions = []
+    stream.write(
+        "\n{:<36} {:>12} {:>12} {:>7} {:>7}\n".format(
+            "case", "baseline", "current", "time", "memory"
+        )
+    )
+    for name, result in results.items():
+        if name not in baseline:
+            stream.write("{:<36} {:>12}\n".format(name, "(new)"))
+            continue
+        base = baseline[name]
+        time_ratio = result["seconds"] / base["seconds"]
+        memory_ratio = (result["peak_bytes"] + 1) / (base["peak_bytes"] + 1)
+        regressed = time_ratio > threshold or memory_ratio > threshold
+        if regressed:
+            regressions.append(name)
+        stream.write(
+            "{:<36} {:>12} {:>12} {:>6.2f}x {:>6.2f}x{}\n".format(
+                name,
+                _format_time(base["seconds"]),
+                _format_time(result["seconds"]),
+                time_ratio,
+                memory_ratio,
+                "  REGRESSION" if regressed else "",
+            )
+        )
+    return regressions
+
+
+def environment():
+    """Gets a description of the machine and library versions"""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def _format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "{:.3g} {}".format(seconds / scale, unit)
+    return "{:.3g} ns".format(seconds / 1e-9)
+
+
+def _format_bytes(count):
+    for unit, scale in (("GB", 2**30), ("MB", 2**20), ("kB", 2**10)):
+        if count >= scale:
+            return "{:.4g} {}".format(count / scale, unit)
+    return "{} B".format(count)
+
+
+def main(argv=None):
+    """Runs the benchmarks from the command line"""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument(
+        "-k", "--filter", help="only run cases whose name contains this"
+    )
+    parser.add_argument("--quick", action="store_true", help="skip the slowest cases")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="minimum seconds per repeat"
+    )
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with this saved JSON baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="slowdown ratio reported as a regression (default: 1.25)",
+    )
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name, (_, _, quick) in CASES.items()
+        if (args.filter is None or args.filter in name) and (quick or not args.quick)
+    ]
+    results = run(names, args.repeat, args.min_time, sys.stdout)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {"environment": environment(), "results": results},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["environment"] != environment():
+            sys.stdout.write(
+                "\nnote: baseline was recorded on {}\n".format(baseline["environment"])
+            )
+        regressions = compare(baseline["results"], results, args.threshold, sys.stdout)
+        if regressions:
+            sys.stdout.write("\n{} regression(s)\n".format(len(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
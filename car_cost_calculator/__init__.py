@@ -9,7 +9,8 @@ __email__ = "jugglindan@gmail.com"
 __version__ = "0.6.1"
 
 from .car_costs import CarCosts
-from .compound_interest import compound_interest
-from .depreciation import FlatRate, TwoStageRate
+from .compound_interest import compound_interest, price_index
+from .depreciation import FlatRate, PiecewiseRate, TwoStageRate
+from .fleet_costs import FleetCosts
 from .running_costs import RunningCosts
 from .standing_costs import StandingCosts
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"Lazily evaluated, cached attributes"
+# pylint: disable=R0903
+
+from functools import cached_property, lru_cache
+import numpy as np
+
+
+class LazyInputs:
+    """Mixin for classes whose derived values are `functools.cached_property` attributes.
+
+    Cached values are computed on first access. Assigning any of the input attributes
+    named in `_INPUTS` discards every cached value, so they are recalculated from the
+    new inputs on next access.
+    """
+
+    _INPUTS = ()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._INPUTS:
+            self.invalidate()
+
+    def invalidate(self):
+        """Discards all cached values"""
+        for name in _cached_names(type(self)):
+            self.__dict__.pop(name, None)
+
+
+@lru_cache(maxsize=None)
+def _cached_names(cls):
+    """Gets the names of all cached properties of a class"""
+    return tuple(
+        name
+        for klass in cls.__mro__
+        for name, attribute in vars(klass).items()
+        if isinstance(attribute, cached_property)
+    )
+
+
+def frozen(value):
+    """Gets a hashable, comparable form of a parameter value for use in cache keys.
+    Arrays and sequences become nested tuples; other values are returned unchanged."""
+    if isinstance(value, (list, tuple)) or hasattr(value, "__array__"):
+        value = np.asarray(value)
+        if value.ndim == 0:
+            return value.item()
+        return tuple(frozen(item) for item in value)
+    return value
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""Memory-mapped on-disk archive of cost model results
+
+An archive is a directory of .npy files, opened as `numpy.memmap` arrays:
+
+* costs.npy: yearly spend, shape (categories, years, scenarios). Each category and
+  year is a contiguous run of scenarios, so a query such as the median fuel cost in
+  year 5 reads one contiguous block of the file.
+* depreciated_value.npy: shape (years, scenarios).
+* parameters.npy: structured array of the input parameters, one record per scenario.
+* keys.npy and order.npy: the scenario keys in sorted order, and the row of each,
+  for binary search lookup by key.
+* header.json: the shape and format of the archive.
+"""
+
+import json
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+from .fleet_costs import COST_CATEGORIES
+from .result_store import ResultStore, yearly_results
+
+FORMAT_VERSION = 2
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class ArchiveWriter:
+    """Writes an archive one chunk of scenarios at a time.
+
+    The arrays are written straight into the memory-mapped files, so results never
+    need to be held in memory all at once. Use as a context manager, or call `close`
+    to write the key index once every scenario has been written.
+    """
+
+    def __init__(
+        self,
+        path,
+        scenarios: int,
+        years: int,
+        parameters=(),
+        key_dtype=np.int64,
+        dtype=np.float64,
+    ):
+        """Initialise the writer, creating the archive files
+        Args:
+            path (str): Directory of the archive, which is created if needed.
+            scenarios (int): Total number of scenarios in the archive.
+            years (int): number of years of results.
+            parameters (sequence): Names of the numeric input parameters to record.
+            key_dtype (data-type): Type of the scenario keys, e.g. int64 or "U16".
+            dtype (data-type): Floating point type of the stored results.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.scenarios = scenarios
+        self.years = years
+        self.rows = 0
+        self.costs = open_memmap(
+            os.path.join(path, "costs.npy"),
+            mode="w+",
+            dtype=dtype,
+            shape=(len(COST_CATEGORIES), years, scenarios),
+        )
+        self.depreciated_value = open_memmap(
+            os.path.join(path, "depreciated_value.npy"),
+            mode="w+",
+            dtype=dtype,
+            shape=(years, scenarios),
+        )
+        self.parameters = open_memmap(
+            os.path.join(path, "parameters.npy"),
+            mode="w+",
+            dtype=[(name, np.float64) for name in parameters],
+            shape=(scenarios,),
+        )
+        self.keys = np.empty(scenarios, dtype=key_dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write(self, results, keys=None):
+        """Appends the next chunk of scenarios.
+        Args:
+            results: `FleetCosts` or `SweepResult` holding the chunk's results. Results
+                with more than one time step per year are rolled up into yearly totals.
+            keys (array-like): Key of each scenario. Defaults to the row numbers.
+        """
+        costs, depreciated_value = yearly_results(results)
+        start = self.rows
+        stop = start + depreciated_value.shape[0]
+        assert stop <= self.scenarios, "more scenarios than the archive holds"
+        assert depreciated_value.shape[1] == self.years
+        for index, category in enumerate(COST_CATEGORIES):
+            self.costs[index, :, start:stop] = costs[category].T
+        self.depreciated_value[:, start:stop] = depreciated_value.T
+        for name in self.parameters.dtype.names:
+            self.parameters[name][start:stop] = results.parameters[name]
+        self.keys[start:stop] = np.arange(start, stop) if keys is None else keys
+        self.rows = stop
+
+    def close(self):
+        """Writes the key index and header, completing the archive"""
+        assert self.rows == self.scenarios, "{} of {} scenarios written".format(
+            self.rows, self.scenarios
+        )
+        order = np.argsort(self.keys, kind="stable")
+        keys = self.keys[order]
+        if len(keys) > 1 and np.any(keys[1:] == keys[:-1]):
+            raise ValueError("scenario keys are not unique")
+        np.save(os.path.join(self.path, "keys.npy"), keys)
+        np.save(os.path.join(self.path, "order.npy"), order)
+        for array in (self.costs, self.depreciated_value, self.parameters):
+            array.flush()
+        header = {
+            "version": FORMAT_VERSION,
+            "scenarios": self.scenarios,
+            "years": self.years,
+            "categories": list(COST_CATEGORIES),
+            "parameters": list(self.parameters.dtype.names),
+        }
+        with open(os.path.join(self.path, "header.json"), "w", encoding="utf-8") as f:
+            json.dump(header, f)
+
+
+def write_archive(path, results, keys=None, parameters=None):
+    """Writes the results of a `FleetCosts` or `SweepResult` to a new archive.
+    Args:
+        path (str): Directory of the archive.
+        results: the results to archive.
+        keys (array-like): Key of each scenario. Defaults to the row numbers.
+        parameters (sequence): Names of the input parameters to record.
+            Defaults to all the parameters of the results.
+    """
+    if parameters is None:
+        parameters = list(results.parameters)
+    key_dtype = np.int64 if keys is None else np.asarray(keys).dtype
+    with ArchiveWriter(
+        path, results.scenarios, results.years, parameters, key_dtype
+    ) as writer:
+        writer.write(results, keys)
+
+
+class Archive:
+    """Read-only access to an archive of cost model results.
+
+    Opening an archive only maps its files, so it takes the same time however large the
+    archive is. Lookups and slices return views of the mapped files, and aggregates are
+    streamed through them a chunk of scenarios at a time.
+
+    Attributes:
+        scenarios (int): number of scenarios.
+        years (int): number of years of results.
+        keys (array-like): the scenario keys, sorted.
+        parameters (numpy.ndarray): Structured array of the recorded input parameters.
+        store (ResultStore): View of the archive as a `ResultStore`, in row order.
+    """
+
+    def __init__(self, path):
+        """Open the archive in the given directory.
+        Raises:
+            ValueError: if the archive was written in a different format version, or
+                with different cost categories.
+        """
+        with open(os.path.join(path, "header.json"), encoding="utf-8") as f:
+            header = json.load(f)
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(
+                "archive {} has format version {}, but version {} is needed; "
+                "write it again from its results".format(
+                    path, header["version"], FORMAT_VERSION
+                )
+            )
+        if tuple(header["categories"]) != COST_CATEGORIES:
+            raise ValueError(
+                "archive {} has cost categories {}, but {} are needed".format(
+                    path, header["categories"], list(COST_CATEGORIES)
+                )
+            )
+
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        self.scenarios = header["scenarios"]
+        self.years = header["years"]
+        self.__costs = load("costs.npy")
+        self.__depreciated_value = load("depreciated_value.npy")
+        self.parameters = load("parameters.npy")
+        self.keys = load("keys.npy")
+        self.__order = load("order.npy")
+        self.store = ResultStore(
+            self.__costs.transpose(2, 1, 0),
+            self.__depreciated_value.T,
+            self.parameters if self.parameters.dtype.names else None,
+        )
+
+    def __len__(self):
+        return self.scenarios
+
+    def __getitem__(self, key):
+        """Gets the `ScenarioView` of the scenario with the given key"""
+        return self.store[int(self.rows(key))]
+
+    def __contains__(self, key):
+        position = np.searchsorted(self.keys, key)
+        return position < self.scenarios and self.keys[position] == key
+
+    def rows(self, keys):
+        """Gets the row of each scenario key, raising KeyError for unknown keys"""
+        keys = np.asarray(keys)
+        positions = np.atleast_1d(np.searchsorted(self.keys, keys))
+        found = positions < self.scenarios
+        found[found] = self.keys[positions[found]] == keys.ravel()[found]
+        if not np.all(found):
+            raise KeyError(keys.ravel()[~found].tolist())
+        return self.__order[positions].reshape(keys.shape)
+
+    def category(self, name):
+        """Gets the (years x scenarios) yearly spend in one cost category, in row order"""
+        return self.__costs[COST_CATEGORIES.index(name)]
+
+    @property
+    def depreciated_value(self):
+        """Gets the (years x scenarios) depreciated values, in row order"""
+        return self.__depreciated_value
+
+    def sum(self, category, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Gets the total spend in a category in each year, over all scenarios"""
+        data = self.category(category)
+        total = np.zeros(self.years)
+        for start in range(0, self.scenarios, chunk_size):
+            total += data[:, start : start + chunk_size].sum(axis=1)
+        return total
+
+    def mean(self, category, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Gets the mean spend in a category in each year"""
+        return self.sum(category, chunk_size) / self.scenarios
+
+    def quantile(self, category, q, year=None):
+        """Gets quantiles of the spend in a category.
+        Args:
+            category (str): cost category.
+            q (float or array-like): quantiles to calculate, between 0 and 1.
+            year (int): the year to summarise. Defaults to every year.
+        Returns:
+            numpy array of the quantiles, with a trailing axis for the years if no year
+                is given. Only the requested year's contiguous block is read.
+        """
+        data = self.category(category)
+        if year is not None:
+            return np.quantile(data[year], q)
+        return np.stack([np.quantile(row, q) for row in data], axis=-1)
+
+    def median(self, category, year=None):
+        """Gets the median spend in a category. See `quantile`."""
+        return self.quantile(category, 0.5, year)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"Memoizing cache for cost model results"
+
+from collections import OrderedDict, namedtuple
+from inspect import signature
+from ._lazy import frozen
+from .car_costs import CarCosts
+from .running_costs import RunningCosts
+from .standing_costs import StandingCosts
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _LRUCache:
+    """Bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        """Gets the value for key, calling factory to create it on a miss"""
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self.entries[key] = factory()
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def clear(self):
+        """Discards all entries and statistics"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Gets the hit and miss statistics"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+
+class CostModelCache:
+    """Least-recently-used cache of cost model results, keyed on the full parameter set.
+
+    Parameters are normalised before lookup, so omitted arguments match their defaults,
+    and depreciation rates, energy models and tariffs match by value. `RunningCosts` and `StandingCosts` are
+    cached separately, so a `CarCosts` built after changing only a running cost parameter
+    reuses the cached standing costs, and vice versa.
+
+    Cached objects are shared between callers and should be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """Initialise the cache
+        Args:
+            maxsize (int): Maximum number of entries kept for each type of result.
+        """
+        self.__caches = {
+            CarCosts: _LRUCache(maxsize),
+            RunningCosts: _LRUCache(maxsize),
+            StandingCosts: _LRUCache(maxsize),
+        }
+        self.__defaults = {
+            cls: {
+                name: parameter.default
+                for name, parameter in signature(cls).parameters.items()
+            }
+            for cls in self.__caches
+        }
+
+    def car_costs(self, **params):
+        """Gets the `CarCosts` for the given constructor arguments"""
+
+        def build():
+            car_costs = CarCosts(**params)
+            car_costs.running_costs = self.running_costs(
+                **{
+                    name: getattr(car_costs, name)
+                    for name in self.__defaults[RunningCosts]
+                }
+            )
+            car_costs.standing_costs = self.standing_costs(
+                **{
+                    name: getattr(car_costs, name)
+                    for name in self.__defaults[StandingCosts]
+                }
+            )
+            return car_costs
+
+        return self.__get(CarCosts, params, build)
+
+    def running_costs(self, **params):
+        """Gets the `RunningCosts` for the given constructor arguments"""
+        return self.__get(RunningCosts, params, lambda: RunningCosts(**params))
+
+    def standing_costs(self, **params):
+        """Gets the `StandingCosts` for the given constructor arguments"""
+        return self.__get(StandingCosts, params, lambda: StandingCosts(**params))
+
+    def cache_info(self):
+        """Gets the hit and miss statistics, keyed by "car_costs", "running_costs" and "standing_costs" """
+        return {
+            "car_costs": self.__caches[CarCosts].info(),
+            "running_costs": self.__caches[RunningCosts].info(),
+            "standing_costs": self.__caches[StandingCosts].info(),
+        }
+
+    def clear(self):
+        """Discards all cached results and statistics"""
+        for cache in self.__caches.values():
+            cache.clear()
+
+    def __get(self, cls, params, factory):
+        """Looks up a result of the given class by its normalised parameters"""
+        defaults = self.__defaults[cls]
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise TypeError(
+                "unexpected {} arguments: {}".format(cls.__name__, sorted(unknown))
+            )
+        key = tuple(
+            frozen(params.get(name, default)) for name, default in defaults.items()
+        )
+        return self.__caches[cls].get(key, factory)
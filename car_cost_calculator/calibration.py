@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""Calibration of depreciation curves to resale listings
+
+Each listing gives the make, model, age, odometer reading and asking price of a used
+car. With a piecewise constant depreciation rate, the log of a car's value falls
+linearly with the years it has spent in each stage, so for each make and model::
+
+    log(price) = log(new price) + sum of years in stage s * log(1 - rate of stage s)
+                 + km effect * km / km_scale
+
+is fitted by ordinary least squares. Listings are read in chunks, and only the
+sufficient statistics X'X and X'y of each group are kept between chunks, so datasets
+of any size can be calibrated in a fixed amount of memory.
+"""
+
+import numpy as np
+from .depreciation import FlatRate, PiecewiseRate, TwoStageRate
+
+DEFAULT_CHUNKSIZE = 1000000
+
+
+class CalibrationResult:
+    """Fitted depreciation curves, one per group of listings.
+
+    Attributes:
+        groups (list): Key of each group, such as a (make, model) tuple.
+        breakpoints (tuple): Ages at which each stage after the first begins.
+        stage_rates (array-like): Fitted rate of each stage, with shape (groups, stages).
+        new_price (array-like): Fitted price of a new car with no km.
+        km_effect (array-like): Relative change in price per `km_scale` km driven,
+            or None if the listings had no km.
+        km_scale (float): Distance in km that `km_effect` is given for.
+        listings (array-like): Number of listings in each group.
+        residual_std (array-like): Standard deviation of the residuals of log price.
+    """
+
+    def __init__(
+        self,
+        groups,
+        breakpoints,
+        stage_rates,
+        new_price,
+        km_effect,
+        km_scale,
+        listings,
+        residual_std,
+    ):
+        self.groups = list(groups)
+        self.breakpoints = tuple(breakpoints)
+        self.stage_rates = stage_rates
+        self.new_price = new_price
+        self.km_effect = km_effect
+        self.km_scale = km_scale
+        self.listings = listings
+        self.residual_std = residual_std
+        self.__index = {group: index for index, group in enumerate(self.groups)}
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __contains__(self, group):
+        return group in self.__index
+
+    def __getitem__(self, group):
+        """Gets the fitted rate function of a group"""
+        return self.rate(self.__index[group])
+
+    def rate(self, index: int):
+        """Gets the fitted rate function of the group at the given index: a `FlatRate`
+        without breakpoints, a `TwoStageRate` with one, otherwise a `PiecewiseRate`"""
+        rates = self.stage_rates[index]
+        if not self.breakpoints:
+            return FlatRate(float(rates[0]))
+        if len(self.breakpoints) == 1:
+            return TwoStageRate(float(rates[0]), float(rates[1]), self.breakpoints[0])
+        return PiecewiseRate(rates.tolist(), self.breakpoints)
+
+    @property
+    def rates(self):
+        """Gets a dictionary of the fitted rate function of every group"""
+        return {group: self.rate(index) for index, group in enumerate(self.groups)}
+
+    def to_frame(self):
+        """Gets the fitted parameters as a pandas DataFrame, with one row per group"""
+        import pandas as pd  # pylint: disable=C0415
+
+        columns = {"group": self.groups, "listings": self.listings}
+        for stage in range(self.stage_rates.shape[1]):
+            columns["rate_{}".format(stage + 1)] = self.stage_rates[:, stage]
+        columns["new_price"] = self.new_price
+        if self.km_effect is not None:
+            columns["km_effect"] = self.km_effect
+        columns["residual_std"] = self.residual_std
+        return pd.DataFrame(columns)
+
+
+class DepreciationCalibrator:
+    """Accumulates the least squares statistics of each group of resale listings.
+
+    Call `update` with each chunk of listings, then `fit`. Calibrators that have seen
+    different parts of a dataset, for example in separate processes, can be combined
+    with `merge`.
+    """
+
+    def __init__(
+        self,
+        breakpoints=(),
+        group_by=("make", "model"),
+        km: bool = True,
+        km_scale: float = 10000.0,
+    ):
+        """Initialise the calibrator
+        Args:
+            breakpoints (sequence): Increasing ages at which each stage after the first
+                begins. No breakpoints fits a flat rate, and one fits a two stage rate.
+            group_by (sequence): Columns whose values identify a group.
+            km (bool): Whether to fit the effect of the odometer reading, from a "km" column.
+            km_scale (float): Distance in km that the km effect is given for.
+        """
+        self.breakpoints = tuple(breakpoints)
+        assert np.all(np.diff(self.breakpoints) > 0)
+        assert all(breakpoint > 0 for breakpoint in self.breakpoints)
+        self.group_by = tuple(group_by)
+        self.km = km
+        self.km_scale = km_scale
+        # regressors: intercept, years in each stage, then km
+        self.features = 2 + len(self.breakpoints) + km
+        self.groups = {}
+        self.rejected = 0
+        self.__xtx = np.zeros((0, self.features, self.features))
+        self.__xty = np.zeros((0, self.features))
+        self.__yty = np.zeros(0)
+        self.__count = np.zeros(0, dtype=np.int64)
+
+    def __group_ids(self, chunk):
+        """Gets the id of each listing's group, adding any new groups"""
+        # code each key column, then combine the codes into one integer per listing,
+        # which is much faster to find the unique values of than tuples of keys
+        values, codes = zip(
+            *[
+                np.unique(np.asarray(chunk[name]), return_inverse=True)
+                for name in self.group_by
+            ]
+        )
+        combined = np.ravel_multi_index(
+            [code.ravel() for code in codes], [len(value) for value in values]
+        )
+        unique, inverse = np.unique(combined, return_inverse=True)
+        unique = list(
+            zip(
+                *[
+                    value[index].tolist()
+                    for value, index in zip(
+                        values,
+                        np.unravel_index(unique, [len(value) for value in values]),
+                    )
+                ]
+            )
+        )
+        groups = self.groups
+        for key in unique:
+            if key not in groups:
+                groups[key] = len(groups)
+        ids = np.array([groups[key] for key in unique], dtype=np.intp)
+        return ids[inverse.ravel()]
+
+    def __grow(self):
+        """Extends the statistics arrays to cover every known group"""
+        extra = len(self.groups) - len(self.__count)
+        if extra:
+            self.__xtx = np.concatenate(
+                [self.__xtx, np.zeros((extra, self.features, self.features))]
+            )
+            self.__xty = np.concatenate([self.__xty, np.zeros((extra, self.features))])
+            self.__yty = np.concatenate([self.__yty, np.zeros(extra)])
+            self.__count = np.concatenate(
+                [self.__count, np.zeros(extra, dtype=np.int64)]
+            )
+
+    def design(self, age, km=None):
+        """Gets the regressors of log price for arrays of ages and km.
+        Returns:
+            numpy array of shape (listings, features): an intercept, the years spent in
+                each depreciation stage, and the km driven divided by `km_scale`.
+        """
+        age = np.asarray(age, dtype=float)
+        lower = np.array((0.0,) + self.breakpoints)
+        upper = np.array(self.breakpoints + (np.inf,))
+        columns = [np.ones_like(age)]
+        columns.extend(np.clip(age[:, np.newaxis] - lower, 0, upper - lower).T)
+        if self.km:
+            columns.append(np.asarray(km, dtype=float) / self.km_scale)
+        return np.column_stack(columns)
+
+    def update(self, chunk):
+        """Adds a chunk of listings.
+        Args:
+            chunk: pandas DataFrame or dictionary of arrays, with the `group_by`
+                columns, "age" in years, "price" and, if fitting km, "km". Listings
+                with missing or non-positive prices, or negative ages, are rejected.
+        """
+        age = np.asarray(chunk["age"], dtype=float)
+        price = np.asarray(chunk["price"], dtype=float)
+        km = np.asarray(chunk["km"], dtype=float) if self.km else None
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(age) & (age >= 0) & np.isfinite(price) & (price > 0)
+            if self.km:
+                valid &= np.isfinite(km) & (km >= 0)
+        self.rejected += int(len(valid) - np.count_nonzero(valid))
+        if not np.all(valid):
+            chunk = {name: np.asarray(chunk[name])[valid] for name in self.group_by}
+            age, price = age[valid], price[valid]
+            km = km[valid] if self.km else None
+        if len(age) == 0:
+            return
+
+        group = self.__group_ids(chunk)
+        self.__grow()
+        groups = len(self.groups)
+        x = self.design(age, km)
+        y = np.log(price)
+        for i in range(self.features):
+            self.__xty[:, i] += np.bincount(group, x[:, i] * y, groups)
+            for j in range(i, self.features):
+                total = np.bincount(group, x[:, i] * x[:, j], groups)
+                self.__xtx[:, i, j] += total
+                if i != j:
+                    self.__xtx[:, j, i] += total
+        self.__yty += np.bincount(group, y * y, groups)
+        self.__count += np.bincount(group, minlength=groups)
+
+    def merge(self, other):
+        """Adds the statistics of another calibrator with the same settings"""
+        assert (other.breakpoints, other.group_by, other.km) == (
+            self.breakpoints,
+            self.group_by,
+            self.km,
+        )
+        for key in other.groups:
+            self.groups.setdefault(key, len(self.groups))
+        self.__grow()
+        rows = np.array([self.groups[key] for key in other.groups], dtype=np.intp)
+        statistics = other.statistics()
+        self.__xtx[rows] += statistics[0]
+        self.__xty[rows] += statistics[1]
+        self.__yty[rows] += statistics[2]
+        self.__count[rows] += statistics[3]
+        self.rejected += other.rejected
+
+    def statistics(self):
+        """Gets the accumulated (X'X, X'y, y'y, listings) of each group, in group order"""
+        return self.__xtx, self.__xty, self.__yty, self.__count
+
+    def fit(self, min_listings: int = 10):
+        """Fits the depreciation curve of every group with enough listings.
+
+        A group with no listings in some stage, for example a new model with no old
+        cars listed, takes that stage's rate from a fit to all listings.
+
+        Args:
+            min_listings (int): Fewest listings a group needs to be fitted.
+        Returns:
+            CalibrationResult: the fitted curves.
+        """
+        keep = self.__count >= max(min_listings, 1)
+        xtx, xty = self.__xtx[keep], self.__xty[keep]
+        coefficients = _solve(xtx, xty)
+        pooled = _solve(self.__xtx.sum(axis=0), self.__xty.sum(axis=0))
+
+        stages = slice(1, 2 + len(self.breakpoints))
+        # a stage without any listings has no exposure, so no diagonal entry
+        exposure = np.diagonal(xtx, axis1=1, axis2=2)[:, stages]
+        log_rates = np.where(exposure > 0, coefficients[:, stages], pooled[stages])
+
+        # residual sum of squares from the sufficient statistics
+        count = self.__count[keep]
+        residual = (
+            self.__yty[keep]
+            - 2 * np.einsum("gi,gi->g", coefficients, xty)
+            + np.einsum("gi,gij,gj->g", coefficients, xtx, coefficients)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            residual_std = np.sqrt(
+                np.maximum(residual, 0) / np.maximum(count - self.features, 1)
+            )
+        groups = [key for key, index in self.groups.items() if keep[index]]
+        if len(self.group_by) == 1:
+            groups = [key[0] for key in groups]
+        return CalibrationResult(
+            groups,
+            self.breakpoints,
+            1 - np.exp(log_rates),
+            np.exp(coefficients[:, 0]),
+            coefficients[:, -1] if self.km else None,
+            self.km_scale,
+            count,
+            residual_std,
+        )
+
+
+def _solve(xtx, xty):
+    """Solves the normal equations of each group, tolerating rank deficient groups"""
+    return np.einsum("...ij,...j->...i", np.linalg.pinv(xtx, hermitian=True), xty)
+
+
+def calibrate(
+    listings,
+    breakpoints=(),
+    group_by=("make", "model"),
+    km: bool = True,
+    min_listings: int = 10,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+):
+    """Fits depreciation curves to resale listings, one per group.
+
+    Args:
+        listings: Path of a CSV or Parquet file of listings, read in chunks; an
+            iterable of DataFrame chunks; or a single DataFrame or dictionary of arrays.
+            See `DepreciationCalibrator.update` for the columns.
+        breakpoints (sequence): Increasing ages at which each stage after the first
+            begins. No breakpoints fits a `FlatRate`, one fits a `TwoStageRate`, and
+            more fit a `PiecewiseRate`.
+        group_by (sequence): Columns whose values identify a group, such as make and model.
+        km (bool): Whether to fit the effect of the odometer reading, from a "km" column.
+        min_listings (int): Fewest listings a group needs to be fitted.
+        chunksize (int): Listings per chunk when reading a file.
+    Returns:
+        CalibrationResult: the fitted curves. Index it by group key for the rate function.
+    """
+    calibrator = DepreciationCalibrator(breakpoints, group_by, km)
+    if isinstance(listings, str) or hasattr(listings, "__fspath__"):
+        from .pipeline import read_fleet  # pylint: disable=C0415
+
+        chunks = read_fleet(listings, chunksize)
+    elif isinstance(listings, dict) or hasattr(listings, "columns"):
+        chunks = [listings]
+    else:
+        chunks = listings
+    for chunk in chunks:
+        calibrator.update(chunk)
+    return calibrator.fit(min_listings)
@@ -1,16 +1,48 @@
 # -*- coding: utf-8 -*-
 "Car cost of ownership class"
 
-# import numpy as np
-import pandas as pd
+from functools import cached_property
+
+import numpy as np
+from ._lazy import LazyInputs
 from .depreciation import FlatRate
+from .financing import PERIODS_PER_YEAR, Amortization
+from .profiling import profiled
 from .running_costs import RunningCosts
 from .standing_costs import StandingCosts
 
 
-class CarCosts:
-    """ Total cost of ownership class, encapsulating both running and standing costs.
-    Adds utility functionality like pandas dataframes and plots."""
+class CarCosts(LazyInputs):
+    """ Total cost of ownership class, encapsulating running and standing costs, and
+    the interest on any car loan. Adds utility functionality like pandas dataframes and plots.
+
+    The running and standing costs, and the yearly costs DataFrame, are built on first
+    access and rebuilt after any of the constructor arguments are reassigned."""
+
+    _INPUTS = (
+        "initial_vehicle_value",
+        "initial_vehicle_age",
+        "depreciation_rate",
+        "years",
+        "km_per_year",
+        "litres_per_100km",
+        "inflation",
+        "initial_fuel_price",
+        "initial_service_cost",
+        "service_interval_km",
+        "service_interval_years",
+        "tyre_replacement_interval",
+        "initial_cost_per_tyre",
+        "insurance_per_year",
+        "registration_per_year",
+        "roadside_assist_per_year",
+        "detailing_per_year",
+        "loan_amount",
+        "loan_interest_rate",
+        "loan_term_years",
+        "loan_balloon",
+        "energy_model",
+    )
 
     def __init__(
         self,
@@ -18,10 +50,10 @@ class CarCosts:
         initial_vehicle_age: int = 0,
         depreciation_rate: callable = FlatRate(),
         years: int = 10,
-        km_per_year: float = 15000.0,
-        litres_per_100km: float = 10.0,
-        inflation: float = 0.02,
-        initial_fuel_price: float = 1.50,
+        km_per_year=15000.0,
+        litres_per_100km=10.0,
+        inflation=0.02,
+        initial_fuel_price=1.50,
         initial_service_cost: float = 400.0,
         service_interval_km: float = 15000.0,
         service_interval_years: float = 1.0,
@@ -31,34 +63,110 @@ class CarCosts:
         registration_per_year: float = 500,
         roadside_assist_per_year: float = 200,
         detailing_per_year: float = 120,
+        loan_amount: float = 0.0,
+        loan_interest_rate: float = 0.07,
+        loan_term_years: float = 5.0,
+        loan_balloon: float = 0.0,
+        energy_model=None,
     ):
-        """Initialise the car cost of ownership object"""
-        self.running_costs = RunningCosts(
-            initial_vehicle_value=initial_vehicle_value,
-            initial_vehicle_age=initial_vehicle_age,
-            depreciation_rate=depreciation_rate,
-            years=years,
-            km_per_year=km_per_year,
-            litres_per_100km=litres_per_100km,
-            inflation=inflation,
-            initial_fuel_price=initial_fuel_price,
-            initial_service_cost=initial_service_cost,
-            service_interval_km=service_interval_km,
-            service_interval_years=service_interval_years,
-            tyre_replacement_interval=tyre_replacement_interval,
-            initial_cost_per_tyre=initial_cost_per_tyre,
+        """Initialise the car cost of ownership object.
+        `km_per_year`, `litres_per_100km`, `inflation` and `initial_fuel_price` may be
+        arrays with one value per year; see `RunningCosts`. A car loan is taken out at
+        the start of the first year for `loan_amount`, repaid monthly over
+        `loan_term_years` with a final `loan_balloon` payment; its interest is the
+        "financing" cost. An `EnergyModel` makes the "fuel" cost the spend on fuel and
+        electricity of an electric or hybrid car."""
+        self.initial_vehicle_value = initial_vehicle_value
+        self.initial_vehicle_age = initial_vehicle_age
+        self.depreciation_rate = depreciation_rate
+        self.years = years
+        self.km_per_year = km_per_year
+        self.litres_per_100km = litres_per_100km
+        self.inflation = inflation
+        self.initial_fuel_price = initial_fuel_price
+        self.initial_service_cost = initial_service_cost
+        self.service_interval_km = service_interval_km
+        self.service_interval_years = service_interval_years
+        self.tyre_replacement_interval = tyre_replacement_interval
+        self.initial_cost_per_tyre = initial_cost_per_tyre
+        self.insurance_per_year = insurance_per_year
+        self.registration_per_year = registration_per_year
+        self.roadside_assist_per_year = roadside_assist_per_year
+        self.detailing_per_year = detailing_per_year
+        self.loan_amount = loan_amount
+        self.loan_interest_rate = loan_interest_rate
+        self.loan_term_years = loan_term_years
+        self.loan_balloon = loan_balloon
+        self.energy_model = energy_model
+
+        # cumulative_distance (array-like): Array giving the accumulated distance driven each year.
+        # depreciated_value (array-like): Array giving the depreciated value at the start of each year.
+        # indexed_cost_per_tyre (array-like): Indexed cost of replacement tyres.
+        # indexed_service_cost (array-like): Indexed cost of servicing for each year.
+
+    @cached_property
+    @profiled("car_costs.running_costs")
+    def running_costs(self):
+        """Gets the `RunningCosts` for this car"""
+        return RunningCosts(
+            initial_vehicle_value=self.initial_vehicle_value,
+            initial_vehicle_age=self.initial_vehicle_age,
+            depreciation_rate=self.depreciation_rate,
+            years=self.years,
+            km_per_year=self.km_per_year,
+            litres_per_100km=self.litres_per_100km,
+            inflation=self.inflation,
+            initial_fuel_price=self.initial_fuel_price,
+            initial_service_cost=self.initial_service_cost,
+            service_interval_km=self.service_interval_km,
+            service_interval_years=self.service_interval_years,
+            tyre_replacement_interval=self.tyre_replacement_interval,
+            initial_cost_per_tyre=self.initial_cost_per_tyre,
+            energy_model=self.energy_model,
         )
 
-        self.standing_costs = StandingCosts(
-            years=years,
-            inflation=inflation,
-            insurance_per_year=insurance_per_year,
-            registration_per_year=registration_per_year,
-            roadside_assist_per_year=roadside_assist_per_year,
-            detailing_per_year=detailing_per_year,
+    @cached_property
+    @profiled("car_costs.standing_costs")
+    def standing_costs(self):
+        """Gets the `StandingCosts` for this car"""
+        return StandingCosts(
+            years=self.years,
+            inflation=self.inflation,
+            insurance_per_year=self.insurance_per_year,
+            registration_per_year=self.registration_per_year,
+            roadside_assist_per_year=self.roadside_assist_per_year,
+            detailing_per_year=self.detailing_per_year,
         )
 
-        self.yearly_costs = pd.DataFrame(
+    @cached_property
+    @profiled("car_costs.financing")
+    def financing(self):
+        """Gets the `Amortization` schedule of the car loan, over the modelled years"""
+        return Amortization(
+            principal=self.loan_amount,
+            annual_rate=self.loan_interest_rate,
+            term=self.loan_term_years,
+            balloon=self.loan_balloon,
+            periods=self.years * PERIODS_PER_YEAR,
+        )
+
+    @property
+    def financing_cost(self):
+        """Gets the loan interest paid each year"""
+        # cars bought outright skip building the repayment schedule
+        if self.loan_amount <= 0:
+            return np.zeros(self.years)
+        schedule = self.financing
+        return schedule.resample(schedule.interest, 1, self.years)[0]
+
+    @cached_property
+    @profiled("car_costs.yearly_costs")
+    def yearly_costs(self):
+        """Gets a DataFrame of the yearly spend in each cost category"""
+        # pandas is slow to import, so it is only loaded once a DataFrame is needed
+        import pandas as pd  # pylint: disable=C0415
+
+        return pd.DataFrame(
             {
                 "insurance": self.standing_costs.insurance_cost,
                 "registration": self.standing_costs.registration_cost,
@@ -68,12 +176,28 @@ class CarCosts:
                 "fuel": self.running_costs.fuel_cost,
                 "tyres": self.running_costs.tyre_cost,
                 "service": self.running_costs.service_cost,
+                "financing": self.financing_cost,
             }
         )
 
-        self.depreciated_value = self.running_costs.depreciated_value
+    @property
+    def total_cost(self):
+        """Gets the total yearly spend across all cost categories"""
+        running = self.running_costs
+        standing = self.standing_costs
+        return (
+            standing.insurance_cost
+            + standing.registration_cost
+            + standing.roadside_assist_cost
+            + standing.detailing_cost
+            + running.depreciation_loss
+            + running.fuel_cost
+            + running.tyre_cost
+            + running.service_cost
+            + self.financing_cost
+        )
 
-        # cumulative_distance (array-like): Array giving the accumulated distance driven each year.
-        # depreciated_value (array-like): Array giving the depreciated value at the start of each year.
-        # indexed_cost_per_tyre (array-like): Indexed cost of replacement tyres.
-        # indexed_service_cost (array-like): Indexed cost of servicing for each year.
+    @property
+    def depreciated_value(self):
+        """Gets the depreciated value at the start of each year"""
+        return self.running_costs.depreciated_value
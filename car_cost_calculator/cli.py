@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Command line interface for batch cost of ownership runs
+
+Scenario files are evaluated in parallel and summarised with one row per scenario,
+holding the varying parameters, the total spend in each cost category over the whole
+horizon, and the overall total. Fleet files are streamed through `run_pipeline`,
+producing yearly costs for every vehicle.
+
+Scenario files are either CSV, with one column per varying parameter and one row per
+scenario, or JSON objects such as::
+
+    {
+        "years": 8,
+        "grid": {"km_per_year": [10000, 20000], "depreciation_rate": [0.1, 0.2]},
+        "inflation": 0.03
+    }
+
+where "grid" holds parameter values whose combinations are all evaluated, or
+"scenarios" holds either a list of parameter objects or a table of parameter columns.
+Any other keys are parameters shared by all scenarios. Numeric depreciation rates are
+flat rates.
+
+Heavy modules are imported only once needed, so pandas is never imported unless
+Parquet output or a fleet file is requested.
+"""
+
+import argparse
+import sys
+from contextlib import nullcontext
+from .profiling import Profiler, stage
+
+FORMATS = ("csv", "json", "parquet")
+
+
+def _flat_rate(value):
+    from .depreciation import FlatRate  # pylint: disable=C0415
+
+    return FlatRate(value) if isinstance(value, (int, float)) else value
+
+
+def _read_csv_table(path):
+    """Reads a CSV scenario table into columns of floats, without pandas"""
+    import csv  # pylint: disable=C0415
+    import numpy as np  # pylint: disable=C0415
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        return {}
+    return {name: np.array([float(row[name]) for row in rows]) for name in rows[0]}
+
+
+def _load_scenarios(path, years):
+    """Reads a scenario file.
+    Returns:
+        tuple: (evaluate function, keyword arguments, swept depreciation rates or None)
+    """
+    from . import sweep  # pylint: disable=C0415
+
+    if str(path).lower().endswith(".json"):
+        import json  # pylint: disable=C0415
+
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+    else:
+        spec = {"scenarios": _read_csv_table(path)}
+
+    fixed = {
+        name: _flat_rate(value) if name == "depreciation_rate" else value
+        for name, value in spec.items()
+        if name not in ("grid", "scenarios", "years")
+    }
+    fixed["years"] = years or spec.get("years", 10)
+
+    if "grid" in spec:
+        grid = dict(spec["grid"])
+        rates = grid.get("depreciation_rate")
+        if rates is not None:
+            grid["depreciation_rate"] = [_flat_rate(value) for value in rates]
+        return sweep.sweep, dict(fixed, grid=grid), rates
+
+    scenarios = spec.get("scenarios", {})
+    if isinstance(scenarios, list):
+        # list of parameter objects, which must all vary the same parameters
+        names = scenarios[0] if scenarios else {}
+        scenarios = {name: [row[name] for row in scenarios] for name in names}
+    if not scenarios:
+        raise ValueError("no scenarios found in {}".format(path))
+    return sweep.evaluate, dict(fixed, scenarios=scenarios), None
+
+
+def _summarise(result, rates=None):
+    """Gets the summary columns of a `SweepResult`, one row per scenario"""
+    columns = {}
+    for name, values in result.parameters.items():
+        if name == "depreciation_rate" and rates is not None:
+            # swept rates are stored as indices; report the rates themselves
+            values = [rates[i] for i in values]
+        columns[name] = values
+    for category, costs in result.costs.items():
+        columns[category] = costs.sum(axis=1)
+    columns["total"] = result.total_cost.sum(axis=1)
+    return {name: list(map(_scalar, values)) for name, values in columns.items()}
+
+
+def _scalar(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def _write(columns, file_format, output):
+    """Writes summary columns as CSV, JSON or Parquet"""
+    if file_format == "parquet":
+        import pandas as pd  # pylint: disable=C0415
+
+        pd.DataFrame(columns).to_parquet(output, index=False)
+        return
+
+    stream = (
+        sys.stdout
+        if output is None
+        else open(output, "w", newline="", encoding="utf-8")  # pylint: disable=R1732
+    )
+    try:
+        names = list(columns)
+        rows = zip(*columns.values())
+        if file_format == "json":
+            import json  # pylint: disable=C0415
+
+            json.dump([dict(zip(names, row)) for row in rows], stream, indent=1)
+            stream.write("\n")
+        else:
+            import csv  # pylint: disable=C0415
+
+            writer = csv.writer(stream)
+            writer.writerow(names)
+            writer.writerows(rows)
+    finally:
+        if output is not None:
+            stream.close()
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="car-cost",
+        description="Evaluates car cost of ownership scenarios or fleet registers.",
+    )
+    parser.add_argument("input", help="scenario file (.json or .csv), or fleet file")
+    parser.add_argument(
+        "--fleet",
+        action="store_true",
+        help="treat the input as a fleet register (.csv, .parquet) and write yearly "
+        "costs for every vehicle",
+    )
+    parser.add_argument(
+        "-o", "--output", help="output file; defaults to standard output"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="output format; defaults to the output file extension, or csv",
+    )
+    parser.add_argument("--years", type=int, help="number of years to model")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes for scenario files (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="scenarios per task, or vehicles per chunk for fleet files",
+    )
+    parser.add_argument(
+        "--id-column", help="fleet file column identifying each vehicle"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time taken by each stage to standard error",
+    )
+    parser.add_argument(
+        "--trace", help="write a Chrome trace of the stages to this file"
+    )
+    return parser
+
+
+def main(argv=None):
+    """Runs the car-cost command.
+    Args:
+        argv (list): Command line arguments, excluding the program name.
+            Defaults to `sys.argv[1:]`.
+    Returns:
+        int: the exit status.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    file_format = args.format
+    if file_format is None and args.output is not None:
+        extension = args.output.rsplit(".", 1)[-1].lower()
+        file_format = {"pq": "parquet"}.get(extension, extension)
+    if file_format not in FORMATS:
+        file_format = "csv"
+    if file_format == "parquet" and args.output is None:
+        parser.error("parquet output needs an --output file")
+
+    if args.fleet:
+        if args.output is None:
+            parser.error("fleet files need an --output file")
+        if file_format == "json":
+            parser.error("fleet output must be csv or parquet")
+        if args.workers != 1:
+            # fleet files are streamed through a single process, one chunk at a time
+            parser.error("--workers only applies to scenario files")
+
+    profiling = args.profile or args.trace
+    with Profiler() if profiling else nullcontext() as profiler:
+        if args.fleet:
+            _run_fleet(args, file_format)
+        else:
+            _run_scenarios(args, file_format)
+
+    if args.profile:
+        profiler.report(sys.stderr)
+    if args.trace:
+        profiler.write_chrome_trace(args.trace)
+    return 0
+
+
+def _run_fleet(args, file_format):
+    with stage("cli.pipeline"):
+        from .pipeline import DEFAULT_CHUNKSIZE, run_pipeline  # pylint: disable=C0415
+
+        run_pipeline(
+            args.input,
+            args.output,
+            years=args.years or 10,
+            chunksize=args.chunk_size or DEFAULT_CHUNKSIZE,
+            id_column=args.id_column,
+            file_format=file_format,
+        )
+
+
+def _run_scenarios(args, file_format):
+    with stage("cli.load"):
+        function, arguments, rates = _load_scenarios(args.input, args.years)
+    if args.chunk_size:
+        arguments["chunk_size"] = args.chunk_size
+    with stage("cli.evaluate"):
+        result = function(workers=args.workers, **arguments)
+    with stage("cli.summarise"):
+        columns = _summarise(result, rates)
+    with stage("cli.write"):
+        _write(columns, file_format, args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
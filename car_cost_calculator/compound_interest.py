@@ -1,21 +1,74 @@
 # -*- coding: utf-8 -*-
-"Compound interest function"
+"Compound interest and price index functions"
 import numpy as np
 
 
-def compound_interest(principal: float, annual_rate: float, years: int):
+def compound_interest(principal, annual_rate, years: int, out=None, dtype=float):
     """Calculates compound interest
     Solves A = P(1+r)^t for
     P = principal
     r = annual rate
     t = number of years to compound
 
+    The principal and annual rate may be scalars or arrays, which are broadcast
+    against each other. Each element gets its own row of `years` values, so
+    arrays of N principals or rates give an N x years matrix.
+
     Args:
-        principal (float): The principal (initial) value.
-        annual_rate (float): The annual interest rate.
+        principal (float or array-like): The principal (initial) value.
+        annual_rate (float or array-like): The annual interest rate.
         years (int): Number of years to calculate.
+        out (numpy.ndarray, optional): Array to write the result into. Must have the
+            broadcast shape of principal and annual_rate, plus a trailing axis of length years.
+        dtype (data-type): Data type of the result when `out` is not given.
 
     Returns:
         an array giving the new principal for each year in the sequence.
     """
-    return np.array([principal * ((1 + annual_rate) ** yr) for yr in range(years)])
+    principal = np.asarray(principal, dtype=dtype)
+    annual_rate = np.asarray(annual_rate, dtype=dtype)
+    if out is None:
+        shape = np.broadcast_shapes(principal.shape, annual_rate.shape) + (years,)
+        out = np.empty(shape, dtype=dtype)
+
+    np.power(
+        1 + annual_rate[..., np.newaxis], np.arange(years, dtype=out.dtype), out=out
+    )
+    return np.multiply(out, principal[..., np.newaxis], out=out)
+
+
+def price_index(inflation, years: int, steps_per_year: int = 1, dtype=float):
+    """Calculates a price index, relative to prices at the start of the first period.
+
+    The index in each period is the product of one plus the inflation rate of every
+    earlier period, so a single index serves every price in the model. Inflation may
+    vary from year to year, given as one rate per year along the last axis; leading
+    axes, if any, hold separate vehicles.
+
+    Args:
+        inflation (float or array-like): Annual inflation rate. The last axis has one
+            rate per year, or a single rate that applies to every year.
+        years (int): Number of years to calculate.
+        steps_per_year (int): Number of periods per year. Each year's rate is spread
+            evenly over its periods, compounding to the annual rate.
+        dtype (data-type): Data type of the result.
+
+    Returns:
+        an array of the index in each period, with `years * steps_per_year` periods
+            along the last axis.
+    """
+    rate = np.asarray(inflation, dtype=dtype)
+    if rate.ndim == 0:
+        rate = rate[np.newaxis]
+    assert rate.shape[-1] in (1, years), "inflation needs one rate per year"
+    if steps_per_year != 1:
+        rate = (1 + rate) ** (1.0 / steps_per_year) - 1
+    periods = years * steps_per_year
+    if rate.shape[-1] == 1:
+        return compound_interest(1.0, rate[..., 0], periods, dtype=dtype)
+
+    rate = np.repeat(rate, steps_per_year, axis=-1)
+    index = np.empty(rate.shape, dtype=dtype)
+    index[..., 0] = 1
+    np.cumprod(1 + rate[..., :-1], axis=-1, out=index[..., 1:])
+    return index
@@ -2,6 +2,7 @@
 "Depreciation functions"
 # pylint: disable=R0903
 import numpy as np
+from ._lazy import frozen
 
 
 class TwoStageRate:
@@ -20,11 +21,41 @@ class TwoStageRate:
         self.__stage_2_rate = stage_2_rate
         self.__breakpoint = breakpoint
 
+    def __repr__(self):
+        return "TwoStageRate(stage_1_rate={!r}, stage_2_rate={!r}, breakpoint={!r})".format(
+            self.__stage_1_rate, self.__stage_2_rate, self.__breakpoint
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, TwoStageRate) and self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __key(self):
+        return (
+            frozen(self.__stage_1_rate),
+            frozen(self.__stage_2_rate),
+            frozen(self.__breakpoint),
+        )
+
     def __call__(self, year):
         if year < self.__breakpoint:
             return self.__stage_1_rate
         return self.__stage_2_rate
 
+    def rates(self, ages):
+        """Gets the depreciation rate for every age in an array of ages.
+
+        Stage rates and breakpoints given as arrays apply per vehicle,
+        along the leading axes of `ages`.
+        """
+        return np.where(
+            ages < np.asarray(self.__breakpoint)[..., np.newaxis],
+            np.asarray(self.__stage_1_rate)[..., np.newaxis],
+            np.asarray(self.__stage_2_rate)[..., np.newaxis],
+        )
+
 
 class FlatRate:
     """Flat-rate depreciation rate function object"""
@@ -32,15 +63,84 @@ class FlatRate:
     def __init__(self, rate: float = 0.1):
         self.__rate = rate
 
+    def __repr__(self):
+        return "FlatRate(rate={!r})".format(self.__rate)
+
+    def __eq__(self, other):
+        return isinstance(other, FlatRate) and frozen(self.__rate) == frozen(other.__rate)
+
+    def __hash__(self):
+        return hash(frozen(self.__rate))
+
     def __call__(self, year: int):
         return self.__rate
 
+    def rates(self, ages):
+        """Gets the depreciation rate for every age in an array of ages.
+
+        A rate given as an array applies per vehicle, along the leading axes of `ages`.
+        """
+        rate = np.asarray(self.__rate, dtype=float)[..., np.newaxis]
+        return np.broadcast_to(rate, np.broadcast_shapes(rate.shape, np.shape(ages)))
+
+
+class PiecewiseRate:
+    """Depreciation rate function with any number of stages.
+
+       Each stage has its own rate, and `breakpoints` gives the age at which each stage
+       after the first begins, so `PiecewiseRate([0.2, 0.15, 0.1], [1, 4])` depreciates
+       at 20% in the first year, 15% for the next three, then 10% after that.
+    """
+
+    def __init__(self, rates=(0.15, 0.10), breakpoints=(3,)):
+        """Initialise the rate function
+        Args:
+            rates (sequence): Rate of each stage. An array with a leading axis per
+                vehicle, and a trailing axis of stages, gives each vehicle its own rates.
+            breakpoints (sequence): Increasing ages at which the second and later stages begin.
+        """
+        self.__rates = np.asarray(rates, dtype=float)
+        self.__breakpoints = np.asarray(breakpoints, dtype=float)
+        assert self.__rates.shape[-1] == len(self.__breakpoints) + 1
+        assert np.all(np.diff(self.__breakpoints) > 0)
+
+    def __repr__(self):
+        return "PiecewiseRate(rates={!r}, breakpoints={!r})".format(
+            self.__rates.tolist(), self.__breakpoints.tolist()
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, PiecewiseRate) and self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __key(self):
+        return (frozen(self.__rates), frozen(self.__breakpoints))
+
+    def __call__(self, year):
+        stage = np.searchsorted(self.__breakpoints, year, side="right")
+        if self.__rates.ndim == 1:
+            return self.__rates[stage]
+        return self.__rates[..., stage]
+
+    def rates(self, ages):
+        """Gets the depreciation rate for every age in an array of ages.
+
+        Per-vehicle rates apply along the leading axes of `ages`.
+        """
+        stage = np.searchsorted(self.__breakpoints, ages, side="right")
+        if self.__rates.ndim == 1:
+            return self.__rates[stage]
+        return np.take_along_axis(self.__rates, stage, axis=-1)
+
 
 def calculate(
     initial_value: float,
     years: int = 10,
     initial_age: int = 0,
     rate: callable = FlatRate(),
+    steps_per_year: int = 1,
 ):
     """ Calculates the yearly depreciated value for a range of years,
         given an initial value, the number of years,
@@ -51,13 +151,40 @@ def calculate(
             initial_age(int): vehicle age at start
             rate (callable): Function accepting a single int that
                 returns the depreciation rate to use for the given age in years.
+            steps_per_year (int): number of time steps per year. The yearly rate for each
+                age is spread evenly over the steps, compounding to the same yearly loss.
+        Initial value and age may also be arrays with one value per vehicle, in which case
+        the results have one row per vehicle.
         Returns:
-            dep_value: numpy array containing the depreciated value at the start of each year.
+            dep_value: numpy array containing the depreciated value at the start of each year
+                (or step).
             yearly_loss: numpy array containing the depreciation loss for
-                each year, defined as the difference in value between the
+                each year (or step), defined as the difference in value between the
                 start and end of the year.
     """
 
+    if (
+        hasattr(rate, "rates")
+        or np.ndim(initial_value)
+        or np.ndim(initial_age)
+        or steps_per_year != 1
+    ):
+        # value at the start of each step is the initial value less all prior losses
+        rates = rate_schedule(rate, np.add.outer(initial_age, np.arange(years)))
+        if steps_per_year != 1:
+            rates = 1 - (1 - np.repeat(rates, steps_per_year, axis=-1)) ** (
+                1.0 / steps_per_year
+            )
+        dep_value = np.ones(
+            np.broadcast_shapes(
+                np.shape(initial_value) + (years * steps_per_year,), rates.shape
+            )
+        )
+        dep_value[..., 1:] = np.cumprod(1 - rates, axis=-1)[..., :-1]
+        dep_value *= np.asarray(initial_value, dtype=float)[..., np.newaxis]
+        return dep_value, dep_value * rates
+
+    # arbitrary rate functions are called once per year
     dep_value = np.zeros(years)
     yearly_loss = np.zeros(years)
     previous = initial_value
@@ -70,3 +197,21 @@ def calculate(
         previous -= yearly_loss[year]
 
     return dep_value, yearly_loss
+
+
+def rate_schedule(rate: callable, ages):
+    """ Gets the depreciation rate for every age in an array of ages.
+        Uses the vectorized `rates` method of the rate function where available,
+        otherwise calls the rate function once for each distinct age.
+        Args:
+            rate (callable): depreciation rate function.
+            ages (array-like): vehicle ages in years.
+        Returns:
+            numpy array of depreciation rates, with the same shape as ages.
+    """
+    if hasattr(rate, "rates"):
+        return np.asarray(rate.rates(ages), dtype=float)
+
+    unique_ages, inverse = np.unique(ages, return_inverse=True)
+    unique_rates = np.array([rate(age) for age in unique_ages], dtype=float)
+    return unique_rates[inverse].reshape(np.shape(ages))
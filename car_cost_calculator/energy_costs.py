@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""Energy costs of electric, plug-in hybrid and combustion vehicles
+
+An `EnergyModel` describes how a vehicle is powered: its electricity consumption, the
+share of distance driven on electricity, and where and when it is charged. Home
+charging may be priced by a `TimeOfUseTariff`, whose rates are looked up for whole
+charging profiles at once, so a year of hourly charging for thousands of vehicles is
+priced with one matrix product.
+"""
+
+import numpy as np
+from ._lazy import frozen
+from .compound_interest import price_index
+from .fuel_costs import fuel_used
+
+HOURS_PER_DAY = 24
+DAYS_PER_WEEK = 7
+
+# Share of home charging in each hour of the day when charging overnight, 10pm to 6am
+OVERNIGHT_CHARGING = np.array([1 / 8] * 6 + [0.0] * 16 + [1 / 8] * 2)
+
+
+def energy_used(distance_km, kwh_per_100km):
+    """
+    Calculates the electrical energy used for a given distance and consumption.
+
+    Args:
+        distance_km (float or array-like): Distance driven in km.
+        kwh_per_100km (float or array-like): Energy consumption in kWh per 100km.
+
+    Returns:
+        float or array-like: energy used in kWh.
+    """
+    return distance_km * kwh_per_100km / 100.0
+
+
+class TimeOfUseTariff:
+    """Electricity tariff whose price depends on the time of day, and optionally on
+    whether it is a weekday or the weekend.
+
+    Times are in hours from midnight at the start of a Monday, so hour 24 is Tuesday
+    midnight and hour 120 is Saturday midnight.
+
+    Attributes:
+        start_hours (array-like): Hour of the day at which each tariff period starts,
+            in increasing order from 0.
+        rates (array-like): Weekday price per kWh in each period.
+        weekend_rates (array-like): Weekend price per kWh in each period.
+    """
+
+    def __init__(self, start_hours, rates, weekend_rates=None):
+        """Initialise the tariff
+        Args:
+            start_hours (sequence): Hour of the day at which each tariff period starts.
+                The first period starts at 0.
+            rates (sequence): Weekday price per kWh in each period.
+            weekend_rates (sequence): Weekend price per kWh in each period. Defaults to
+                the weekday prices.
+        """
+        self.start_hours = np.asarray(start_hours, dtype=float)
+        self.rates = np.asarray(rates, dtype=float)
+        self.weekend_rates = (
+            self.rates
+            if weekend_rates is None
+            else np.asarray(weekend_rates, dtype=float)
+        )
+        assert self.start_hours[0] == 0, "the first tariff period must start at 0"
+        assert np.all(np.diff(self.start_hours) > 0)
+        assert self.start_hours[-1] < HOURS_PER_DAY
+        assert self.rates.shape == self.start_hours.shape
+        assert self.weekend_rates.shape == self.start_hours.shape
+        # rows of weekday and weekend rates, indexed by [weekend, period]
+        self.__table = np.stack([self.rates, self.weekend_rates])
+
+    def __repr__(self):
+        return (
+            "TimeOfUseTariff(start_hours={!r}, rates={!r}, weekend_rates={!r})".format(
+                self.start_hours.tolist(),
+                self.rates.tolist(),
+                self.weekend_rates.tolist(),
+            )
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, TimeOfUseTariff) and self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __key(self):
+        return (
+            frozen(self.start_hours),
+            frozen(self.rates),
+            frozen(self.weekend_rates),
+        )
+
+    def rates_at(self, hours):
+        """Gets the price per kWh at each of an array of times, in hours from Monday midnight"""
+        hours = np.asarray(hours, dtype=float)
+        period = (
+            np.searchsorted(
+                self.start_hours, np.mod(hours, HOURS_PER_DAY), side="right"
+            )
+            - 1
+        )
+        weekend = np.mod(hours // HOURS_PER_DAY, DAYS_PER_WEEK) >= 5
+        return self.__table[weekend.astype(np.intp), period]
+
+    def cost(self, energy, start_hour: float = 0.0, step_hours: float = 1.0):
+        """Prices a charging profile given as the energy drawn in each time step.
+
+        Each step is priced at the rate in effect at its start, so steps should not
+        span a change of tariff period; hourly steps suit most tariffs.
+
+        Args:
+            energy (array-like): kWh drawn in each step, along the last axis. Leading
+                axes, if any, hold separate vehicles.
+            start_hour (float): Time of the first step, in hours from Monday midnight.
+            step_hours (float): Length of each step in hours.
+        Returns:
+            numpy.array: the cost of each profile.
+        """
+        energy = np.asarray(energy, dtype=float)
+        steps = energy.shape[-1]
+        return energy @ self.rates_at(start_hour + step_hours * np.arange(steps))
+
+    def day_prices(self, profile=OVERNIGHT_CHARGING):
+        """Gets the average price per kWh on each day of the week, Monday first, when
+        charging with the given daily profile.
+        Args:
+            profile (array-like): Share of each day's charging in each hour of the day.
+        """
+        profile = np.asarray(profile, dtype=float)
+        assert profile.shape == (HOURS_PER_DAY,)
+        hours = np.arange(DAYS_PER_WEEK * HOURS_PER_DAY).reshape(DAYS_PER_WEEK, -1)
+        return self.rates_at(hours) @ (profile / profile.sum())
+
+    def daily_cost(self, energy, profile=OVERNIGHT_CHARGING, start_day: int = 0):
+        """Prices daily charging, spread over each day with the same profile.
+        Args:
+            energy (array-like): kWh charged on each day, along the last axis.
+            profile (array-like): Share of each day's charging in each hour of the day.
+            start_day (int): Day of the week of the first day, with Monday as 0.
+        Returns:
+            numpy.array: the cost of the charging on each day, with the shape of `energy`.
+        """
+        energy = np.asarray(energy, dtype=float)
+        days = np.mod(start_day + np.arange(energy.shape[-1]), DAYS_PER_WEEK)
+        return energy * self.day_prices(profile)[days]
+
+    def average_price(self, profile=OVERNIGHT_CHARGING):
+        """Gets the average price per kWh over a week of charging with the given daily profile"""
+        return self.day_prices(profile).mean()
+
+
+# EnergyModel attributes that may be given per vehicle
+_VEHICLE_ATTRIBUTES = (
+    "kwh_per_100km",
+    "electric_share",
+    "home_charging_share",
+    "home_price",
+    "public_price",
+)
+
+
+class EnergyModel:
+    """Energy use and prices of a vehicle powered by fuel, electricity, or both.
+
+    A battery electric vehicle has `electric_share` 1, a combustion vehicle 0, and a
+    plug-in hybrid drives the given share of its distance on electricity, using fuel
+    for the rest. Electric charging is split between home, priced at a flat rate or by
+    a `TimeOfUseTariff` with a daily charging profile, and public chargers.
+
+    Every attribute may be an array with one value per vehicle, for fleets.
+
+    Attributes:
+        kwh_per_100km (float or array-like): Electricity consumption when driving on electricity.
+        electric_share (float or array-like): Share of distance driven on electricity.
+        home_charging_share (float or array-like): Share of charging done at home.
+        home_price (float or TimeOfUseTariff): Home electricity price per kWh, or tariff.
+        public_price (float or array-like): Public charging price per kWh.
+        charging_profile (array-like): Share of each day's home charging in each hour,
+            used to price a time-of-use tariff.
+    """
+
+    def __init__(
+        self,
+        kwh_per_100km=18.0,
+        electric_share=1.0,
+        home_charging_share=0.8,
+        home_price=0.30,
+        public_price=0.60,
+        charging_profile=OVERNIGHT_CHARGING,
+    ):
+        """Initialise the energy model
+        Args:
+            kwh_per_100km (float or array-like): Electricity consumption when driving on electricity.
+            electric_share (float or array-like): Share of distance driven on electricity:
+                1 for an electric vehicle, 0 for a combustion vehicle.
+            home_charging_share (float or array-like): Share of charging done at home.
+            home_price (float or TimeOfUseTariff): Home electricity price per kWh in the
+                first year, or a tariff.
+            public_price (float or array-like): Public charging price per kWh in the first year.
+            charging_profile (array-like): Share of each day's home charging in each hour
+                of the day, for a time-of-use tariff.
+        """
+        self.kwh_per_100km = kwh_per_100km
+        self.electric_share = electric_share
+        self.home_charging_share = home_charging_share
+        self.home_price = home_price
+        self.public_price = public_price
+        self.charging_profile = charging_profile
+        assert np.all(
+            (np.asarray(electric_share) >= 0) & (np.asarray(electric_share) <= 1)
+        )
+        assert np.all(
+            (np.asarray(home_charging_share) >= 0)
+            & (np.asarray(home_charging_share) <= 1)
+        )
+
+    def __repr__(self):
+        return (
+            "EnergyModel(kwh_per_100km={!r}, electric_share={!r}, "
+            "home_charging_share={!r}, home_price={!r}, public_price={!r})".format(
+                self.kwh_per_100km,
+                self.electric_share,
+                self.home_charging_share,
+                self.home_price,
+                self.public_price,
+            )
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, EnergyModel) and self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __key(self):
+        return tuple(frozen(getattr(self, name)) for name in _VEHICLE_ATTRIBUTES) + (
+            frozen(self.charging_profile),
+        )
+
+    @property
+    def vehicles(self):
+        """Gets the number of vehicles the attributes are given for, or 1 if they are
+        all shared"""
+        return max([np.size(getattr(self, name)) for name in _VEHICLE_ATTRIBUTES] + [1])
+
+    def select(self, index):
+        """Gets the energy model of some of the vehicles, such as a slice of a fleet.
+        Attributes shared by all vehicles are kept as they are."""
+        attributes = {
+            name: (
+                np.asarray(getattr(self, name))[index]
+                if np.size(getattr(self, name)) > 1
+                else getattr(self, name)
+            )
+            for name in _VEHICLE_ATTRIBUTES
+        }
+        return EnergyModel(charging_profile=self.charging_profile, **attributes)
+
+    @property
+    def electricity_price(self):
+        """Gets the average price per kWh over home and public charging"""
+        home_price = self.home_price
+        if isinstance(home_price, TimeOfUseTariff):
+            home_price = home_price.average_price(self.charging_profile)
+        home_share = np.asarray(self.home_charging_share)
+        return home_share * home_price + (1 - home_share) * np.asarray(
+            self.public_price
+        )
+
+    def cost_per_km(self, litres_per_100km, fuel_price):
+        """Gets the energy cost per km at first-year prices.
+        Args:
+            litres_per_100km (float or array-like): Fuel consumption when driving on fuel.
+            fuel_price (float or array-like): Price per litre of fuel.
+        """
+        share = np.asarray(self.electric_share)
+        fuel = fuel_used(1.0, np.asarray(litres_per_100km)) * np.asarray(fuel_price)
+        electricity = (
+            energy_used(1.0, np.asarray(self.kwh_per_100km)) * self.electricity_price
+        )
+        return (1 - share) * fuel + share * electricity
+
+
+def energy_cost_per_km(litres_per_100km, fuel_price, energy_model=None):
+    """
+    Calculates the energy cost per km at first-year prices, of fuel alone or of the mix
+    of fuel and electricity given by an energy model.
+
+    Args:
+        litres_per_100km (float or array-like): Fuel consumption when driving on fuel.
+        fuel_price (float or array-like): Price per litre of fuel.
+        energy_model (EnergyModel): how the vehicle is powered and charged, or None for
+            a vehicle that only uses fuel.
+
+    Returns:
+        float or array-like: energy cost per km.
+    """
+    if energy_model is None:
+        return fuel_used(1.0, np.asarray(litres_per_100km)) * np.asarray(fuel_price)
+    return energy_model.cost_per_km(litres_per_100km, fuel_price)
+
+
+def yearly_energy_cost(
+    energy_model,
+    km_per_year,
+    years: int,
+    inflation,
+    litres_per_100km=0.0,
+    initial_fuel_price=0.0,
+):
+    """
+    Calculates the yearly indexed energy cost of a vehicle, with fuel and electricity
+    prices both indexed by inflation. Mirrors `fuel_costs.yearly_fuel_cost`.
+
+    Args:
+        energy_model (EnergyModel): how the vehicle is powered and charged.
+        km_per_year (float or array-like): Distance driven per year, or in each year.
+        years (int): Number of years to calculate.
+        inflation (float or array-like): Inflation rate, overall or in each year.
+        litres_per_100km (float or array-like): Fuel consumption when driving on fuel.
+        initial_fuel_price (float or array-like): Price per litre of fuel in the first year.
+
+    Returns:
+        numpy.array: Yearly energy cost.
+    """
+    cost_per_km = energy_model.cost_per_km(litres_per_100km, initial_fuel_price)
+    return price_index(inflation, years) * (np.asarray(km_per_year) * cost_per_km)
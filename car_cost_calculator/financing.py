@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""Vehicle finance: amortization schedules of one loan or a whole loan book
+
+Loans are level-repayment loans with an optional balloon (residual) payment due with
+the final repayment. Every schedule is calculated in closed form for all loans at once,
+so a book of 100,000 loans with different rates and terms takes a single vectorized
+pass, with no per-loan Python loops.
+"""
+
+from functools import cached_property
+import numpy as np
+
+# Repayments per year of a typical car loan
+PERIODS_PER_YEAR = 12
+
+
+def _loan_arrays(principal, annual_rate, term, balloon, periods_per_year, dtype):
+    """Broadcasts loan parameters to 1-D arrays, with the number of repayments per loan"""
+    principal, annual_rate, term, balloon = (
+        np.atleast_1d(value)
+        for value in np.broadcast_arrays(
+            *[
+                np.asarray(value, dtype=dtype)
+                for value in (principal, annual_rate, term, balloon)
+            ]
+        )
+    )
+    assert principal.ndim == 1, "loan parameters must be scalars or 1-D arrays"
+    assert np.all(annual_rate >= 0)
+    assert np.all(balloon <= principal)
+    repayments = np.rint(term * periods_per_year).astype(np.int64)
+    assert np.all(repayments >= 1), "loan terms must be at least one repayment"
+    return principal, annual_rate / periods_per_year, repayments, balloon
+
+
+def _payment(principal, rate, repayments, balloon):
+    """Level repayment that leaves the balloon outstanding after the final repayment"""
+    growth = (1 + rate) ** repayments
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            rate > 0,
+            (principal * growth - balloon) * rate / (growth - 1),
+            (principal - balloon) / repayments,
+        )
+
+
+def loan_payment(
+    principal,
+    annual_rate,
+    term,
+    balloon=0.0,
+    periods_per_year: int = PERIODS_PER_YEAR,
+):
+    """Calculates the level repayment of one or many loans.
+
+    Args:
+        principal (float or array-like): Amount borrowed.
+        annual_rate (float or array-like): Annual interest rate, charged on the balance
+            at `annual_rate / periods_per_year` per period.
+        term (float or array-like): Loan term in years.
+        balloon (float or array-like): Balloon payment due with the final repayment.
+        periods_per_year (int): Number of repayments per year.
+
+    Returns:
+        numpy.array: the repayment per period for each loan.
+    """
+    return _payment(
+        *_loan_arrays(principal, annual_rate, term, balloon, periods_per_year, float)
+    )
+
+
+class Amortization:
+    """Amortization schedules of one or many loans, calculated in one vectorized pass.
+
+    Each loan is drawn down at the start of the first period and repaid in equal
+    instalments at the end of each period, with any balloon paid with the final
+    instalment. Schedules have one column per period, with zeros after a loan is
+    repaid. Schedule arrays are calculated on first access.
+
+    Attributes:
+        principal (array-like): Amount borrowed on each loan.
+        rate (array-like): Interest rate per period of each loan.
+        repayments (array-like): Number of repayments of each loan.
+        balloon (array-like): Balloon payment of each loan.
+        periods_per_year (int): number of repayments per year.
+        periods (int): number of periods in the schedules.
+        payment (array-like): Level repayment per period of each loan.
+        opening_balance (array-like): Balance owed at the start of each period.
+        interest (array-like): Interest charged in each period.
+        principal_repaid (array-like): Principal repaid in each period, including the balloon.
+        balloon_payment (array-like): Balloon paid in each period.
+        closing_balance (array-like): Balance owed at the end of each period.
+    """
+
+    def __init__(
+        self,
+        principal,
+        annual_rate,
+        term,
+        balloon=0.0,
+        periods_per_year: int = PERIODS_PER_YEAR,
+        periods: int = None,
+        dtype=np.float64,
+    ):
+        """Initialise the schedules
+        Args:
+            principal (float or array-like): Amount borrowed.
+            annual_rate (float or array-like): Annual interest rate.
+            term (float or array-like): Loan term in years.
+            balloon (float or array-like): Balloon payment due with the final repayment.
+            periods_per_year (int): Number of repayments per year.
+            periods (int): Number of periods to schedule. Defaults to the longest term;
+                a shorter schedule leaves the remaining balance of longer loans unpaid.
+            dtype (data-type): Floating point type of the schedules. float32 halves the
+                memory needed for large loan books.
+        """
+        self.principal, self.rate, self.repayments, self.balloon = _loan_arrays(
+            principal, annual_rate, term, balloon, periods_per_year, dtype
+        )
+        self.periods_per_year = periods_per_year
+        self.periods = int(self.repayments.max()) if periods is None else periods
+        self.payment = _payment(
+            self.principal, self.rate, self.repayments, self.balloon
+        )
+        self.__dtype = np.dtype(dtype)
+
+    def __len__(self):
+        return len(self.principal)
+
+    @cached_property
+    def opening_balance(self):
+        """Gets the balance owed at the start of each period"""
+        # B(k) = P (1 + r)^k - A ((1 + r)^k - 1) / r = (P - A / r) (1 + r)^k + A / r
+        elapsed = np.arange(self.periods, dtype=self.__dtype)
+        charged = self.rate > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            level = np.where(charged, self.payment / self.rate, 0.0)[:, np.newaxis]
+        balance = np.power(1 + self.rate[:, np.newaxis], elapsed)
+        balance *= self.principal[:, np.newaxis] - level
+        balance += level
+        if not np.all(charged):
+            # without interest, B(k) = P - A k
+            free = np.flatnonzero(~charged)
+            balance[free] = (
+                self.principal[free, np.newaxis]
+                - self.payment[free, np.newaxis] * elapsed
+            )
+        balance[elapsed >= self.repayments[:, np.newaxis]] = 0
+        return balance
+
+    @cached_property
+    def interest(self):
+        """Gets the interest charged in each period"""
+        return self.opening_balance * self.rate[:, np.newaxis]
+
+    @property
+    def final_period(self):
+        """Gets a boolean array that is true in the period of each loan's final repayment"""
+        return np.arange(1, self.periods + 1) == self.repayments[:, np.newaxis]
+
+    @property
+    def balloon_payment(self):
+        """Gets the balloon paid in each period"""
+        return np.where(self.final_period, self.balloon[:, np.newaxis], 0.0)
+
+    @property
+    def payments(self):
+        """Gets the total paid in each period, including the balloon"""
+        scheduled = np.arange(1, self.periods + 1) <= self.repayments[:, np.newaxis]
+        return scheduled * self.payment[:, np.newaxis] + self.balloon_payment
+
+    @property
+    def principal_repaid(self):
+        """Gets the principal repaid in each period, including the balloon"""
+        return self.payments - self.interest
+
+    @property
+    def closing_balance(self):
+        """Gets the balance owed at the end of each period"""
+        balance = self.opening_balance - self.principal_repaid
+        balance[self.final_period] = 0
+        return balance
+
+    @property
+    def total_interest(self):
+        """Gets the interest charged over the scheduled periods of each loan"""
+        return self.interest.sum(axis=1)
+
+    def resample(self, schedule, steps_per_year: int, steps: int):
+        """Totals a schedule over different time steps, such as the years of a cost model.
+
+        Each period's amount falls in the step containing the end of the period.
+
+        Args:
+            schedule (array-like): A schedule of this amortization, such as `interest`.
+            steps_per_year (int): number of time steps per year.
+            steps (int): number of time steps.
+        Returns:
+            numpy.array: the schedule totals, with shape (loans, steps).
+        """
+        periods = self.periods_per_year
+        # step of the end of each period: ceil(k * steps_per_year / periods_per_year) - 1
+        step = (
+            np.arange(1, self.periods + 1) * steps_per_year + periods - 1
+        ) // periods - 1
+        if step[-1] >= steps:
+            schedule = schedule[:, step < steps]
+            step = step[step < steps]
+        result = np.zeros((len(self), steps), dtype=schedule.dtype)
+        if len(step) == 0:
+            return result
+        if steps_per_year >= periods:
+            # at most one period ends in each step
+            result[:, step] = schedule
+        else:
+            starts = np.flatnonzero(np.diff(step, prepend=-1))
+            result[:, step[starts]] = np.add.reduceat(schedule, starts, axis=1)
+        return result
+
+
+def yearly_interest(
+    principal,
+    annual_rate,
+    term,
+    balloon=0.0,
+    years: int = 10,
+    steps_per_year: int = 1,
+    periods_per_year: int = PERIODS_PER_YEAR,
+    dtype=np.float64,
+):
+    """Calculates the interest paid in each time step of a cost model, for loans taken
+    out at the start of the modelled period.
+
+    Only the scenarios with a loan are amortized, so books with many cash purchases
+    cost little extra.
+
+    Args:
+        principal (float or array-like): Amount borrowed; zero for no loan.
+        annual_rate (float or array-like): Annual interest rate.
+        term (float or array-like): Loan term in years.
+        balloon (float or array-like): Balloon payment due with the final repayment.
+        years (int): number of years to model.
+        steps_per_year (int): number of time steps per year.
+        periods_per_year (int): Number of loan repayments per year.
+        dtype (data-type): Floating point type of the result.
+    Returns:
+        numpy.array: Interest paid in each step, with shape (loans, years * steps_per_year).
+    """
+    principal, annual_rate, term, balloon = np.broadcast_arrays(
+        *[
+            np.atleast_1d(np.asarray(value, dtype=dtype))
+            for value in (principal, annual_rate, term, balloon)
+        ]
+    )
+    steps = years * steps_per_year
+    result = np.zeros((len(principal), steps), dtype=dtype)
+    loans = np.flatnonzero(principal > 0)
+    if len(loans):
+        schedule = Amortization(
+            principal[loans],
+            annual_rate[loans],
+            term[loans],
+            balloon[loans],
+            periods_per_year,
+            years * periods_per_year,
+            dtype,
+        )
+        result[loans] = schedule.resample(schedule.interest, steps_per_year, steps)
+    return result
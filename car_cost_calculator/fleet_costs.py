@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"Batched fleet cost of ownership class"
+
+import numpy as np
+from .compound_interest import price_index
+from .depreciation import FlatRate, calculate
+from .financing import yearly_interest
+from .energy_costs import energy_cost_per_km
+from .interval_events import cumulative_distance, interval_costs, service_counts
+from .profiling import stage
+
+# Cost categories, in the same order as the columns of `CarCosts.yearly_costs`
+COST_CATEGORIES = (
+    "insurance",
+    "registration",
+    "roadside_assist",
+    "detailing",
+    "depreciation",
+    "fuel",
+    "tyres",
+    "service",
+    "financing",
+)
+
+# Numeric scenario parameters that may vary between scenarios
+SCENARIO_PARAMETERS = (
+    "initial_vehicle_value",
+    "initial_vehicle_age",
+    "km_per_year",
+    "litres_per_100km",
+    "inflation",
+    "initial_fuel_price",
+    "initial_service_cost",
+    "service_interval_km",
+    "service_interval_years",
+    "tyre_replacement_interval",
+    "initial_cost_per_tyre",
+    "insurance_per_year",
+    "registration_per_year",
+    "roadside_assist_per_year",
+    "detailing_per_year",
+    "loan_amount",
+    "loan_interest_rate",
+    "loan_term_years",
+    "loan_balloon",
+)
+
+# Scenario parameters that may also vary from year to year
+YEARLY_PARAMETERS = (
+    "km_per_year",
+    "litres_per_100km",
+    "inflation",
+    "initial_fuel_price",
+)
+
+# Named time steps, giving the number of steps per year
+STEPS_PER_YEAR = {"yearly": 1, "monthly": 12, "weekly": 52, "daily": 365}
+
+
+class FleetCosts:
+    """Total cost of ownership for many scenarios, evaluated in a single vectorized pass.
+
+    Uses the same cost model as `CarCosts`, but every numeric
+    parameter may be either a scalar or a 1-D array with one value per scenario.
+    Scalars are broadcast across all scenarios. The parameters in `YEARLY_PARAMETERS`
+    may also be 2-D arrays of shape (scenarios, years), or (1, years) to share one
+    path between all scenarios, giving a value for each year. Each cost series is a 2-D numpy array
+    with shape (scenarios, years), so row `i` matches the corresponding attribute of a
+    `CarCosts` built from the parameters of scenario `i`.
+
+    With more than one time step per year, each series instead has one column per step.
+    Prices are indexed by inflation compounded at every step, depreciation is spread
+    evenly over the steps of each year, and interval events fall in the step in which
+    the interval is reached. `rollup` sums the steps back into yearly totals.
+
+    Attributes:
+        years (int): number of years calculated.
+        steps_per_year (int): number of time steps per year.
+        periods (int): total number of time steps calculated.
+        scenarios (int): number of scenarios calculated.
+        parameters (dict): The broadcast 1-D parameter arrays, keyed by parameter name.
+            Parameters given per year hold each scenario's mean over the years.
+        price_index (array-like): Inflation price index for each step, shared by every
+            indexed cost.
+        cumulative_distance (array-like): Accumulated distance driven each step.
+        depreciated_value (array-like): Depreciated value at the start of each step.
+        depreciation_loss (array-like): The depreciation loss for each step.
+        fuel_cost (array-like): Fuel spend in each step, or fuel and electricity spend with
+            an energy model.
+        tyre_cost (array-like): Spend on replacement tyres in each step.
+        service_cost (array-like): Spend on servicing in each step.
+        insurance_cost (array-like): Inflation-indexed insurance spend in each step.
+        registration_cost (array-like): Inflation-indexed registration spend in each step.
+        roadside_assist_cost (array-like): Inflation-indexed roadside assistance spend in each step.
+        detailing_cost (array-like): Inflation-indexed detailing and car wash spend in each step.
+        financing_cost (array-like): Loan interest paid in each step.
+    """
+
+    def __init__(
+        self,
+        initial_vehicle_value=40000,
+        initial_vehicle_age=0,
+        depreciation_rate=FlatRate(),
+        years: int = 10,
+        km_per_year=15000.0,
+        litres_per_100km=10.0,
+        inflation=0.02,
+        initial_fuel_price=1.50,
+        initial_service_cost=400.0,
+        service_interval_km=15000.0,
+        service_interval_years=1.0,
+        tyre_replacement_interval=15000,
+        initial_cost_per_tyre=300,
+        insurance_per_year=500,
+        registration_per_year=500,
+        roadside_assist_per_year=200,
+        detailing_per_year=120,
+        loan_amount=0.0,
+        loan_interest_rate=0.07,
+        loan_term_years=5.0,
+        loan_balloon=0.0,
+        energy_model=None,
+        steps_per_year=1,
+        dtype=np.float64,
+        expected_events: bool = False,
+    ):
+        """Initialise the fleet costs object.
+        Args:
+            initial_vehicle_value (float or array-like): Vehicle value at start of first year.
+            initial_vehicle_age (int or array-like): Age of vehicle at start of first modelling year.
+            depreciation_rate (callable or sequence): Function returning the depreciation rate
+                for a given year, shared by all scenarios, or a sequence with one such function
+                per scenario.
+            years (int): number of years to model.
+            km_per_year (float or array-like): km driven per year, or a matrix of the
+                km driven in each year.
+            litres_per_100km (float or array-like): fuel consumption, or a matrix of the
+                fuel consumption in each year.
+            inflation (float or array-like): Assumed inflation rate used for price indexing,
+                or a matrix of the rate in each year.
+            initial_fuel_price (float or array-like): Price per litre of fuel in the first year,
+                or a matrix of the price in each year before indexing by inflation.
+            initial_service_cost (float or array-like): Price per service at start of modelling period.
+            service_interval_km (float or array-like): Max distance between services.
+            service_interval_years (float or array-like): Max time in years between services.
+            tyre_replacement_interval (float or array-like): Interval in km between tyre replacements.
+            initial_cost_per_tyre (float or array-like): Replacement cost of a tyre at start of modelling period.
+            insurance_per_year (float or array-like): Cost of insurance in the first year.
+            registration_per_year (float or array-like): Cost of registration in the first year.
+            roadside_assist_per_year (float or array-like): Cost of roadside assistance in the first year.
+            detailing_per_year (float or array-like): Cost of detailing and car washes in the first year.
+            loan_amount (float or array-like): Amount borrowed at the start of the first year;
+                zero for a car bought outright.
+            loan_interest_rate (float or array-like): Annual interest rate of the loan.
+            loan_term_years (float or array-like): Loan term in years, repaid monthly.
+            loan_balloon (float or array-like): Balloon payment due at the end of the loan term.
+            energy_model (EnergyModel): How the cars are powered and charged, for electric and
+                hybrid cars, with scalar or per-scenario attributes. None for fuel only.
+            steps_per_year (int or str): number of time steps per year, or one of the names
+                in `STEPS_PER_YEAR`.
+            dtype (data-type): Floating point type of the results. float32 halves the memory
+                needed for long horizons and fine time steps.
+            expected_events (bool): Whether to cost the expected number of tyre replacements
+                and services in each step rather than whole events, so that these costs
+                change smoothly with distance and the intervals.
+        """
+        arguments = locals()
+        inputs = {
+            name: np.asarray(arguments[name], dtype=dtype)
+            for name in SCENARIO_PARAMETERS
+        }
+        yearly = {}
+        for name in YEARLY_PARAMETERS:
+            if inputs[name].ndim == 2:
+                assert (
+                    inputs[name].shape[1] == years
+                ), "{} needs one column per year".format(name)
+                yearly[name] = inputs[name]
+                inputs[name] = inputs[name].mean(axis=1)
+        values = np.broadcast_arrays(*inputs.values())
+        assert values[0].ndim <= 1, "scenario parameters must be scalars or 1-D arrays"
+        self.parameters = {
+            name: np.atleast_1d(value)
+            for name, value in zip(SCENARIO_PARAMETERS, values)
+        }
+        params = self.parameters
+        # every per-year parameter as a (scenarios, years) matrix, or (scenarios, 1) if constant
+        paths = {}
+        for name in YEARLY_PARAMETERS:
+            path = yearly.get(name, params[name][:, np.newaxis])
+            paths[name] = np.broadcast_to(path, (len(params[name]), path.shape[1]))
+
+        inflation = paths["inflation"]
+        assert np.all(inflation >= 0)
+        assert np.all(inflation <= 1.0)
+
+        steps = STEPS_PER_YEAR.get(steps_per_year, steps_per_year)
+        self.years = years
+        self.steps_per_year = steps
+        self.periods = years * steps
+        self.scenarios = len(inflation)
+        self.__dtype = np.dtype(dtype)
+
+        # every price in the model is indexed by the same price index, compounded at
+        # each step so that it matches the yearly index at the start of each year
+        size = self.scenarios * self.periods
+        with stage("fleet_costs.price_index", size):
+            self.price_index = price_index(inflation, years, steps, dtype=dtype)
+            self.cumulative_distance = cumulative_distance(
+                paths["km_per_year"], years, steps, dtype=dtype
+            )
+            step_number = np.arange(1, self.periods + 1, dtype=dtype)
+
+        with stage("fleet_costs.depreciation", size):
+            self.depreciated_value, self.depreciation_loss = self.__calc_depreciation(
+                depreciation_rate
+            )
+
+        with stage("fleet_costs.fuel", size):
+            # transposed so that per-scenario energy model attributes broadcast along
+            # the scenario axis
+            fuel_cost = (
+                paths["km_per_year"].T
+                / steps
+                * energy_cost_per_km(
+                    paths["litres_per_100km"].T,
+                    paths["initial_fuel_price"].T,
+                    energy_model,
+                )
+            ).T
+            if fuel_cost.shape[1] > 1:
+                fuel_cost = np.repeat(fuel_cost, steps, axis=1)
+            self.fuel_cost = self.price_index * fuel_cost
+
+        with stage("fleet_costs.tyres", size):
+            # assuming that 4 tyres are replaced (spares are typically longer-lasting)
+            self.tyre_cost = interval_costs(
+                self.cumulative_distance,
+                params["tyre_replacement_interval"],
+                self.price_index * params["initial_cost_per_tyre"][:, np.newaxis] * 4,
+                expected_events,
+            )
+
+        with stage("fleet_costs.service", size):
+            services = service_counts(
+                self.cumulative_distance,
+                step_number / steps,
+                paths["km_per_year"],
+                params["service_interval_km"],
+                params["service_interval_years"],
+                expected_events,
+            )
+            self.service_cost = services * (
+                self.price_index * params["initial_service_cost"][:, np.newaxis]
+            )
+
+        with stage("fleet_costs.standing", 4 * size):
+            self.__calc_standing_costs()
+
+        with stage("fleet_costs.financing", size):
+            self.financing_cost = yearly_interest(
+                params["loan_amount"],
+                params["loan_interest_rate"],
+                params["loan_term_years"],
+                params["loan_balloon"],
+                years,
+                steps,
+                dtype=dtype,
+            )
+
+    def __calc_standing_costs(self):
+        """Calculate the inflation-indexed standing costs for every scenario"""
+        params = self.parameters
+        steps = self.steps_per_year
+        self.insurance_cost = (
+            self.price_index * (params["insurance_per_year"] / steps)[:, np.newaxis]
+        )
+        self.registration_cost = (
+            self.price_index * (params["registration_per_year"] / steps)[:, np.newaxis]
+        )
+        self.roadside_assist_cost = (
+            self.price_index
+            * (params["roadside_assist_per_year"] / steps)[:, np.newaxis]
+        )
+        self.detailing_cost = (
+            self.price_index * (params["detailing_per_year"] / steps)[:, np.newaxis]
+        )
+
+    def __calc_depreciation(self, depreciation_rate):
+        """Calculate the depreciated value and yearly loss for every scenario"""
+        initial_value = self.parameters["initial_vehicle_value"]
+        initial_age = self.parameters["initial_vehicle_age"]
+
+        if callable(depreciation_rate):
+            depreciated_value, depreciation_loss = calculate(
+                initial_value,
+                self.years,
+                initial_age,
+                depreciation_rate,
+                self.steps_per_year,
+            )
+            return (
+                depreciated_value.astype(self.__dtype, copy=False),
+                depreciation_loss.astype(self.__dtype, copy=False),
+            )
+
+        assert len(depreciation_rate) == self.scenarios
+        # evaluate each distinct rate function once, over the scenarios that share it;
+        # rate objects compare by value, so equal rates built separately share a group
+        groups = {}
+        for scenario, rate in enumerate(depreciation_rate):
+            try:
+                group = groups.setdefault(rate, (rate, []))
+            except TypeError:
+                group = groups.setdefault(id(rate), (rate, []))
+            group[1].append(scenario)
+
+        depreciated_value = np.empty((self.scenarios, self.periods), self.__dtype)
+        depreciation_loss = np.empty((self.scenarios, self.periods), self.__dtype)
+        for rate, scenarios in groups.values():
+            depreciated_value[scenarios], depreciation_loss[scenarios] = calculate(
+                initial_value[scenarios],
+                self.years,
+                initial_age[scenarios],
+                rate,
+                self.steps_per_year,
+            )
+        return depreciated_value, depreciation_loss
+
+    @property
+    def costs(self):
+        """Gets a dictionary of the yearly cost arrays, keyed by cost category"""
+        return {
+            "insurance": self.insurance_cost,
+            "registration": self.registration_cost,
+            "roadside_assist": self.roadside_assist_cost,
+            "detailing": self.detailing_cost,
+            "depreciation": self.depreciation_loss,
+            "fuel": self.fuel_cost,
+            "tyres": self.tyre_cost,
+            "service": self.service_cost,
+            "financing": self.financing_cost,
+        }
+
+    @property
+    def total_cost(self):
+        """Gets the total yearly spend across all cost categories for each scenario"""
+        return sum(self.costs.values())
+
+    def rollup(self):
+        """Gets the yearly totals of each cost category, summed over the steps of each year.
+        Returns:
+            dict: 2-D array of shape (scenarios, years) for each cost category.
+        """
+        if self.steps_per_year == 1:
+            return self.costs
+        shape = (self.scenarios, self.years, self.steps_per_year)
+        return {
+            category: cost.reshape(shape).sum(axis=2)
+            for category, cost in self.costs.items()
+        }
+
+    def to_frame(self):
+        """Gets the costs as a long-format pandas DataFrame, with one row per scenario and year,
+        or per scenario and step when there is more than one step per year"""
+        import pandas as pd  # pylint: disable=C0415
+
+        frame = {
+            "scenario": np.repeat(np.arange(self.scenarios), self.periods),
+            "year": np.tile(
+                np.repeat(np.arange(self.years), self.steps_per_year), self.scenarios
+            ),
+        }
+        if self.steps_per_year != 1:
+            frame["step"] = np.tile(np.arange(self.periods), self.scenarios)
+        frame.update({category: cost.ravel() for category, cost in self.costs.items()})
+        return pd.DataFrame(frame)
+
+    @classmethod
+    def from_frame(cls, frame, **kwargs):
+        """Creates a fleet costs object from a table of scenario parameters.
+
+        Args:
+            frame: pandas DataFrame (or dictionary of arrays) with one column per varying
+                scenario parameter. A numeric "depreciation_rate" column gives each scenario
+                a flat depreciation rate. Other columns are ignored.
+            kwargs: Any other `FleetCosts` arguments, shared by all scenarios.
+        Returns:
+            FleetCosts: the evaluated scenarios, one per row of `frame`.
+        """
+        for name in SCENARIO_PARAMETERS:
+            if name in frame:
+                kwargs[name] = np.asarray(frame[name], dtype=float)
+        if "depreciation_rate" in frame:
+            kwargs["depreciation_rate"] = FlatRate(
+                np.asarray(frame["depreciation_rate"], dtype=float)
+            )
+        return cls(**kwargs)
+
+
+def iter_fleet_costs(chunk_size: int = 1000, **kwargs):
+    """Evaluates a fleet in chunks of scenarios, to bound the memory needed for long
+    horizons and fine time steps.
+
+    Args:
+        chunk_size (int): Maximum number of scenarios in each chunk.
+        kwargs: `FleetCosts` arguments. Per-scenario arrays and (scenarios, years)
+            matrices, including a sequence of depreciation rate functions and the
+            per-scenario attributes of an energy model, are split into chunks along their
+            first axis; everything else is shared.
+    Yields:
+        (int, FleetCosts): the index of the first scenario in the chunk, and its costs.
+    """
+    # scenarios run along the leading axis; scalars, single values and (1, years)
+    # paths are shared by every scenario, so they are passed to each chunk whole
+    per_scenario = [
+        name
+        for name in SCENARIO_PARAMETERS
+        if name in kwargs and np.ndim(kwargs[name]) and len(kwargs[name]) > 1
+    ]
+    count = max([len(kwargs[name]) for name in per_scenario] + [1])
+    rates = kwargs.get("depreciation_rate")
+    if rates is not None and not callable(rates):
+        per_scenario.append("depreciation_rate")
+        count = len(rates)
+    energy_model = kwargs.get("energy_model")
+    per_vehicle_energy = energy_model is not None and energy_model.vehicles > 1
+
+    for start in range(0, count, chunk_size):
+        chunk = dict(kwargs)
+        for name in per_scenario:
+            chunk[name] = kwargs[name][start : start + chunk_size]
+        if per_vehicle_energy:
+            chunk["energy_model"] = energy_model.select(
+                slice(start, start + chunk_size)
+            )
+        yield start, FleetCosts(**chunk)
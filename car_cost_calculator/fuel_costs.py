@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 "fuel cost functions"
 # pylint: disable=R0903
+import numpy as np
 from .compound_interest import compound_interest
 
 
@@ -28,6 +29,9 @@ def yearly_fuel_cost(
     """
     Calculates the yearly indexed fuel cost based on an inflation rate,
     initial fuel cost, and number of km driven per year.
+    A 1-D `km_per_year` or `litres_per_100km` gives a value for each year. For many
+    scenarios, pass them as (scenarios, 1) columns, or (scenarios, years) matrices, and
+    `inflation` or `initial_fuel_price` as 1-D arrays with one value per scenario.
 
     Args:
         km_per_year: Distance in kilometres driven per year.
@@ -37,10 +41,10 @@ def yearly_fuel_cost(
         initial_fuel_price (float): Initial fuel price in dollars per litre.
 
     Returns:
-        numpy.array: Yearly total fuel cost.
+        numpy.array: Yearly total fuel cost, shaped (scenarios, years) for per-scenario arguments.
     """
-    assert inflation >= 0
-    assert inflation <= 1.0
+    assert np.all(np.asarray(inflation) >= 0)
+    assert np.all(np.asarray(inflation) <= 1.0)
 
     fuel_used_per_year = fuel_used(km_per_year, litres_per_100km)
     indexed_fuel_cost_per_litre = compound_interest(
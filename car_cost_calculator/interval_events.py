@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"Interval event functions, for costs incurred at fixed distance or time intervals"
+
+import numpy as np
+
+
+def event_counts(cumulative, interval, expected: bool = False):
+    """
+    Counts the interval events (such as tyre replacements or services) falling in each period.
+
+    Events occur at every multiple of the interval, so the number of events up to the end of
+    a period is the floor of the cumulative distance (or time) divided by the interval, and
+    the count for each period is the difference between consecutive periods.
+
+    The expected counts instead leave out the floor, spreading events smoothly over the
+    periods. They change continuously with the distance and the interval, so they can be
+    differentiated.
+
+    Args:
+        cumulative (array-like): Cumulative distance or time at the end of each period, along
+            the last axis. Leading axes, if any, hold separate vehicles.
+        interval (float or array-like): Distance or time between events, either shared by all
+            vehicles or one per vehicle.
+        expected (bool): Whether to count expected rather than whole events.
+
+    Returns:
+        numpy.array: Number of events in each period, with the same shape as cumulative.
+    """
+    divide = np.true_divide if expected else np.floor_divide
+    events = divide(cumulative, np.asarray(interval)[..., np.newaxis])
+    return np.diff(events, axis=-1, prepend=events.dtype.type(0))
+
+
+def interval_costs(cumulative, interval, indexed_cost, expected: bool = False):
+    """
+    Calculates the cost of interval events in each period.
+
+    Args:
+        cumulative (array-like): Cumulative distance or time at the end of each period.
+        interval (float or array-like): Distance or time between events.
+        indexed_cost (array-like): Cost of a single event in each period.
+        expected (bool): Whether to cost expected rather than whole events.
+
+    Returns:
+        numpy.array: Total cost of the events in each period.
+    """
+    return event_counts(cumulative, interval, expected) * indexed_cost
+
+
+def service_counts(
+    cumulative_distance,
+    cumulative_years,
+    km_per_year,
+    service_interval_km,
+    service_interval_years,
+    expected: bool = False,
+):
+    """
+    Counts the services falling in each period, with services due at a distance or a
+    time interval, whichever is reached first.
+
+    If the service interval in km is reached within the service interval in years at the
+    average distance driven, services are counted like tyre replacements by distance;
+    otherwise they fall at every multiple of the time interval.
+
+    Args:
+        cumulative_distance (array-like): Cumulative distance at the end of each period,
+            along the last axis. Leading axes, if any, hold separate vehicles.
+        cumulative_years (array-like): Time in years at the end of each period.
+        km_per_year (float or array-like): Distance driven per year, with a trailing axis
+            of one distance per year, or of a single distance, for each vehicle.
+        service_interval_km (float or array-like): Maximum distance between services.
+        service_interval_years (float or array-like): Maximum time in years between services.
+        expected (bool): Whether to count expected rather than whole services.
+
+    Returns:
+        numpy.array: Number of services in each period.
+    """
+    average_km = np.asarray(km_per_year, dtype=float)
+    if average_km.ndim:
+        average_km = average_km.mean(axis=-1)
+    distance_first = np.asarray(service_interval_km) <= average_km * np.asarray(
+        service_interval_years
+    )
+    if distance_first.ndim == 0:
+        # a single vehicle only needs the schedule that applies
+        if distance_first:
+            return event_counts(cumulative_distance, service_interval_km, expected)
+        return event_counts(cumulative_years, service_interval_years, expected)
+    return np.where(
+        distance_first[..., np.newaxis],
+        event_counts(cumulative_distance, service_interval_km, expected),
+        event_counts(cumulative_years, service_interval_years, expected),
+    )
+
+
+def cumulative_distance(km_per_year, years: int, steps_per_year: int = 1, dtype=float):
+    """
+    Calculates the accumulated distance driven by the end of each period.
+
+    Args:
+        km_per_year (float or array-like): Distance driven per year. The last axis has one
+            distance per year, or a single distance that applies to every year; leading
+            axes, if any, hold separate vehicles.
+        years (int): Number of years to calculate.
+        steps_per_year (int): Number of periods per year, each covering an equal share
+            of the year's distance.
+        dtype (data-type): Data type of the result.
+
+    Returns:
+        numpy.array: Cumulative distance, with `years * steps_per_year` periods along the
+            last axis.
+    """
+    # calculated in double precision as distance * step / steps_per_year, so that the
+    # end of each year is exact and events at whole multiples of an interval are not
+    # pushed into the following step by rounding
+    distance = np.asarray(km_per_year, dtype=np.float64)
+    if distance.ndim == 0:
+        distance = distance[np.newaxis]
+    assert distance.shape[-1] in (1, years), "km_per_year needs one distance per year"
+    if distance.shape[-1] == 1:
+        steps = np.arange(1, years * steps_per_year + 1, dtype=np.float64)
+        return (distance * steps / steps_per_year).astype(dtype, copy=False)
+    # distance at the start of each year, plus the share of the year's distance so far
+    start = np.cumsum(distance, axis=-1) - distance
+    steps = np.arange(1, steps_per_year + 1, dtype=np.float64)
+    within = distance[..., np.newaxis] * steps / steps_per_year
+    cumulative = (start[..., np.newaxis] + within).astype(dtype, copy=False)
+    return cumulative.reshape(cumulative.shape[:-2] + (years * steps_per_year,))
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"Monte Carlo total cost of ownership simulation"
+# pylint: disable=R0903
+
+from abc import ABC, abstractmethod
+import numpy as np
+from .depreciation import FlatRate
+from .fleet_costs import COST_CATEGORIES, SCENARIO_PARAMETERS, FleetCosts
+
+# Result categories: the yearly cost categories, plus the total across all of them
+RESULT_CATEGORIES = COST_CATEGORIES + ("total",)
+
+
+class Distribution(ABC):
+    """Base class for parameter distributions sampled by `simulate`.
+
+    Subclasses are called with a `numpy.random.Generator` and a sample count,
+    and return an array of samples.
+    """
+
+    @abstractmethod
+    def __call__(self, generator, size: int):
+        """Draws `size` samples using the given generator"""
+
+
+class Uniform(Distribution):
+    """Uniform distribution between low and high"""
+
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def __call__(self, generator, size: int):
+        return generator.uniform(self.low, self.high, size)
+
+
+class Normal(Distribution):
+    """Normal distribution, with negative samples clipped to zero since all model
+    parameters are non-negative. Clipping puts the probability of a negative sample
+    at exactly zero, rather than renormalising as a truncated normal would."""
+
+    def __init__(self, mean: float, std: float):
+        self.mean = mean
+        self.std = std
+
+    def __call__(self, generator, size: int):
+        return np.maximum(generator.normal(self.mean, self.std, size), 0.0)
+
+
+class Triangular(Distribution):
+    """Triangular distribution between low and high, peaking at mode"""
+
+    def __init__(self, low: float, mode: float, high: float):
+        self.low = low
+        self.mode = mode
+        self.high = high
+
+    def __call__(self, generator, size: int):
+        return generator.triangular(self.low, self.mode, self.high, size)
+
+
+class MonteCarloResult:
+    """Percentile bands of simulated yearly costs.
+
+    Attributes:
+        samples (int): number of simulated scenarios.
+        years (int): number of years simulated.
+        percentiles (tuple): the percentiles calculated, in the range 0 to 100.
+        bands (dict): For each category in `RESULT_CATEGORIES`, an array of shape
+            (percentiles, years) giving each percentile of the yearly cost.
+        mean (dict): For each category in `RESULT_CATEGORIES`, the mean yearly cost.
+    """
+
+    def __init__(self, samples, years, percentiles, bands, mean):
+        self.samples = samples
+        self.years = years
+        self.percentiles = percentiles
+        self.bands = bands
+        self.mean = mean
+
+    def to_frame(self):
+        """Gets the results as a pandas DataFrame indexed by category and year,
+        with a mean column and one column per percentile"""
+        import pandas as pd  # pylint: disable=C0415
+
+        frames = []
+        for category in RESULT_CATEGORIES:
+            frame = pd.DataFrame(
+                self.bands[category].T,
+                columns=["p{:g}".format(p) for p in self.percentiles],
+            )
+            frame.insert(0, "mean", self.mean[category])
+            frame.insert(0, "year", np.arange(self.years))
+            frame.insert(0, "category", category)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True).set_index(["category", "year"])
+
+
+class _QuantileSketch:
+    """Mergeable fixed-memory quantile estimates for many cells at once.
+
+    Values are counted into logarithmically spaced buckets, so every estimated
+    quantile is within `relative_accuracy` of a true sample value. Values below
+    `min_value` (including zero) are counted as zero.
+    """
+
+    def __init__(
+        self, cells: int, relative_accuracy=0.001, min_value=0.01, max_value=1e10
+    ):
+        self.cells = cells
+        self.min_value = min_value
+        self.log_gamma = np.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        # bucket 0 holds the zeros, the last bucket anything at or above max_value
+        self.offset = int(np.floor(np.log(min_value) / self.log_gamma))
+        self.buckets = (
+            int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset + 1
+        )
+        self.counts = np.zeros(cells * self.buckets, dtype=np.int64)
+        self.total = np.zeros(cells)
+        self.samples = 0
+
+    def add(self, values):
+        """Adds a (samples, cells) array of values to the sketch"""
+        buckets = np.zeros(values.shape, dtype=np.int64)
+        positive = values >= self.min_value
+        buckets[positive] = (
+            np.ceil(np.log(values[positive]) / self.log_gamma).astype(np.int64)
+            - self.offset
+        )
+        np.clip(buckets, 0, self.buckets - 1, out=buckets)
+        buckets += np.arange(self.cells) * self.buckets
+        self.counts += np.bincount(buckets.ravel(), minlength=len(self.counts))
+        self.total += values.sum(axis=0)
+        self.samples += len(values)
+
+    def quantiles(self, percentiles):
+        """Gets an array of shape (percentiles, cells) of estimated quantiles"""
+        cumulative = np.cumsum(self.counts.reshape(self.cells, self.buckets), axis=1)
+        ranks = np.asarray(percentiles, dtype=float)[:, np.newaxis, np.newaxis] / 100.0
+        ranks = np.floor(ranks * (self.samples - 1))
+        bucket = np.argmax(cumulative > ranks, axis=2)
+        # bucket midpoint, in the sense of minimising the relative error
+        gamma = np.exp(self.log_gamma)
+        values = 2 * gamma ** (bucket + self.offset) / (gamma + 1)
+        return np.where(bucket == 0, 0.0, values)
+
+    @property
+    def mean(self):
+        """Gets the mean of every cell"""
+        return self.total / self.samples
+
+
+def simulate(
+    samples: int = 100000,
+    years: int = 10,
+    percentiles=(5, 25, 50, 75, 95),
+    seed=None,
+    chunk_size: int = 50000,
+    relative_accuracy: float = 0.001,
+    **parameters
+):
+    """Simulates the distribution of yearly costs under uncertain parameters.
+
+    Any `FleetCosts` scenario parameter may be given as a constant or as a `Distribution`
+    to sample from. `depreciation_rate` may also be a `Distribution`, in which case each
+    sample uses a `FlatRate` with the sampled rate. Samples are evaluated in chunks of
+    `chunk_size` scenarios and reduced into fixed-size quantile sketches, so memory use is
+    bounded by the chunk size rather than the number of samples.
+
+    Args:
+        samples (int): Number of scenarios to simulate.
+        years (int): Number of years to model.
+        percentiles (sequence): Percentiles to calculate, in the range 0 to 100.
+        seed: Seed for `numpy.random.default_rng`. The same seed gives the same results.
+        chunk_size (int): Maximum number of scenarios evaluated at once.
+        relative_accuracy (float): Maximum relative error of the estimated percentiles.
+        parameters: `FleetCosts` arguments, as constants or distributions.
+    Returns:
+        MonteCarloResult: percentile bands and means per year and cost category.
+    """
+    names = sorted(parameters)
+    for name in names:
+        assert name in SCENARIO_PARAMETERS or name == "depreciation_rate", name
+
+    # each parameter draws from its own stream, so samples do not depend on the chunk size
+    generators = dict(
+        zip(
+            names,
+            [
+                np.random.default_rng(s)
+                for s in np.random.SeedSequence(seed).spawn(len(names))
+            ],
+        )
+    )
+    sketch = _QuantileSketch(len(RESULT_CATEGORIES) * years, relative_accuracy)
+
+    for start in range(0, samples, chunk_size):
+        size = min(chunk_size, samples - start)
+        arguments = {}
+        for name in names:
+            value = parameters[name]
+            if isinstance(value, Distribution):
+                value = value(generators[name], size)
+                if name == "depreciation_rate":
+                    value = FlatRate(value)
+            arguments[name] = value
+
+        fleet = FleetCosts(years=years, **arguments)
+        costs = fleet.costs
+        yearly = np.empty((size, len(RESULT_CATEGORIES), years))
+        for index, category in enumerate(COST_CATEGORIES):
+            yearly[:, index] = costs[category]
+        yearly[:, -1] = yearly[:, :-1].sum(axis=1)
+        sketch.add(yearly.reshape(size, -1))
+
+    bands = sketch.quantiles(percentiles).reshape(
+        len(percentiles), len(RESULT_CATEGORIES), years
+    )
+    mean = sketch.mean.reshape(len(RESULT_CATEGORIES), years)
+    return MonteCarloResult(
+        samples=samples,
+        years=years,
+        percentiles=tuple(percentiles),
+        bands={c: bands[:, i] for i, c in enumerate(RESULT_CATEGORIES)},
+        mean={c: mean[i] for i, c in enumerate(RESULT_CATEGORIES)},
+    )
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"Ownership horizon and break-even comparison of candidate vehicles"
+
+import numpy as np
+from .energy_costs import EnergyModel
+from .fleet_costs import SCENARIO_PARAMETERS, YEARLY_PARAMETERS, FleetCosts
+
+
+def _combined_energy_model(energy_models):
+    """Combines the energy models of several cars into one with per-car attributes, or
+    gets None if no car has one. Cars without a model run on fuel only."""
+    if all(model is None for model in energy_models):
+        return None
+    return EnergyModel(
+        kwh_per_100km=np.array(
+            [0.0 if model is None else model.kwh_per_100km for model in energy_models]
+        ),
+        electric_share=np.array(
+            [0.0 if model is None else model.electric_share for model in energy_models]
+        ),
+        # each car's average price over home and public charging, including any tariff,
+        # priced as if all charged at home
+        home_charging_share=1.0,
+        home_price=np.array(
+            [
+                0.0 if model is None else model.electricity_price
+                for model in energy_models
+            ]
+        ),
+        public_price=0.0,
+    )
+
+
+class OwnershipComparison:
+    """Compares candidate vehicles over every ownership horizon at once.
+
+    The cost of owning a candidate for a horizon of h years is its total spend over the
+    first h years, including depreciation, so it is the purchase price less the resale
+    value plus the running and standing costs. Every horizon is answered from a single
+    cumulative sum of the yearly costs, rather than by re-running the model per horizon.
+
+    Attributes:
+        names (list): name of each candidate; defaults to the candidate indices.
+        years (int): the longest horizon considered.
+        horizons (array-like): each ownership horizon, from 1 to `years`.
+        yearly_cost (array-like): Total yearly spend, with shape (candidates, years).
+        cumulative_cost (array-like): Cost of ownership for each candidate and horizon.
+        km_per_year (array-like): km driven per year by each candidate, if known.
+    """
+
+    def __init__(self, yearly_cost, names=None, km_per_year=None):
+        """Initialise the comparison
+        Args:
+            yearly_cost (array-like): Total yearly spend of each candidate, with shape
+                (candidates, years).
+            names (list): name of each candidate.
+            km_per_year (float or array-like): km driven per year by each candidate,
+                used to express break-even points as distances.
+        """
+        self.yearly_cost = np.atleast_2d(np.asarray(yearly_cost, dtype=float))
+        candidates, self.years = self.yearly_cost.shape
+        self.names = list(range(candidates)) if names is None else list(names)
+        assert len(self.names) == candidates
+        self.horizons = np.arange(1, self.years + 1)
+        self.cumulative_cost = np.cumsum(self.yearly_cost, axis=1)
+        self.km_per_year = (
+            None
+            if km_per_year is None
+            else np.broadcast_to(np.asarray(km_per_year, dtype=float), (candidates,))
+        )
+
+    @classmethod
+    def from_fleet(cls, fleet, names=None):
+        """Creates a comparison from the scenarios of a `FleetCosts` or `SweepResult`,
+        each of which is a candidate"""
+        km_per_year = fleet.parameters.get("km_per_year")
+        return cls(fleet.total_cost, names, km_per_year)
+
+    @classmethod
+    def from_car_costs(cls, candidates, names=None):
+        """Creates a comparison from `CarCosts` candidates.
+
+        The candidates are evaluated together as a single `FleetCosts` batch, so they
+        must all model the same number of years.
+        """
+        candidates = list(candidates)
+        years = candidates[0].years
+        assert all(car.years == years for car in candidates), "years must match"
+        parameters = {
+            name: [getattr(car, name) for car in candidates]
+            for name in SCENARIO_PARAMETERS
+        }
+        for name in YEARLY_PARAMETERS:
+            if any(np.ndim(value) for value in parameters[name]):
+                # a (candidates, years) matrix, when any candidate gives per-year values
+                parameters[name] = np.stack(
+                    [
+                        np.broadcast_to(np.asarray(value, dtype=float), (years,))
+                        for value in parameters[name]
+                    ]
+                )
+        fleet = FleetCosts(
+            years=years,
+            depreciation_rate=[car.depreciation_rate for car in candidates],
+            energy_model=_combined_energy_model(
+                [car.energy_model for car in candidates]
+            ),
+            **parameters
+        )
+        return cls.from_fleet(fleet, names)
+
+    @property
+    def average_cost(self):
+        """Gets the cost of ownership per year of ownership, for each candidate and horizon"""
+        return self.cumulative_cost / self.horizons
+
+    @property
+    def cheapest(self):
+        """Gets the index of the cheapest candidate for each horizon"""
+        return np.argmin(self.cumulative_cost, axis=0)
+
+    @property
+    def cheapest_cost(self):
+        """Gets the cost of ownership of the cheapest candidate for each horizon"""
+        return np.min(self.cumulative_cost, axis=0)
+
+    @property
+    def optimal_replacement_year(self):
+        """Gets the horizon in years that minimises each candidate's average yearly cost"""
+        return np.argmin(self.average_cost, axis=1) + 1
+
+    @property
+    def minimum_average_cost(self):
+        """Gets each candidate's average yearly cost at its optimal replacement year"""
+        return np.min(self.average_cost, axis=1)
+
+    def break_even(self, first, second):
+        """Gets the time at which the cumulative costs of two candidates cross.
+
+        Spending is assumed to accrue evenly through each year, so the crossing point
+        is interpolated within the year in which the cheaper candidate changes.
+
+        Args:
+            first (int or array-like): Index of the first candidate of each pair.
+            second (int or array-like): Index of the second candidate of each pair.
+        Returns:
+            float or array-like: years of ownership until the first crossing, or NaN
+                if the cheaper candidate after the first year stays cheaper throughout.
+        """
+        first, second = np.broadcast_arrays(first, second)
+        difference = (
+            self.cumulative_cost[first.ravel()] - self.cumulative_cost[second.ravel()]
+        )
+        # the sign after one year; the break-even point is where it first flips
+        initial = np.sign(difference[:, :1])
+        crossed = (difference * initial <= 0) & (initial != 0)
+        found = crossed.any(axis=1)
+        # column of the first crossing; the year before it ends at a horizon of `year`
+        year = np.argmax(crossed, axis=1)
+
+        rows = np.arange(len(difference))
+        before = difference[rows, year - 1]
+        after = difference[rows, year]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = np.where(found, year + before / (before - after), np.nan)
+        return result.reshape(first.shape)[()]
+
+    def break_even_km(self, first, second):
+        """Gets the distance driven by the first candidate of each pair by the time their
+        cumulative costs cross, or NaN if they never cross. See `break_even`."""
+        assert self.km_per_year is not None, "km_per_year is unknown"
+        return self.break_even(first, second) * self.km_per_year[first]
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"Streaming fleet file ingestion and result export"
+
+import pandas as pd
+from .fleet_costs import FleetCosts
+from .profiling import stage
+
+# Input chunk size, in vehicles
+DEFAULT_CHUNKSIZE = 50000
+
+
+def _is_parquet(path):
+    """Gets whether a path names a Parquet file, by its extension"""
+    return str(path).lower().endswith((".parquet", ".pq"))
+
+
+def _import_parquet():
+    """Imports pyarrow for Parquet files, raising ImportError if it is not installed"""
+    try:
+        import pyarrow  # pylint: disable=C0415
+        import pyarrow.parquet  # pylint: disable=C0415
+    except ImportError as ex:
+        raise ImportError("Parquet files require the pyarrow package") from ex
+    return pyarrow
+
+
+def read_fleet(path, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Reads a fleet register in chunks.
+
+    Args:
+        path: Path to a CSV file, or a Parquet file (.parquet or .pq) if pyarrow is installed.
+            Columns named after `FleetCosts` scenario parameters give per-vehicle values.
+        chunksize (int): Maximum number of rows in each chunk.
+    Yields:
+        pandas.DataFrame: consecutive chunks of rows.
+    """
+    if _is_parquet(path):
+        pyarrow = _import_parquet()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(
+            batch_size=chunksize
+        ):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class _CsvWriter:
+    """Appends DataFrame chunks to a CSV file, writing the header with the first chunk"""
+
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(
+            self.path, mode="w" if self.header else "a", header=self.header, index=False
+        )
+        self.header = False
+
+    def close(self):
+        if self.header:
+            # no chunks at all, so create an empty file
+            open(self.path, "w", encoding="utf-8").close()
+
+
+class _ParquetWriter:
+    """Appends DataFrame chunks to a Parquet file as row groups"""
+
+    def __init__(self, path):
+        self.pyarrow = _import_parquet()
+        self.path = path
+        self.writer = None
+
+    def write(self, frame):
+        table = self.pyarrow.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def run_pipeline(
+    source,
+    destination,
+    years: int = 10,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    id_column=None,
+    file_format=None,
+    **fixed
+):
+    """Evaluates every vehicle in a fleet register, streaming yearly costs to disk.
+
+    The register is read, evaluated and written one chunk at a time, so memory use
+    depends on the chunk size rather than the size of the fleet.
+
+    Args:
+        source: Path of the fleet register; see `read_fleet`.
+        destination: Path of the output file, written as Parquet if it ends in .parquet
+            or .pq, and as CSV otherwise. Results are in long format, with one row per
+            vehicle and year, and one column per cost category.
+        years (int): number of years to model.
+        chunksize (int): Number of vehicles evaluated at once.
+        id_column (str): Input column identifying each vehicle, copied to the output.
+            Defaults to a "vehicle" column holding the input row number.
+        file_format (str): "csv" or "parquet", overriding the format implied by the
+            destination file name.
+        fixed: Any other `FleetCosts` arguments, shared by all vehicles.
+    Returns:
+        int: the number of vehicles evaluated.
+    """
+    if file_format is None:
+        file_format = "parquet" if _is_parquet(destination) else "csv"
+    assert file_format in ("csv", "parquet"), file_format
+    writer = (
+        _ParquetWriter(destination)
+        if file_format == "parquet"
+        else _CsvWriter(destination)
+    )
+    vehicles = 0
+    try:
+        for chunk in read_fleet(source, chunksize):
+            with stage("pipeline.evaluate", len(chunk)):
+                fleet = FleetCosts.from_frame(chunk, years=years, **fixed)
+            with stage("pipeline.to_frame", len(chunk)):
+                frame = fleet.to_frame()
+                scenario = frame.pop("scenario").to_numpy()
+                if id_column is None:
+                    frame.insert(0, "vehicle", scenario + vehicles)
+                else:
+                    frame.insert(0, id_column, chunk[id_column].to_numpy()[scenario])
+            with stage("pipeline.write", len(chunk)):
+                writer.write(frame)
+            vehicles += len(chunk)
+    finally:
+        writer.close()
+    return vehicles
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""Opt-in timing instrumentation for the stages of the cost model
+
+Stages of the model are marked with the `profiled` decorator or the `stage` context
+manager. They record nothing unless a `Profiler` is active, in which case each stage
+records its wall time, call count and result size into the innermost active profiler::
+
+    with Profiler() as profiler:
+        CarCosts().yearly_costs
+    profiler.report(sys.stdout)
+    profiler.write_chrome_trace("trace.json")
+
+When no profiler is active, a stage costs one extra function call.
+"""
+
+import json
+import os
+import threading
+from functools import wraps
+from time import perf_counter
+
+# active profilers, innermost last
+_ACTIVE = []
+
+
+class _NullStage:
+    """Stage context manager used when profiling is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Stage context manager that records into a profiler"""
+
+    __slots__ = ("profiler", "name", "size", "start")
+
+    def __init__(self, profiler, name, size):
+        self.profiler = profiler
+        self.name = name
+        self.size = size
+        self.start = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, self.start, perf_counter(), self.size)
+        return False
+
+
+def enabled():
+    """Gets whether any profiler is active"""
+    return bool(_ACTIVE)
+
+
+def current():
+    """Gets the innermost active profiler, or None if profiling is disabled"""
+    return _ACTIVE[-1] if _ACTIVE else None
+
+
+def stage(name, size=None):
+    """Gets a context manager timing the enclosed block as the named stage.
+    Args:
+        name (str): name of the stage.
+        size (int): number of array elements the stage produces, if known.
+    """
+    if not _ACTIVE:
+        return _NULL_STAGE
+    return _Stage(_ACTIVE[-1], name, size)
+
+
+def _size(result):
+    """Gets the number of array elements in a stage result"""
+    if isinstance(result, tuple):
+        return sum(_size(item) for item in result)
+    size = getattr(result, "size", None)
+    return size if isinstance(size, int) else 0
+
+
+def profiled(name):
+    """Decorator timing every call of a function as the named stage, recording the
+    number of array elements in its result"""
+
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _ACTIVE:
+                return function(*args, **kwargs)
+            profiler = _ACTIVE[-1]
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            profiler.record(name, start, perf_counter(), _size(result))
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+class Profiler:
+    """Records the wall time, call count and result sizes of each model stage.
+
+    Stage times include any nested stages. Statistics from worker processes can be
+    merged in with `merge`, so a parallel run is summarised as a whole.
+
+    Attributes:
+        stats (dict): [calls, seconds, min seconds, max seconds, elements] for each stage.
+        events (list): (name, start, duration, process, thread, elements) of each
+            recorded call, for tracing, up to `max_events`.
+        processes (set): IDs of the processes that contributed statistics.
+    """
+
+    def __init__(self, max_events: int = 1000000):
+        """Initialise the profiler
+        Args:
+            max_events (int): Maximum number of calls kept for the trace; statistics
+                are always complete.
+        """
+        self.max_events = max_events
+        self.stats = {}
+        self.events = []
+        self.processes = {os.getpid()}
+
+    def __enter__(self):
+        _ACTIVE.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE.remove(self)
+        return False
+
+    def record(self, name, start, stop, size=None):
+        """Records one call of a stage"""
+        duration = stop - start
+        stats = self.stats.get(name)
+        if stats is None:
+            self.stats[name] = [1, duration, duration, duration, size or 0]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = min(stats[2], duration)
+            stats[3] = max(stats[3], duration)
+            stats[4] += size or 0
+        if len(self.events) < self.max_events:
+            self.events.append(
+                (name, start, duration, os.getpid(), threading.get_ident(), size)
+            )
+
+    def state(self):
+        """Gets the statistics and events as plain data, for sending between processes"""
+        return {
+            "stats": self.stats,
+            "events": self.events,
+            "processes": sorted(self.processes),
+        }
+
+    def merge(self, state):
+        """Adds the statistics and events of another profiler's `state`"""
+        for name, (calls, seconds, low, high, elements) in state["stats"].items():
+            stats = self.stats.get(name)
+            if stats is None:
+                self.stats[name] = [calls, seconds, low, high, elements]
+            else:
+                stats[0] += calls
+                stats[1] += seconds
+                stats[2] = min(stats[2], low)
+                stats[3] = max(stats[3], high)
+                stats[4] += elements
+        room = self.max_events - len(self.events)
+        self.events.extend(tuple(event) for event in state["events"][:room])
+        self.processes.update(state["processes"])
+
+    def to_dict(self):
+        """Gets a summary of each stage, slowest first"""
+        stages = {
+            name: {
+                "calls": calls,
+                "seconds": seconds,
+                "mean_seconds": seconds / calls,
+                "min_seconds": low,
+                "max_seconds": high,
+                "elements": elements,
+            }
+            for name, (calls, seconds, low, high, elements) in sorted(
+                self.stats.items(), key=lambda item: -item[1][1]
+            )
+        }
+        return {"stages": stages, "processes": len(self.processes)}
+
+    def to_json(self, path=None):
+        """Gets the `to_dict` summary as JSON, also writing it to a file if a path is given"""
+        text = json.dumps(self.to_dict(), indent=1)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def write_chrome_trace(self, path):
+        """Writes the recorded calls in Chrome trace event format, for chrome://tracing
+        or Perfetto"""
+        origin = min((event[1] for event in self.events), default=0.0)
+        trace = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": process,
+                "tid": thread,
+                "args": {} if size is None else {"elements": size},
+            }
+            for name, start, duration, process, thread, size in self.events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+    def report(self, stream):
+        """Writes a table of the stage statistics, slowest first"""
+        stream.write(
+            "{:<32} {:>8} {:>12} {:>12} {:>14}\n".format(
+                "stage", "calls", "total (s)", "mean (ms)", "elements"
+            )
+        )
+        for name, stats in self.to_dict()["stages"].items():
+            stream.write(
+                "{:<32} {:>8} {:>12.4f} {:>12.4f} {:>14}\n".format(
+                    name,
+                    stats["calls"],
+                    stats["seconds"],
+                    stats["mean_seconds"] * 1e3,
+                    stats["elements"],
+                )
+            )
+
+
+def run_profiled(function, *arguments):
+    """Calls a function under a new profiler, returning (result, profiler state).
+    Used to collect statistics from worker processes."""
+    with Profiler() as profiler:
+        result = function(*arguments)
+    return result, profiler.state()
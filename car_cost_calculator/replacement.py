@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"Vehicle replacement policy by dynamic programming over vehicle age"
+
+import numpy as np
+from .depreciation import FlatRate
+from .fleet_costs import FleetCosts
+
+
+def cost_tables(
+    max_age: int,
+    initial_vehicle_value=40000,
+    depreciation_rate=FlatRate(),
+    age_cost_growth=0.0,
+    **parameters
+):
+    """Builds the age-indexed cost tables used by `solve`, from the cost model.
+
+    Each group is a vehicle type, such as a make and model, shared by many vehicles.
+    The tables are calculated in real terms (without inflation) from a `FleetCosts`
+    run of a new vehicle of each group over `max_age` years.
+
+    Args:
+        max_age (int): oldest age in years that a vehicle may reach.
+        initial_vehicle_value (float or array-like): Price of a new vehicle of each group.
+        depreciation_rate (callable or sequence): Depreciation rate function, shared by
+            all groups, or a sequence with one such function per group.
+        age_cost_growth (float or array-like): Yearly growth in the running and
+            standing costs with vehicle age, representing rising maintenance.
+        parameters: Any other numeric `FleetCosts` parameters, as scalars or with one
+            value per group.
+    Returns:
+        tuple: (purchase_price, resale_value, operating_cost), where purchase_price has
+            one value per group, resale_value gives the value of a vehicle of each group
+            at each age from 0 to `max_age`, and operating_cost gives the yearly cost of
+            running a vehicle of each group from each age, excluding depreciation.
+    """
+    parameters["inflation"] = 0.0
+    fleet = FleetCosts(
+        initial_vehicle_value=initial_vehicle_value,
+        initial_vehicle_age=0,
+        depreciation_rate=depreciation_rate,
+        years=max_age + 1,
+        **parameters
+    )
+    growth = np.asarray(age_cost_growth, dtype=float)[..., np.newaxis]
+    ageing = (1 + growth) ** np.arange(max_age + 1)
+    operating_cost = (fleet.total_cost - fleet.depreciation_loss) * ageing
+    return (
+        fleet.parameters["initial_vehicle_value"],
+        fleet.depreciated_value,
+        operating_cost,
+    )
+
+
+class ReplacementPolicy:
+    """Optimal keep or replace decisions for each year of a planning horizon.
+
+    Attributes:
+        horizon (int): number of years planned.
+        max_age (int): oldest age in years that a vehicle may reach.
+        replace (array-like): Boolean array of shape (horizon, groups, max_age + 1),
+            true where a vehicle of the given group and age should be replaced at the
+            start of the given year.
+        cost (array-like): Minimum cost over the whole horizon of a vehicle of each
+            group and starting age, net of the resale value at the end of the horizon.
+    """
+
+    def __init__(self, replace, cost):
+        self.replace = replace
+        self.cost = cost
+        self.horizon = replace.shape[0]
+        self.max_age = replace.shape[2] - 1
+
+    def schedule(self, initial_age, group=0):
+        """Follows the policy forward from the current age of each vehicle.
+        Args:
+            initial_age (int or array-like): Age of each vehicle at the start of the first year.
+            group (int or array-like): Group of each vehicle.
+        Returns:
+            numpy array: Boolean array of shape (vehicles, horizon), true in the years in
+                which each vehicle is replaced.
+        """
+        age, group = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(initial_age, dtype=int)), group
+        )
+        assert np.all(age <= self.max_age), "vehicles older than max_age"
+        schedule = np.empty((len(age), self.horizon), dtype=bool)
+        for year in range(self.horizon):
+            replaced = self.replace[year, group, age]
+            schedule[:, year] = replaced
+            age = np.where(replaced, 1, age + 1)
+        return schedule
+
+    def first_replacement(self, initial_age, group=0):
+        """Gets the year in which each vehicle is first replaced, or -1 if it is kept
+        for the whole horizon. See `schedule`."""
+        schedule = self.schedule(initial_age, group)
+        return np.where(schedule.any(axis=1), np.argmax(schedule, axis=1), -1)
+
+
+def solve(
+    purchase_price, resale_value, operating_cost, horizon: int, discount_rate=0.0
+):
+    """Solves for the replacement policy minimising the cost of keeping a vehicle in service.
+
+    At the start of each year a vehicle is either kept, or sold at its resale value and
+    replaced with a new vehicle of the same group. Vehicles are sold at the end of the
+    horizon. The backward recursion is vectorized over groups and ages, so its cost
+    depends on the number of groups rather than the number of vehicles.
+
+    Args:
+        purchase_price (float or array-like): Price of a new vehicle of each group.
+        resale_value (array-like): Value of a vehicle of each group at each age from 0
+            to the maximum age, with shape (groups, max_age + 1).
+        operating_cost (array-like): Yearly cost of running a vehicle of each group from
+            each age, excluding depreciation, with the same shape as `resale_value`.
+        horizon (int): number of years to plan.
+        discount_rate (float): Yearly rate at which future costs are discounted.
+    Returns:
+        ReplacementPolicy: the optimal policy.
+    """
+    resale_value = np.atleast_2d(np.asarray(resale_value, dtype=float))
+    operating_cost = np.atleast_2d(np.asarray(operating_cost, dtype=float))
+    resale_value, operating_cost = np.broadcast_arrays(resale_value, operating_cost)
+    purchase_price = np.broadcast_to(
+        np.asarray(purchase_price, dtype=float), resale_value.shape[:1]
+    )[:, np.newaxis]
+    assert resale_value.shape[1] >= 2, "max_age must be at least 1"
+    discount = 1.0 / (1.0 + discount_rate)
+
+    # cost to go from the start of each year, for a vehicle of each group and age
+    cost = -resale_value
+    replace = np.empty((horizon,) + resale_value.shape, dtype=bool)
+    for year in range(horizon - 1, -1, -1):
+        keep = np.full_like(cost, np.inf)
+        # vehicles at the maximum age must be replaced
+        keep[:, :-1] = operating_cost[:, :-1] + discount * cost[:, 1:]
+        new = operating_cost[:, :1] + discount * cost[:, 1:2]
+        renew = purchase_price - resale_value + new
+        replace[year] = renew < keep
+        cost = np.where(replace[year], renew, keep)
+    return ReplacementPolicy(replace, cost)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"Compact columnar storage of cost model results for many scenarios"
+
+import json
+import os
+import numpy as np
+from .fleet_costs import COST_CATEGORIES
+
+# Version 1 stores have no header and predate the financing cost category
+FORMAT_VERSION = 2
+
+_COSTS_FILE = "costs.npy"
+_VALUE_FILE = "depreciated_value.npy"
+_PARAMETERS_FILE = "parameters.npy"
+_HEADER_FILE = "header.json"
+
+
+class ScenarioView:
+    """Lightweight read-only view of one scenario in a `ResultStore`.
+
+    Exposes the same results as `CarCosts`, built from the store's arrays on access.
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index: int):
+        self.store = store
+        self.index = index
+
+    def __repr__(self):
+        return "ScenarioView(index={!r})".format(self.index)
+
+    @property
+    def costs(self):
+        """Gets a (years x categories) array of the yearly spend in each cost category"""
+        return self.store.costs[self.index]
+
+    @property
+    def yearly_costs(self):
+        """Gets a DataFrame of the yearly spend in each cost category"""
+        import pandas as pd  # pylint: disable=C0415
+
+        return pd.DataFrame(self.costs, columns=list(COST_CATEGORIES))
+
+    @property
+    def depreciated_value(self):
+        """Gets the depreciated value at the start of each year"""
+        return self.store.depreciated_value[self.index]
+
+    @property
+    def total_cost(self):
+        """Gets the total yearly spend across all cost categories"""
+        return self.costs.sum(axis=1)
+
+    @property
+    def parameters(self):
+        """Gets a dictionary of the varying parameter values of this scenario"""
+        parameters = self.store.parameters
+        if parameters is None:
+            return {}
+        return {name: parameters[name][self.index] for name in parameters.dtype.names}
+
+
+class ResultStore:
+    """Yearly results of many scenarios, held in contiguous arrays.
+
+    A store costs a few bytes per scenario and year, rather than the several kilobytes
+    of objects behind each `CarCosts`. Indexing a store gives a `ScenarioView`.
+    Stores can be saved to a directory of .npy files and loaded again as memory-mapped
+    arrays, so even very large stores open instantly and are read only as needed. A
+    header.json file records the format version and cost categories of a saved store.
+
+    Attributes:
+        costs (array-like): Yearly spend, with shape (scenarios, years, categories) and
+            categories in the order of `COST_CATEGORIES`.
+        depreciated_value (array-like): Depreciated value at the start of each year,
+            with shape (scenarios, years).
+        parameters (numpy.ndarray): Structured array with a field for each varying
+            parameter and one record per scenario, or None.
+        scenarios (int): number of scenarios.
+        years (int): number of years.
+    """
+
+    def __init__(self, costs, depreciated_value, parameters=None):
+        """Initialise the store
+        Args:
+            costs (array-like): Yearly spend, with shape (scenarios, years, categories).
+            depreciated_value (array-like): Depreciated values, with shape (scenarios, years).
+            parameters (dict or numpy.ndarray): 1-D array of each varying parameter, or a
+                structured array with one record per scenario.
+        """
+        self.costs = costs
+        self.depreciated_value = depreciated_value
+        self.scenarios, self.years, categories = costs.shape
+        assert categories == len(COST_CATEGORIES)
+        assert depreciated_value.shape == (self.scenarios, self.years)
+        if isinstance(parameters, dict):
+            parameters = _records(parameters, self.scenarios)
+        self.parameters = parameters
+
+    @classmethod
+    def from_results(cls, results, dtype=np.float64):
+        """Creates a store from a `FleetCosts` or `SweepResult`, keeping only the
+        parameters that vary between scenarios. Results with more than one time step
+        per year are rolled up into yearly totals."""
+        result_costs, depreciated_value = yearly_results(results)
+        costs = np.empty(depreciated_value.shape + (len(COST_CATEGORIES),), dtype=dtype)
+        for index, category in enumerate(COST_CATEGORIES):
+            costs[..., index] = result_costs[category]
+        parameters = {
+            name: values
+            for name, values in results.parameters.items()
+            if len(values) and np.any(np.asarray(values) != values[0])
+        }
+        return cls(costs, np.asarray(depreciated_value, dtype=dtype), parameters)
+
+    def __len__(self):
+        return self.scenarios
+
+    def __getitem__(self, index):
+        if not -self.scenarios <= index < self.scenarios:
+            raise IndexError(index)
+        return ScenarioView(self, index % self.scenarios)
+
+    def __iter__(self):
+        return (ScenarioView(self, index) for index in range(self.scenarios))
+
+    @property
+    def total_cost(self):
+        """Gets the total yearly spend across all cost categories for each scenario"""
+        return self.costs.sum(axis=2)
+
+    def category(self, name):
+        """Gets the (scenarios x years) yearly spend in one cost category"""
+        return self.costs[..., COST_CATEGORIES.index(name)]
+
+    def save(self, path):
+        """Saves the store to a directory of .npy files, creating it if needed"""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, _COSTS_FILE), self.costs)
+        np.save(os.path.join(path, _VALUE_FILE), self.depreciated_value)
+        parameters_file = os.path.join(path, _PARAMETERS_FILE)
+        if self.parameters is not None:
+            np.save(parameters_file, self.parameters)
+        elif os.path.exists(parameters_file):
+            os.remove(parameters_file)
+        header = {"version": FORMAT_VERSION, "categories": list(COST_CATEGORIES)}
+        with open(os.path.join(path, _HEADER_FILE), "w", encoding="utf-8") as f:
+            json.dump(header, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Loads a store saved with `save`.
+        Args:
+            path (str): the directory the store was saved to.
+            mmap_mode (str): `numpy.load` memory-map mode; None reads the arrays into memory.
+        Returns:
+            ResultStore: the loaded store.
+        Raises:
+            ValueError: if the store was saved in a different format version.
+        """
+        header_file = os.path.join(path, _HEADER_FILE)
+        version = 1
+        if os.path.exists(header_file):
+            with open(header_file, encoding="utf-8") as f:
+                version = json.load(f)["version"]
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                "result store {} has format version {}, but version {} is needed; "
+                "save it again from its results".format(path, version, FORMAT_VERSION)
+            )
+        parameters_file = os.path.join(path, _PARAMETERS_FILE)
+        return cls(
+            np.load(os.path.join(path, _COSTS_FILE), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, _VALUE_FILE), mmap_mode=mmap_mode),
+            (
+                np.load(parameters_file, mmap_mode=mmap_mode)
+                if os.path.exists(parameters_file)
+                else None
+            ),
+        )
+
+
+def yearly_results(results):
+    """Gets the yearly costs and depreciated values of a `FleetCosts` or `SweepResult`.
+    Returns:
+        tuple: (dict of (scenarios, years) cost arrays by category, depreciated value at
+            the start of each year)
+    """
+    steps = getattr(results, "steps_per_year", 1)
+    if steps == 1:
+        return results.costs, results.depreciated_value
+    return results.rollup(), results.depreciated_value[:, ::steps]
+
+
+def _records(parameters, scenarios):
+    """Packs a dictionary of parameter arrays into a structured array"""
+    if not parameters:
+        return None
+    records = np.empty(
+        scenarios,
+        dtype=[(name, np.asarray(values).dtype) for name, values in parameters.items()],
+    )
+    for name, values in parameters.items():
+        records[name] = values
+    return records
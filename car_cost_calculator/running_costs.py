@@ -1,45 +1,85 @@
 # -*- coding: utf-8 -*-
 "Running costs class"
 
+from functools import cached_property
 import numpy as np
-from .compound_interest import compound_interest
+from ._lazy import LazyInputs
+from .compound_interest import price_index
 from .depreciation import FlatRate, calculate
-from .fuel_costs import yearly_fuel_cost
+from .energy_costs import energy_cost_per_km
+from .interval_events import cumulative_distance, interval_costs, service_counts
+from .profiling import profiled
 
 
-class RunningCosts:
+class RunningCosts(LazyInputs):
     """Represents yearly running costs that depend on distance travelled.
 
+    Each cost series is calculated on first access, and recalculated after any of the inputs change.
+    Usage, fuel consumption, inflation and fuel price may each be a single value or an
+    array with one value per year, for example to model a car driven less in later years.
+
     Attributes:
+        initial_vehicle_value (float): Vehicle value at start of first year.
+        initial_vehicle_age (int): Age of vehicle at start of first modelling year.
+        depreciation_rate (callable): Function returning the depreciation rate for a given year.
         years (int): number of years calculated.
-        km_per_year (float): km driven per year.
-        litres_per_100km (float): fuel consumption.
-        inflation (float): Assumed inflation rate used for price indexing.
+        km_per_year (float or array-like): km driven per year, or in each year.
+        litres_per_100km (float or array-like): fuel consumption, overall or in each year.
+        inflation (float or array-like): Assumed inflation rate used for price indexing,
+            overall or in each year.
+        initial_fuel_price (float or array-like): Price per litre of fuel in the first year,
+            or in each year before indexing by inflation.
+        initial_service_cost (float): Price per service at start of modelling period.
+        service_interval_km (float): Max distance between services.
+        service_interval_years (float): Max time in years between services.
+        tyre_replacement_interval (float): Interval in km between tyre replacements.
+        initial_cost_per_tyre (float): Replacement cost of a tyre at start of modelling period.
+        energy_model (EnergyModel): How the car is powered and charged, or None for fuel only.
+        price_index (array-like): Inflation price index for each year, shared by every indexed cost.
         cumulative_distance (array-like): Array giving the accumulated distance driven each year.
         depreciated_value (array-like): Array giving the depreciated value at the start of each year.
         depreciation_loss (array-like): The depreciation loss for each year.
         fuel_cost (array-like): Yearly fuel spend, based on distance driven, fuel consumption and indexed fuel cost.
+            With an energy model, the yearly spend on fuel and electricity.
         tyre_cost (array-like): Yearly spend on replacement tyres.
         service_cost (array-like): Yearly spend on servicing
         indexed_cost_per_tyre (array-like): Indexed cost of replacement tyres.
         indexed_service_cost (array-like): Indexed cost of servicing for each year.
     """
 
+    _INPUTS = (
+        "initial_vehicle_value",
+        "initial_vehicle_age",
+        "depreciation_rate",
+        "years",
+        "km_per_year",
+        "litres_per_100km",
+        "inflation",
+        "initial_fuel_price",
+        "initial_service_cost",
+        "service_interval_km",
+        "service_interval_years",
+        "tyre_replacement_interval",
+        "initial_cost_per_tyre",
+        "energy_model",
+    )
+
     def __init__(
         self,
         initial_vehicle_value: float = 40000,
         initial_vehicle_age: int = 0,
         depreciation_rate: callable = FlatRate(),
         years: int = 10,
-        km_per_year: float = 15000.0,
-        litres_per_100km: float = 10.0,
-        inflation: float = 0.02,
-        initial_fuel_price: float = 1.50,
+        km_per_year=15000.0,
+        litres_per_100km=10.0,
+        inflation=0.02,
+        initial_fuel_price=1.50,
         initial_service_cost: float = 400.0,
         service_interval_km: float = 15000.0,
         service_interval_years: float = 1.0,
         tyre_replacement_interval: float = 15000,
         initial_cost_per_tyre: float = 300,
+        energy_model=None,
     ):
         """ Initialisation of the `RunningCosts` class.
         Args:
@@ -47,110 +87,113 @@ class RunningCosts:
             initial_vehicle_age (int): Age of vehicle at start of first modelling year.
             depreciation_rate (callable): Function returning the depreciation rate for a given year.
             years (int): number of years to model.
-            km_per_year (float): km driven per year.
-            litres_per_100km (float): fuel consumption.
-            inflation (float): Assumed inflation rate used for price indexing.
-            initial_fuel_price (float): Price per litre of fuel in the first year. Indexed by inflation.
+            km_per_year (float or array-like): km driven per year, or in each year.
+            litres_per_100km (float or array-like): fuel consumption, overall or in each year.
+            inflation (float or array-like): Assumed inflation rate used for price indexing,
+                overall or in each year.
+            initial_fuel_price (float or array-like): Price per litre of fuel in the first year,
+                or in each year. Indexed by inflation.
             initial_service_cost (float): Price per service at start of modelling period. Indexed by inflation.
             service_interval_km (float): Max distance between services.
             service_interval_years (float): Max time in years between services.
             tyre_replacement_interval (float): Interval in km between tyre replacements.
             initial_cost_per_tyre (float): Indexed replacement cost of a tyre at start of modelling period.
+            energy_model (EnergyModel): How the car is powered and charged, for electric and
+                hybrid cars. None for a car that only uses fuel.
         """
-        assert inflation >= 0
-        assert inflation <= 1.0
+        assert np.all(np.asarray(inflation) >= 0)
+        assert np.all(np.asarray(inflation) <= 1.0)
 
+        self.initial_vehicle_value = initial_vehicle_value
+        self.initial_vehicle_age = initial_vehicle_age
+        self.depreciation_rate = depreciation_rate
         self.years = years
         self.km_per_year = km_per_year
         self.litres_per_100km = litres_per_100km
         self.inflation = inflation
-
-        self.cumulative_distance = np.linspace(
-            km_per_year, km_per_year * years, num=years
+        self.initial_fuel_price = initial_fuel_price
+        self.initial_service_cost = initial_service_cost
+        self.service_interval_km = service_interval_km
+        self.service_interval_years = service_interval_years
+        self.tyre_replacement_interval = tyre_replacement_interval
+        self.initial_cost_per_tyre = initial_cost_per_tyre
+        self.energy_model = energy_model
+
+    @cached_property
+    def price_index(self):
+        """Gets the inflation price index for each year"""
+        return price_index(self.inflation, self.years)
+
+    @cached_property
+    def cumulative_distance(self):
+        """Gets the accumulated distance driven each year"""
+        return cumulative_distance(self.km_per_year, self.years)
+
+    @cached_property
+    @profiled("running_costs.depreciation")
+    def _depreciation(self):
+        """Depreciated value and loss, which are always calculated together"""
+        return calculate(
+            initial_value=self.initial_vehicle_value,
+            years=self.years,
+            initial_age=self.initial_vehicle_age,
+            rate=self.depreciation_rate,
         )
 
-        self.depreciated_value, self.depreciation_loss = calculate(
-            initial_value=initial_vehicle_value,
-            years=years,
-            initial_age=initial_vehicle_age,
-            rate=depreciation_rate,
-        )
+    @property
+    def depreciated_value(self):
+        """Gets the depreciated value at the start of each year"""
+        return self._depreciation[0]
 
-        self.fuel_cost = yearly_fuel_cost(
-            km_per_year=km_per_year,
-            litres_per_100km=litres_per_100km,
-            years=years,
-            inflation=inflation,
-            initial_fuel_price=initial_fuel_price,
+    @property
+    def depreciation_loss(self):
+        """Gets the depreciation loss for each year"""
+        return self._depreciation[1]
+
+    @cached_property
+    @profiled("running_costs.fuel")
+    def fuel_cost(self):
+        """Gets the yearly fuel spend, or energy spend with an energy model"""
+        return self.price_index * (
+            np.asarray(self.km_per_year)
+            * energy_cost_per_km(
+                self.litres_per_100km, self.initial_fuel_price, self.energy_model
+            )
         )
 
+    @cached_property
+    def indexed_cost_per_tyre(self):
+        """Gets the indexed cost of a set of replacement tyres"""
         # assuming that 4 tyres are replaced (spares are typically longer-lasting)
-        self.indexed_cost_per_tyre = compound_interest(
-            principal=initial_cost_per_tyre * 4, annual_rate=inflation, years=years
-        )
+        return self.price_index * (self.initial_cost_per_tyre * 4)
 
-        self.tyre_cost = self.__calc_distance_interval_costs(
-            tyre_replacement_interval,
-            self.indexed_cost_per_tyre,
+    @cached_property
+    @profiled("running_costs.tyres")
+    def tyre_cost(self):
+        """Gets the yearly spend on replacement tyres"""
+        return interval_costs(
             self.cumulative_distance,
+            self.tyre_replacement_interval,
+            self.indexed_cost_per_tyre,
         )
 
-        self.indexed_service_cost = compound_interest(
-            principal=initial_service_cost, annual_rate=inflation, years=years
-        )
-
-        self.service_cost = self.__calc_service_cost(
-            service_interval_km, service_interval_years
-        )
-
-    def __calc_service_cost(self, service_interval_km, service_interval_years):
-        """Calculate cost of services that are based on both a distance and time interval"""
-
-        # if service interval in km is less than distance travelled in min service interval years,
-        # then the service interval is calculated in the same manner as tyre replacements
-        if service_interval_km <= self.km_per_year * service_interval_years:
-            return self.__calc_distance_interval_costs(
-                service_interval_km, self.indexed_service_cost, self.cumulative_distance
-            )
-
-        # interservice distance is more than service interval time,
-        # so we hit the time-based service interval instead
-        return self.__calc_distance_interval_costs(
-            service_interval_years,
-            self.indexed_service_cost,
-            np.array(range(1, self.years + 1)),
-        )
-
-    def __calc_distance_interval_costs(
-        self, replacement_interval, yearly_indexed_cost, cumulative_distance
-    ):
-        """Calculate replacement costs that are based on fixed distance intervals"""
-        # The cumulative km milestones for tyre replacement
-        replacement_milestones = np.arange(
-            replacement_interval, cumulative_distance[-1] + 1, replacement_interval
-        )
-
-        # Indicies of the year in which each replacement will fall, based on the cumulative yearly distance
-        replacement_indicies = np.digitize(
-            x=replacement_milestones, bins=cumulative_distance, right=True
-        )
+    @cached_property
+    def indexed_service_cost(self):
+        """Gets the indexed cost of servicing for each year"""
+        return self.price_index * self.initial_service_cost
 
-        # unique year indicices and the count of replacement events in that year
-        unique_replacement_years, replacement_counts = np.unique(
-            replacement_indicies, return_counts=True
+    @cached_property
+    @profiled("running_costs.service")
+    def service_cost(self):
+        """Gets the yearly spend on servicing"""
+        return self.indexed_service_cost * service_counts(
+            self.cumulative_distance,
+            np.arange(1, self.years + 1),
+            self.km_per_year,
+            self.service_interval_km,
+            self.service_interval_years,
         )
 
-        # finally, the total yearly cost
-        yearly_cost = np.zeros(self.years)
-        for count_idx, year_idx in enumerate(unique_replacement_years):
-            try:
-                yearly_cost[year_idx] = (
-                    replacement_counts[count_idx] * yearly_indexed_cost[year_idx]
-                )
-            except IndexError:
-                continue
-        return yearly_cost
-
     @property
     def total_cost(self):
         """Gets the total yearly spend"""
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"Incrementally recalculated car cost scenario"
+
+import numpy as np
+from .compound_interest import price_index
+from .depreciation import FlatRate, calculate
+from .energy_costs import energy_cost_per_km
+from .financing import yearly_interest
+from .fleet_costs import COST_CATEGORIES
+from .interval_events import cumulative_distance, interval_costs, service_counts
+
+# Each derived value, in dependency order, with the inputs and derived values it depends on
+_DEPENDENCIES = {
+    "price_index": ("inflation", "years"),
+    "cumulative_distance": ("km_per_year", "years"),
+    "depreciation": (
+        "initial_vehicle_value",
+        "initial_vehicle_age",
+        "depreciation_rate",
+        "years",
+    ),
+    "fuel": (
+        "km_per_year",
+        "litres_per_100km",
+        "initial_fuel_price",
+        "energy_model",
+        "price_index",
+    ),
+    "tyres": (
+        "tyre_replacement_interval",
+        "initial_cost_per_tyre",
+        "cumulative_distance",
+        "price_index",
+    ),
+    "service": (
+        "km_per_year",
+        "service_interval_km",
+        "service_interval_years",
+        "initial_service_cost",
+        "cumulative_distance",
+        "price_index",
+    ),
+    "insurance": ("insurance_per_year", "price_index"),
+    "registration": ("registration_per_year", "price_index"),
+    "roadside_assist": ("roadside_assist_per_year", "price_index"),
+    "detailing": ("detailing_per_year", "price_index"),
+    "financing": (
+        "loan_amount",
+        "loan_interest_rate",
+        "loan_term_years",
+        "loan_balloon",
+        "years",
+    ),
+}
+
+_ORDER = tuple(_DEPENDENCIES)
+
+
+def _affected(changed):
+    """Gets the derived values affected by a set of changed names, in dependency order"""
+    affected = set(changed)
+    for name in _ORDER:
+        if affected.intersection(_DEPENDENCIES[name]):
+            affected.add(name)
+    return tuple(name for name in _ORDER if name in affected)
+
+
+def _check_inflation(inflation):
+    """Checks the inflation rate is in range, as `RunningCosts` does"""
+    assert np.all(np.asarray(inflation) >= 0)
+    assert np.all(np.asarray(inflation) <= 1.0)
+
+
+class Scenario:
+    """Mutable car cost of ownership scenario with incremental recalculation.
+
+    Takes the same inputs as `CarCosts`, including per-year arrays. Inputs can be changed by assignment or with
+    `update`, and only the cost series that depend on the changed inputs are recalculated.
+    For example, changing `litres_per_100km` recalculates only the fuel series.
+    The results are held in a single (years x categories) table that is patched in place,
+    so `yearly_costs` is a live DataFrame view that always reflects the current inputs.
+
+    Attributes:
+        yearly_costs (pandas.DataFrame): Yearly spend in each cost category.
+        depreciated_value (array-like): Depreciated value at the start of each year.
+        total_cost (array-like): Total yearly spend across all cost categories.
+    """
+
+    INPUTS = (
+        "initial_vehicle_value",
+        "initial_vehicle_age",
+        "depreciation_rate",
+        "years",
+        "km_per_year",
+        "litres_per_100km",
+        "inflation",
+        "initial_fuel_price",
+        "initial_service_cost",
+        "service_interval_km",
+        "service_interval_years",
+        "tyre_replacement_interval",
+        "initial_cost_per_tyre",
+        "insurance_per_year",
+        "registration_per_year",
+        "roadside_assist_per_year",
+        "detailing_per_year",
+        "loan_amount",
+        "loan_interest_rate",
+        "loan_term_years",
+        "loan_balloon",
+        "energy_model",
+    )
+
+    _AFFECTED = {name: _affected([name]) for name in INPUTS}
+
+    def __init__(
+        self,
+        initial_vehicle_value: float = 40000,
+        initial_vehicle_age: int = 0,
+        depreciation_rate: callable = FlatRate(),
+        years: int = 10,
+        km_per_year: float = 15000.0,
+        litres_per_100km: float = 10.0,
+        inflation: float = 0.02,
+        initial_fuel_price: float = 1.50,
+        initial_service_cost: float = 400.0,
+        service_interval_km: float = 15000.0,
+        service_interval_years: float = 1.0,
+        tyre_replacement_interval: float = 15000,
+        initial_cost_per_tyre: float = 300,
+        insurance_per_year: float = 500,
+        registration_per_year: float = 500,
+        roadside_assist_per_year: float = 200,
+        detailing_per_year: float = 120,
+        loan_amount: float = 0.0,
+        loan_interest_rate: float = 0.07,
+        loan_term_years: float = 5.0,
+        loan_balloon: float = 0.0,
+        energy_model=None,
+    ):
+        """Initialise the scenario, calculating every cost series"""
+        arguments = locals()
+        inputs = {name: arguments[name] for name in self.INPUTS}
+        _check_inflation(inflation)
+        object.__setattr__(self, "_inputs", inputs)
+        object.__setattr__(self, "_values", {})
+        object.__setattr__(self, "_frame", None)
+        self.__allocate()
+        self.__recalculate(_ORDER)
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["_inputs"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        if name in self.INPUTS:
+            self.update(**{name: value})
+        else:
+            object.__setattr__(self, name, value)
+
+    def update(self, **changes):
+        """Changes one or more inputs, recalculating only the affected cost series.
+        Args:
+            changes: New values for any of the scenario inputs.
+        Returns:
+            tuple: names of the recalculated values, in the order they were calculated.
+        """
+        # every input is checked before any changes, so a bad input changes nothing
+        for name in changes:
+            if name not in self.INPUTS:
+                raise AttributeError("unknown scenario input: {}".format(name))
+        if "inflation" in changes:
+            _check_inflation(changes["inflation"])
+        self._inputs.update(changes)
+
+        if len(changes) == 1:
+            affected = self._AFFECTED[next(iter(changes))]
+        else:
+            affected = _affected(changes)
+
+        if "years" in changes:
+            self.__allocate()
+        self.__recalculate(affected)
+        return affected
+
+    @property
+    def yearly_costs(self):
+        """Gets a DataFrame of the yearly spend in each cost category"""
+        if self._frame is None:
+            import pandas as pd  # pylint: disable=C0415
+
+            # shares memory with the cost table, so in-place updates show through
+            frame = pd.DataFrame(self._table, columns=list(COST_CATEGORIES), copy=False)
+            object.__setattr__(self, "_frame", frame)
+        return self._frame
+
+    @property
+    def depreciated_value(self):
+        """Gets the depreciated value at the start of each year"""
+        return self._values["depreciation"][0]
+
+    @property
+    def total_cost(self):
+        """Gets the total yearly spend across all cost categories"""
+        return self._table.sum(axis=1)
+
+    def __allocate(self):
+        """Allocates the cost table for the current number of years"""
+        object.__setattr__(self, "_table", np.zeros((self.years, len(COST_CATEGORIES))))
+        object.__setattr__(self, "_frame", None)
+
+    def __recalculate(self, names):
+        """Recalculates the given derived values, which must be in dependency order"""
+        values = self._values
+        for name in names:
+            values[name] = getattr(self, "_calc_" + name)()
+            if name in _COLUMNS:
+                # depreciation is calculated as (value, loss); the loss is the cost
+                self._table[:, _COLUMNS[name]] = (
+                    values[name][1] if name == "depreciation" else values[name]
+                )
+
+    def _calc_price_index(self):
+        return price_index(self.inflation, self.years)
+
+    def _calc_cumulative_distance(self):
+        return cumulative_distance(self.km_per_year, self.years)
+
+    def _calc_depreciation(self):
+        return calculate(
+            initial_value=self.initial_vehicle_value,
+            years=self.years,
+            initial_age=self.initial_vehicle_age,
+            rate=self.depreciation_rate,
+        )
+
+    def _calc_fuel(self):
+        cost_per_km = energy_cost_per_km(
+            self.litres_per_100km, self.initial_fuel_price, self.energy_model
+        )
+        return self._values["price_index"] * (
+            np.asarray(self.km_per_year) * cost_per_km
+        )
+
+    def _calc_tyres(self):
+        # assuming that 4 tyres are replaced (spares are typically longer-lasting)
+        return interval_costs(
+            self._values["cumulative_distance"],
+            self.tyre_replacement_interval,
+            self._values["price_index"] * (self.initial_cost_per_tyre * 4),
+        )
+
+    def _calc_service(self):
+        services = service_counts(
+            self._values["cumulative_distance"],
+            np.arange(1, self.years + 1),
+            self.km_per_year,
+            self.service_interval_km,
+            self.service_interval_years,
+        )
+        return services * self._values["price_index"] * self.initial_service_cost
+
+    def _calc_insurance(self):
+        return self._values["price_index"] * self.insurance_per_year
+
+    def _calc_registration(self):
+        return self._values["price_index"] * self.registration_per_year
+
+    def _calc_roadside_assist(self):
+        return self._values["price_index"] * self.roadside_assist_per_year
+
+    def _calc_detailing(self):
+        return self._values["price_index"] * self.detailing_per_year
+
+    def _calc_financing(self):
+        return yearly_interest(
+            self.loan_amount,
+            self.loan_interest_rate,
+            self.loan_term_years,
+            self.loan_balloon,
+            self.years,
+        )[0]
+
+
+_COLUMNS = {
+    category: index
+    for index, category in enumerate(COST_CATEGORIES)
+    if category in _DEPENDENCIES
+}
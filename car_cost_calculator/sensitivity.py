@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"Local and global sensitivity of the cost of ownership to the model inputs"
+
+from inspect import signature
+from numbers import Real
+import numpy as np
+from .depreciation import FlatRate
+from .fleet_costs import COST_CATEGORIES, SCENARIO_PARAMETERS, FleetCosts
+from .monte_carlo import RESULT_CATEGORIES
+
+
+class SensitivityResult:
+    """Sensitivity indices of the cost of ownership over the modelled horizon.
+
+    Attributes:
+        parameters (tuple): names of the parameters analysed.
+        categories (tuple): the result categories, `RESULT_CATEGORIES`.
+        indices (dict): For each index name, an array of shape (parameters, categories).
+        base (array-like): Cost of ownership in each category at the base point,
+            for local sensitivities; otherwise None.
+    """
+
+    def __init__(self, parameters, indices, base=None):
+        self.parameters = tuple(parameters)
+        self.categories = RESULT_CATEGORIES
+        self.indices = indices
+        self.base = base
+
+    def __getitem__(self, name):
+        return self.indices[name]
+
+    def ranking(self, index, category="total"):
+        """Gets the parameter names ordered from the most to the least influential,
+        by the absolute value of the given index for the given category"""
+        values = np.abs(self.indices[index][:, self.categories.index(category)])
+        return [self.parameters[i] for i in np.argsort(-values, kind="stable")]
+
+    def to_frame(self):
+        """Gets the indices as a pandas DataFrame indexed by parameter and category,
+        with one column per index"""
+        import pandas as pd  # pylint: disable=C0415
+
+        index = pd.MultiIndex.from_product(
+            [self.parameters, self.categories], names=["parameter", "category"]
+        )
+        return pd.DataFrame(
+            {name: values.ravel() for name, values in self.indices.items()},
+            index=index,
+        )
+
+
+def _evaluate(samples, count, years, fixed, chunk_size):
+    """Evaluates scenarios in chunks, returning the cost of ownership over the horizon
+    in each result category, with shape (count, categories)"""
+    totals = np.empty((count, len(RESULT_CATEGORIES)))
+    shared = dict(fixed, years=years)
+    if isinstance(shared.get("depreciation_rate"), Real):
+        shared["depreciation_rate"] = FlatRate(shared["depreciation_rate"])
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        arguments = dict(shared)
+        for name, values in samples.items():
+            values = values[start:stop]
+            arguments[name] = (
+                FlatRate(values) if name == "depreciation_rate" else values
+            )
+        costs = FleetCosts(**arguments).costs
+        for index, category in enumerate(COST_CATEGORIES):
+            totals[start:stop, index] = costs[category].sum(axis=1)
+    totals[:, -1] = totals[:, :-1].sum(axis=1)
+    return totals
+
+
+def _check_names(names):
+    for name in names:
+        assert name in SCENARIO_PARAMETERS or name == "depreciation_rate", name
+
+
+def derivatives(
+    parameters=None,
+    relative_step: float = 1e-4,
+    years: int = 10,
+    chunk_size: int = 10000,
+    **inputs
+):
+    """Calculates the partial derivatives and elasticities of the cost of ownership.
+
+    Every parameter is perturbed up and down in a single batched `FleetCosts`
+    evaluation, giving central differences. Parameters that cannot be reduced below
+    zero are differenced forwards from zero instead. Tyre replacements and services are
+    differenced as expected event counts, since whole events jump from one year to the
+    next as the distance or an interval crosses a multiple of the other.
+
+    Args:
+        parameters (sequence): Names of the parameters to analyse. Defaults to every
+            numeric scenario parameter, plus `depreciation_rate` if it is a number.
+        relative_step (float): Perturbation size, relative to each parameter value
+            (or absolute, for values smaller than one).
+        years (int): number of years to model.
+        chunk_size (int): Maximum number of scenarios evaluated at once.
+        inputs: `CarCosts` arguments at the point of interest. A numeric
+            `depreciation_rate` is a flat rate.
+    Returns:
+        SensitivityResult: with "derivative" (change in cost per unit of the parameter)
+            and "elasticity" (relative change in cost per relative change in the
+            parameter) indices. The base costs count whole events.
+    Raises:
+        ValueError: if an analysed parameter is not a single number, such as a
+            per-year path.
+    """
+    if parameters is None:
+        parameters = list(SCENARIO_PARAMETERS)
+        if isinstance(inputs.get("depreciation_rate"), Real):
+            parameters.append("depreciation_rate")
+    _check_names(parameters)
+    defaults = signature(FleetCosts).parameters
+    values = [inputs.get(name, defaults[name].default) for name in parameters]
+    for name, value in zip(parameters, values):
+        if np.ndim(value) or not isinstance(value, Real):
+            raise ValueError(
+                "{} needs a single number to differentiate at, not {!r}".format(
+                    name, value
+                )
+            )
+    point = np.array(values, dtype=float)
+    step = relative_step * np.maximum(np.abs(point), 1.0)
+    upper = point + step
+    lower = np.maximum(point - step, 0.0)
+
+    # scenario 0 is the base point, then each parameter raised, then each lowered
+    count = 2 * len(parameters) + 1
+    samples = {}
+    for index, name in enumerate(parameters):
+        values = np.full(count, point[index])
+        values[1 + index] = upper[index]
+        values[1 + len(parameters) + index] = lower[index]
+        samples[name] = values
+    fixed = {name: value for name, value in inputs.items() if name not in samples}
+    totals = _evaluate(
+        samples, count, years, dict(fixed, expected_events=True), chunk_size
+    )
+    base = _evaluate(
+        {name: point[index : index + 1] for index, name in enumerate(parameters)},
+        1,
+        years,
+        dict(fixed, expected_events=False),
+        chunk_size,
+    )[0]
+
+    raised = totals[1 : 1 + len(parameters)]
+    lowered = totals[1 + len(parameters) :]
+    derivative = (raised - lowered) / (upper - lower)[:, np.newaxis]
+    # relative to the expected costs, which the derivatives are consistent with
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elasticity = np.where(
+            totals[0] != 0, derivative * point[:, np.newaxis] / totals[0], 0.0
+        )
+    return SensitivityResult(
+        parameters, {"derivative": derivative, "elasticity": elasticity}, base
+    )
+
+
+def _bounds(ranges):
+    names = list(ranges)
+    _check_names(names)
+    low, high = np.array([ranges[name] for name in names], dtype=float).T
+    return names, low, high
+
+
+def morris(
+    ranges,
+    trajectories: int = 20,
+    levels: int = 4,
+    seed=None,
+    years: int = 10,
+    chunk_size: int = 10000,
+    **fixed
+):
+    """Screens parameters with Morris elementary effects.
+
+    Each trajectory starts from a random point on a grid of `levels` values per
+    parameter, then moves one parameter at a time by a fixed step. All trajectories
+    are evaluated together in one batched run of trajectories * (parameters + 1)
+    scenarios. Effects are in units of cost per full parameter range.
+
+    Args:
+        ranges (dict): (low, high) range of each parameter to analyse.
+        trajectories (int): number of trajectories.
+        levels (int): number of grid levels per parameter, which should be even.
+        seed: Seed for `numpy.random.default_rng`.
+        years (int): number of years to model.
+        chunk_size (int): Maximum number of scenarios evaluated at once.
+        fixed: Any other `FleetCosts` arguments, shared by all scenarios. A numeric
+            `depreciation_rate` is a flat rate.
+    Returns:
+        SensitivityResult: with "mu_star" (mean absolute effect), "mu" (mean effect)
+            and "sigma" (standard deviation of the effects) indices.
+    """
+    names, low, high = _bounds(ranges)
+    k = len(names)
+    generator = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+
+    # starting points from the lower half of the grid, so every step stays in range
+    start = generator.integers(0, levels // 2, (trajectories, k)) / (levels - 1.0)
+    direction = np.where(generator.random((trajectories, k)) < 0.5, -1.0, 1.0)
+    start = np.where(direction < 0, start + delta, start)
+    order = np.argsort(generator.random((trajectories, k)), axis=1)
+
+    # one parameter changes at each step, in a random order per trajectory
+    moves = np.zeros((trajectories, k, k))
+    rows = np.arange(trajectories)[:, np.newaxis]
+    moves[rows, np.arange(k), order] = direction[rows, order] * delta
+    points = np.empty((trajectories, k + 1, k))
+    points[:, 0] = start
+    points[:, 1:] = start[:, np.newaxis] + np.cumsum(moves, axis=1)
+
+    values = low + points.reshape(-1, k) * (high - low)
+    samples = {name: values[:, i] for i, name in enumerate(names)}
+    totals = _evaluate(samples, len(values), years, fixed, chunk_size)
+    totals = totals.reshape(trajectories, k + 1, -1)
+
+    # effect of the parameter moved at each step, scattered back into parameter order
+    steps = np.diff(totals, axis=1) / (direction[rows, order] * delta)[..., np.newaxis]
+    effects = np.empty_like(steps)
+    effects[rows, order] = steps
+    return SensitivityResult(
+        names,
+        {
+            "mu_star": np.abs(effects).mean(axis=0),
+            "mu": effects.mean(axis=0),
+            "sigma": (
+                effects.std(axis=0, ddof=1)
+                if trajectories > 1
+                else np.zeros_like(effects[0])
+            ),
+        },
+    )
+
+
+def sobol(
+    ranges,
+    samples: int = 1024,
+    seed=None,
+    years: int = 10,
+    chunk_size: int = 10000,
+    **fixed
+):
+    """Estimates Sobol variance-based sensitivity indices for uniformly varying parameters.
+
+    Uses the Saltelli sampling scheme, evaluating samples * (parameters + 2) scenarios in
+    one batched run, with the Saltelli (2010) first order and Jansen total order estimators.
+
+    Args:
+        ranges (dict): (low, high) range of each parameter to analyse.
+        samples (int): number of base samples.
+        seed: Seed for `numpy.random.default_rng`.
+        years (int): number of years to model.
+        chunk_size (int): Maximum number of scenarios evaluated at once.
+        fixed: Any other `FleetCosts` arguments, shared by all scenarios. A numeric
+            `depreciation_rate` is a flat rate.
+    Returns:
+        SensitivityResult: with "first_order" and "total_order" indices, which are zero
+            for categories that do not vary.
+    """
+    names, low, high = _bounds(ranges)
+    k = len(names)
+    generator = np.random.default_rng(seed)
+    a = generator.random((samples, k))
+    b = generator.random((samples, k))
+
+    # A, B, then each A_B(i): A with column i taken from B
+    unit = np.empty((k + 2, samples, k))
+    unit[0] = a
+    unit[1] = b
+    unit[2:] = a
+    for i in range(k):
+        unit[2 + i, :, i] = b[:, i]
+
+    values = low + unit.reshape(-1, k) * (high - low)
+    totals = _evaluate(
+        {name: values[:, i] for i, name in enumerate(names)},
+        len(values),
+        years,
+        fixed,
+        chunk_size,
+    ).reshape(k + 2, samples, -1)
+
+    # centring the outputs reduces the variance of the first order estimator
+    totals -= totals[:2].mean(axis=(0, 1))
+    f_a, f_b, f_ab = totals[0], totals[1], totals[2:]
+    variance = np.var(np.concatenate([f_a, f_b]), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    varies = variance > 0
+    return SensitivityResult(
+        names,
+        {
+            "first_order": np.where(varies, first, 0.0),
+            "total_order": np.where(varies, total, 0.0),
+        },
+    )
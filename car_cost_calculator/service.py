@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+"""Micro-batching asyncio quote service over the fleet cost model
+
+Concurrent quote requests that arrive within `max_wait` seconds of each other are
+coalesced into a single `FleetCosts` evaluation, and each caller receives its own row
+of the results. A minimal HTTP/1.1 front end is included::
+
+    python -m car_cost_calculator.service --port 8080
+    curl -d '{"km_per_year": 20000, "depreciation_rate": 0.15}' localhost:8080/quote
+    curl localhost:8080/stats
+"""
+
+import asyncio
+import json
+import time
+from inspect import signature
+import numpy as np
+from .depreciation import FlatRate
+from .fleet_costs import COST_CATEGORIES, SCENARIO_PARAMETERS, FleetCosts
+from .profiling import stage
+
+# Largest request body and number of years the server accepts
+MAX_BODY = 1 << 20
+MAX_YEARS = 100
+
+
+class ServiceOverloaded(Exception):
+    """Raised when a quote is rejected because the request queue is full"""
+
+
+class ServiceStats:
+    """Request, batch and latency counters of a `QuoteService`.
+
+    Attributes:
+        requests (int): number of quotes completed, successfully or not.
+        errors (int): number of quotes that failed.
+        rejected (int): number of quotes rejected because the queue was full.
+        batches (int): number of batch evaluations.
+        max_batch_size (int): size of the largest batch.
+        latency (float): total seconds from request to result, over all quotes.
+        max_latency (float): the longest time from request to result.
+        started (float): `time.perf_counter` time at which the counters started.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.batches = 0
+        self.max_batch_size = 0
+        self.latency = 0.0
+        self.max_latency = 0.0
+        self.started = time.perf_counter()
+
+    def to_dict(self):
+        """Gets the counters, with derived means and throughput"""
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "mean_latency": self.latency / self.requests if self.requests else 0.0,
+            "max_latency": self.max_latency,
+            "requests_per_second": self.requests / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+# the `FleetCosts` default of each parameter, for quotes that leave it out
+_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in signature(FleetCosts).parameters.items()
+    if name in SCENARIO_PARAMETERS
+}
+_DEFAULT_FLAT_RATE = signature(FleetCosts).parameters["depreciation_rate"].default(0)
+
+
+# quote parameters that must be positive, and those that are fractions from 0 to 1;
+# every other parameter must be zero or more
+_POSITIVE = (
+    "service_interval_km",
+    "service_interval_years",
+    "tyre_replacement_interval",
+    "loan_term_years",
+)
+_FRACTIONS = ("inflation", "depreciation_rate", "loan_interest_rate")
+
+
+def _check(parameters):
+    """Validates the parameters of one quote, raising ValueError if they are not valid"""
+    for name, value in parameters.items():
+        if name == "depreciation_rate" and callable(value):
+            continue
+        if name not in _DEFAULTS and name not in ("depreciation_rate", "years"):
+            raise ValueError("unknown quote parameter: {}".format(name))
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("{} must be a number".format(name))
+        if not np.isfinite(value):
+            raise ValueError("{} must be finite".format(name))
+        if name in _POSITIVE and value <= 0:
+            raise ValueError("{} must be positive".format(name))
+        if name in _FRACTIONS and not 0 <= value <= 1:
+            raise ValueError("{} must be between 0 and 1".format(name))
+        if value < 0:
+            raise ValueError("{} must not be negative".format(name))
+    if not 1 <= parameters.get("years", 1) <= MAX_YEARS:
+        raise ValueError("years must be between 1 and {}".format(MAX_YEARS))
+    balloon = parameters.get("loan_balloon", _DEFAULTS["loan_balloon"])
+    if balloon > parameters.get("loan_amount", _DEFAULTS["loan_amount"]):
+        raise ValueError("loan_balloon must not exceed loan_amount")
+
+
+def evaluate_quotes(quotes, years: int = 10):
+    """Evaluates a batch of quotes with one vectorized `FleetCosts` run per group.
+
+    Quotes are grouped by their number of years and any depreciation rate function.
+    A numeric depreciation rate is a flat rate, so such quotes share a group.
+
+    Args:
+        quotes (list): Dictionary of `CarCosts` parameters for each quote, which may
+            include "years".
+        years (int): number of years for quotes that do not give their own.
+    Returns:
+        list: Result dictionary for each quote, in order, with the yearly spend in each
+            cost category, the yearly depreciated value and total cost, and the total
+            cost over all years.
+    """
+    groups = {}
+    for index, quote in enumerate(quotes):
+        rate = quote.get("depreciation_rate")
+        key = (int(quote.get("years", years)), rate if callable(rate) else None)
+        groups.setdefault(key, []).append(index)
+
+    results = [None] * len(quotes)
+    for (group_years, rate), indices in groups.items():
+        group = [quotes[index] for index in indices]
+        arguments = {
+            name: np.array([quote.get(name, default) for quote in group], dtype=float)
+            for name, default in _DEFAULTS.items()
+            if any(name in quote for quote in group)
+        }
+        if rate is None and any("depreciation_rate" in quote for quote in group):
+            rate = FlatRate(
+                np.array(
+                    [
+                        quote.get("depreciation_rate", _DEFAULT_FLAT_RATE)
+                        for quote in group
+                    ],
+                    dtype=float,
+                )
+            )
+        if rate is not None:
+            arguments["depreciation_rate"] = rate
+        with stage("service.evaluate", len(group)):
+            fleet = FleetCosts(years=group_years, **arguments)
+
+        costs = {category: array.tolist() for category, array in fleet.costs.items()}
+        total_cost = fleet.total_cost
+        totals = total_cost.sum(axis=1).tolist()
+        total_cost = total_cost.tolist()
+        depreciated_value = fleet.depreciated_value.tolist()
+        for row, index in enumerate(indices):
+            results[index] = {
+                "years": group_years,
+                "yearly_costs": {
+                    category: costs[category][row] for category in COST_CATEGORIES
+                },
+                "depreciated_value": depreciated_value[row],
+                "total_cost": total_cost[row],
+                "total": totals[row],
+            }
+    return results
+
+
+def _evaluate_batch(quotes, years):
+    """Evaluates a batch of quotes, falling back to one at a time if the batch fails so
+    that a bad quote only fails its own caller. Returns a result or exception per quote.
+    """
+    try:
+        return evaluate_quotes(quotes, years)
+    except Exception:  # pylint: disable=W0703
+        if len(quotes) == 1:
+            raise
+    results = []
+    for quote in quotes:
+        try:
+            results.append(evaluate_quotes([quote], years)[0])
+        except Exception as error:  # pylint: disable=W0703
+            results.append(error)
+    return results
+
+
+class QuoteService:
+    """Coalesces concurrent quote requests into batched cost model evaluations.
+
+    Quotes wait in a bounded queue. A background task takes the first waiting quote,
+    waits up to `max_wait` seconds for more to arrive, then evaluates up to
+    `max_batch_size` of them together in an executor thread, so the event loop keeps
+    accepting quotes while a batch is evaluated. A full queue is backpressure: callers
+    either wait for room or are rejected with `ServiceOverloaded`.
+
+    Use as an async context manager, or call `start` and `close`::
+
+        async with QuoteService(max_wait=0.002) as service:
+            quote = await service.quote(km_per_year=20000)
+
+    Attributes:
+        max_batch_size (int): Maximum number of quotes evaluated together.
+        max_wait (float): Longest time in seconds a batch waits for more quotes.
+        max_pending (int): Maximum number of quotes waiting to be evaluated.
+        years (int): number of years for quotes that do not give their own.
+        stats (ServiceStats): the request, batch and latency counters.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 256,
+        max_wait: float = 0.002,
+        max_pending: int = 4096,
+        years: int = 10,
+        executor=None,
+    ):
+        """Initialise the service
+        Args:
+            max_batch_size (int): Maximum number of quotes evaluated together.
+            max_wait (float): Longest time in seconds a batch waits for more quotes;
+                0 evaluates whatever has arrived straight away.
+            max_pending (int): Maximum number of quotes waiting to be evaluated.
+            years (int): number of years for quotes that do not give their own.
+            executor (concurrent.futures.Executor): Executor evaluating the batches.
+                Defaults to the event loop's default thread pool.
+        """
+        assert max_batch_size >= 1
+        assert max_wait >= 0
+        assert max_pending >= 1
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.years = years
+        self.stats = ServiceStats()
+        self.__executor = executor
+        self.__queue = None
+        self.__full = None
+        self.__task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def running(self):
+        """Gets whether the service is accepting quotes"""
+        return self.__task is not None
+
+    @property
+    def pending(self):
+        """Gets the number of quotes waiting to be evaluated"""
+        return self.__queue.qsize() if self.__queue is not None else 0
+
+    async def start(self):
+        """Starts the batching task"""
+        assert self.__task is None, "the service is already running"
+        self.__queue = asyncio.Queue(self.max_pending)
+        self.__full = asyncio.Event()
+        self.stats = ServiceStats()
+        self.__task = asyncio.get_running_loop().create_task(self.__run())
+
+    async def close(self):
+        """Stops accepting quotes, and waits for the waiting quotes to be evaluated"""
+        if self.__task is None:
+            return
+        task, self.__task = self.__task, None
+        await self.__queue.put(None)
+        self.__full.set()
+        await task
+
+    async def quote(self, block: bool = True, **parameters):
+        """Gets a quote for one car.
+        Args:
+            block (bool): Whether to wait for room when the queue is full, rather than
+                raise `ServiceOverloaded`.
+            parameters: `CarCosts` parameters, and optionally "years". A numeric
+                `depreciation_rate` is a flat rate.
+        Returns:
+            dict: the result of the quote, as described in `evaluate_quotes`.
+        """
+        if self.__task is None:
+            raise RuntimeError("the quote service is not running")
+        _check(parameters)
+        future = asyncio.get_running_loop().create_future()
+        item = (parameters, future, time.perf_counter())
+        if block:
+            await self.__queue.put(item)
+        else:
+            try:
+                self.__queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.stats.rejected += 1
+                raise ServiceOverloaded(
+                    "{} quotes are already waiting".format(self.max_pending)
+                ) from None
+        if self.__queue.qsize() >= self.max_batch_size - 1:
+            self.__full.set()
+        return await future
+
+    async def __run(self):
+        """Takes batches of quotes from the queue and evaluates them"""
+        queue = self.__queue
+        while True:
+            batch = [await queue.get()]
+            if batch[0] is not None and self.max_wait > 0:
+                if queue.qsize() < self.max_batch_size - 1:
+                    self.__full.clear()
+                    try:
+                        await asyncio.wait_for(self.__full.wait(), self.max_wait)
+                    except asyncio.TimeoutError:
+                        pass
+            while len(batch) < self.max_batch_size and batch[-1] is not None:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                await self.__evaluate(batch)
+            if stop:
+                return
+
+    async def __evaluate(self, batch):
+        """Evaluates one batch of quotes and sets the result of each caller's future"""
+        quotes = [parameters for parameters, _, _ in batch]
+        stats = self.stats
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.__executor, _evaluate_batch, quotes, self.years
+            )
+        except Exception as error:  # pylint: disable=W0703
+            results = [error] * len(batch)
+        stats.batches += 1
+        stats.max_batch_size = max(stats.max_batch_size, len(batch))
+        finished = time.perf_counter()
+        for (_, future, started), result in zip(batch, results):
+            latency = finished - started
+            stats.requests += 1
+            stats.latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            if isinstance(result, Exception):
+                stats.errors += 1
+                if not future.done():
+                    future.set_exception(result)
+            elif not future.done():
+                future.set_result(result)
+
+
+class QuoteServer:
+    """Minimal HTTP/1.1 front end for a `QuoteService`, on asyncio streams.
+
+    * POST /quote with a JSON object of quote parameters gets a JSON quote. A JSON list
+      of such objects gets a list of quotes.
+    * GET /stats gets the service counters.
+
+    Invalid quotes, and quotes the model cannot evaluate, get status 400, and quotes
+    rejected because the service queue is full get status 503. Connections are kept
+    alive between requests.
+    """
+
+    def __init__(self, service, host: str = "127.0.0.1", port: int = 8080):
+        """Initialise the server
+        Args:
+            service (QuoteService): the service answering the quotes.
+            host (str): address to listen on.
+            port (int): port to listen on; 0 picks a free port.
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self.__server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        """Starts listening, setting `port` to the port actually used"""
+        self.__server = await asyncio.start_server(self.__handle, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stops listening"""
+        self.__server.close()
+        await self.__server.wait_closed()
+
+    async def serve_forever(self):
+        """Answers requests until cancelled"""
+        await self.__server.serve_forever()
+
+    async def __handle(self, reader, writer):
+        """Answers the requests on one connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    await self.__send(
+                        writer, 400, {"error": "malformed request"}, False
+                    )
+                    break
+                if length > MAX_BODY:
+                    await self.__send(
+                        writer, 413, {"error": "request too large"}, False
+                    )
+                    break
+                body = await reader.readexactly(length)
+                status, payload = await self.__respond(method, path, body)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await self.__send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as error:  # pylint: disable=W0703
+            try:
+                await self.__send(writer, 500, {"error": repr(error)}, False)
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def __respond(self, method, path, body):
+        """Gets the (status, payload) response to a request"""
+        if path == "/stats":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, self.service.stats.to_dict()
+        if path != "/quote":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            request = json.loads(body or b"{}")
+            if isinstance(request, list):
+                if not all(isinstance(item, dict) for item in request):
+                    raise ValueError("a quote must be a JSON object")
+                return 200, list(
+                    await asyncio.gather(
+                        *(self.service.quote(block=False, **item) for item in request)
+                    )
+                )
+            if not isinstance(request, dict):
+                raise ValueError("a quote must be a JSON object")
+            return 200, await self.service.quote(block=False, **request)
+        except ServiceOverloaded as error:
+            return 503, {"error": str(error)}
+        except (ValueError, TypeError) as error:
+            return 400, {"error": str(error)}
+        except Exception as error:  # pylint: disable=W0703
+            # the model rejected the quote
+            return 400, {"error": "quote failed: {!r}".format(error)}
+
+    @staticmethod
+    async def __send(writer, status, payload, keep_alive):
+        """Writes a JSON response"""
+        body = json.dumps(payload).encode()
+        head = (
+            "HTTP/1.1 {} {}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: {}\r\n\r\n"
+        ).format(
+            status,
+            _REASONS.get(status, ""),
+            len(body),
+            "keep-alive" if keep_alive else "close",
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, **options):
+    """Runs a `QuoteService` behind a `QuoteServer` until cancelled.
+    Args:
+        host (str): address to listen on.
+        port (int): port to listen on.
+        options: `QuoteService` arguments.
+    """
+    async with QuoteService(**options) as service:
+        async with QuoteServer(service, host, port) as server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """Runs the quote server from the command line"""
+    import argparse  # pylint: disable=C0415
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument(
+        "--max-wait", type=float, default=2.0, help="milliseconds (default: 2)"
+    )
+    parser.add_argument("--max-pending", type=int, default=4096)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                years=args.years,
+                max_batch_size=args.max_batch_size,
+                max_wait=args.max_wait / 1000.0,
+                max_pending=args.max_pending,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
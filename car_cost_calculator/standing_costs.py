@@ -1,25 +1,46 @@
 # -*- coding: utf-8 -*-
 "Standing costs class"
 
-from .compound_interest import compound_interest
+from functools import cached_property
+from ._lazy import LazyInputs
+from .compound_interest import price_index
+from .profiling import profiled
 
 
-class StandingCosts:
+class StandingCosts(LazyInputs):
     """Represents static yearly costs which are not dependent on distance travelled
 
+    Each cost series is calculated on first access, and recalculated after any of the inputs change.
+    Every series is indexed by the same price index, so inflation may also vary by year.
+
     Attributes:
         years (int): number of years calculated.
-        inflation (float): Assumed inflation rate used for price indexing.
+        inflation (float or array-like): Assumed inflation rate used for price indexing,
+            overall or in each year.
+        insurance_per_year (float): Cost of insurance in the first year.
+        registration_per_year (float): Cost of registration in the first year.
+        roadside_assist_per_year (float): Cost of roadside assistance in the first year.
+        detailing_per_year (float): Cost of detailing and car washes in the first year.
+        price_index (array-like): Inflation price index for each year.
         insurance_cost (array-like): Inflation-indexed insurance yearly spend.
         registration_cost (array-like): Inflation-indexed registration yearly spend.
         roadside_assist_cost (array-like): Inflation-indexed roadside assistance yearly spend.
         detailing_cost (array-like): Inflation-indexed detailing and car wash yearly spend.
     """
 
+    _INPUTS = (
+        "years",
+        "inflation",
+        "insurance_per_year",
+        "registration_per_year",
+        "roadside_assist_per_year",
+        "detailing_per_year",
+    )
+
     def __init__(
         self,
         years: int = 1,
-        inflation: float = 0.02,
+        inflation=0.02,
         insurance_per_year=500,
         registration_per_year=500,
         roadside_assist_per_year=200,
@@ -28,7 +49,8 @@ class StandingCosts:
         """Initialise the standing costs object
         Args:
             years (int): number of years to model
-            inflation (float): Assumed inflation rate used for price indexing.
+            inflation (float or array-like): Assumed inflation rate used for price indexing,
+                overall or in each year.
             insurance_per_year (float): Cost of insurance in the first year.
             registration_per_year (float): Cost of registration in the first year.
             roadside_assist_per_year (float): Cost of roadside assistance in the first year.
@@ -36,15 +58,36 @@ class StandingCosts:
         """
         self.years = years
         self.inflation = inflation
-        self.insurance_cost = compound_interest(
-            principal=insurance_per_year, annual_rate=inflation, years=years
-        )
-        self.registration_cost = compound_interest(
-            principal=registration_per_year, annual_rate=inflation, years=years
-        )
-        self.roadside_assist_cost = compound_interest(
-            principal=roadside_assist_per_year, annual_rate=inflation, years=years
-        )
-        self.detailing_cost = compound_interest(
-            principal=detailing_per_year, annual_rate=inflation, years=years
-        )
+        self.insurance_per_year = insurance_per_year
+        self.registration_per_year = registration_per_year
+        self.roadside_assist_per_year = roadside_assist_per_year
+        self.detailing_per_year = detailing_per_year
+
+    @cached_property
+    def price_index(self):
+        """Gets the inflation price index for each year"""
+        return price_index(self.inflation, self.years)
+
+    @cached_property
+    @profiled("standing_costs.insurance")
+    def insurance_cost(self):
+        """Gets the inflation-indexed insurance yearly spend"""
+        return self.price_index * self.insurance_per_year
+
+    @cached_property
+    @profiled("standing_costs.registration")
+    def registration_cost(self):
+        """Gets the inflation-indexed registration yearly spend"""
+        return self.price_index * self.registration_per_year
+
+    @cached_property
+    @profiled("standing_costs.roadside_assist")
+    def roadside_assist_cost(self):
+        """Gets the inflation-indexed roadside assistance yearly spend"""
+        return self.price_index * self.roadside_assist_per_year
+
+    @cached_property
+    @profiled("standing_costs.detailing")
+    def detailing_cost(self):
+        """Gets the inflation-indexed detailing and car wash yearly spend"""
+        return self.price_index * self.detailing_per_year
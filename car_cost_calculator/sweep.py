@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"Parallel scenario sweeps over the fleet cost model"
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .depreciation import FlatRate
+from .fleet_costs import COST_CATEGORIES, SCENARIO_PARAMETERS, FleetCosts
+from . import profiling
+
+
+class SweepResult:
+    """Columnar results of a scenario sweep.
+
+    Attributes:
+        years (int): number of years calculated.
+        scenarios (int): number of scenarios calculated.
+        parameters (dict): 1-D array of each varying parameter, with one value per scenario.
+            For a swept `depreciation_rate`, the values are indices into the swept rate functions.
+        costs (dict): 2-D array of shape (scenarios, years) for each cost category. Models
+            run with more than one step per year are summed into yearly totals.
+        depreciated_value (array-like): Depreciated value at the start of each year.
+    """
+
+    def __init__(self, parameters, costs, depreciated_value):
+        self.parameters = parameters
+        self.costs = costs
+        self.depreciated_value = depreciated_value
+        self.scenarios, self.years = depreciated_value.shape
+
+    @property
+    def total_cost(self):
+        """Gets the total yearly spend across all cost categories for each scenario"""
+        return sum(self.costs.values())
+
+
+def sweep(grid, years: int = 10, workers=None, chunk_size: int = 10000, **fixed):
+    """Evaluates every combination of a grid of parameter values.
+
+    The grid is split into chunks of consecutive scenarios, and each worker process
+    builds its own parameter arrays from the grid, so only the grid itself and the
+    resulting cost arrays are sent between processes.
+
+    Args:
+        grid (dict): Sequence of values for each swept `FleetCosts` parameter.
+            `depreciation_rate` may be swept over a sequence of rate functions.
+        years (int): number of years to model.
+        workers (int): Number of worker processes. Defaults to the CPU count;
+            1 evaluates everything in the calling process.
+        chunk_size (int): Maximum number of scenarios per task.
+        fixed: Any other `FleetCosts` arguments, shared by all scenarios.
+    Returns:
+        SweepResult: the evaluated scenarios, in row-major order of the grid.
+    """
+    grid = {name: list(values) for name, values in grid.items()}
+    for name in grid:
+        assert name in SCENARIO_PARAMETERS or name == "depreciation_rate", name
+    shape = tuple(len(values) for values in grid.values())
+    scenarios = int(np.prod(shape))
+
+    tasks = [
+        (
+            _evaluate_grid_chunk,
+            (grid, years, fixed, start, min(start + chunk_size, scenarios)),
+        )
+        for start in range(0, scenarios, chunk_size)
+    ]
+    parameters = {}
+    for name, index in zip(grid, np.unravel_index(np.arange(scenarios), shape)):
+        if name == "depreciation_rate":
+            parameters[name] = index
+        else:
+            parameters[name] = np.asarray(grid[name], dtype=float)[index]
+    return _run(tasks, parameters, scenarios, years, workers)
+
+
+def evaluate(
+    scenarios, years: int = 10, workers=None, chunk_size: int = 10000, **fixed
+):
+    """Evaluates a table of scenarios, split into chunks across worker processes.
+
+    Args:
+        scenarios (dict): 1-D array of values for each varying `FleetCosts` parameter,
+            with one value per scenario. A pandas DataFrame may also be used.
+            A numeric "depreciation_rate" column gives each scenario a flat depreciation rate.
+        years (int): number of years to model.
+        workers (int): Number of worker processes. Defaults to the CPU count;
+            1 evaluates everything in the calling process.
+        chunk_size (int): Maximum number of scenarios per task.
+        fixed: Any other `FleetCosts` arguments, shared by all scenarios, except that
+            the per-scenario attributes of an energy model are split with the table.
+    Returns:
+        SweepResult: the evaluated scenarios, in the same order as the table.
+    """
+    parameters = {
+        name: np.asarray(scenarios[name], dtype=float)
+        for name in SCENARIO_PARAMETERS
+        if name in scenarios
+    }
+    rates = None
+    if "depreciation_rate" in scenarios:
+        rates = parameters["depreciation_rate"] = np.asarray(
+            scenarios["depreciation_rate"], dtype=float
+        )
+    count = len(next(iter(parameters.values())))
+
+    tasks = []
+    for start in range(0, count, chunk_size):
+        arguments = dict(fixed, years=years)
+        arguments.update(
+            {
+                name: values[start : start + chunk_size]
+                for name, values in parameters.items()
+                if name != "depreciation_rate"
+            }
+        )
+        if rates is not None:
+            arguments["depreciation_rate"] = FlatRate(rates[start : start + chunk_size])
+        energy_model = fixed.get("energy_model")
+        if energy_model is not None and energy_model.vehicles > 1:
+            arguments["energy_model"] = energy_model.select(
+                slice(start, start + chunk_size)
+            )
+        tasks.append((_evaluate, (arguments,)))
+    return _run(tasks, parameters, count, years, workers)
+
+
+def _run(tasks, parameters, scenarios, years, workers):
+    """Runs the chunk tasks, in a process pool if needed, and merges their results"""
+    costs = {category: np.empty((scenarios, years)) for category in COST_CATEGORIES}
+    depreciated_value = np.empty((scenarios, years))
+
+    def merge(start, result):
+        stop = start + len(result["depreciated_value"])
+        depreciated_value[start:stop] = result["depreciated_value"]
+        for category in COST_CATEGORIES:
+            costs[category][start:stop] = result[category]
+        return stop
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        start = 0
+        for function, arguments in tasks:
+            start = merge(start, function(*arguments))
+    else:
+        # while profiling, each worker profiles its tasks and the statistics are merged
+        profiler = profiling.current()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            if profiler is None:
+                futures = [
+                    executor.submit(function, *arguments)
+                    for function, arguments in tasks
+                ]
+            else:
+                futures = [
+                    executor.submit(profiling.run_profiled, function, *arguments)
+                    for function, arguments in tasks
+                ]
+            start = 0
+            for future in futures:
+                result = future.result()
+                if profiler is not None:
+                    result, state = result
+                    profiler.merge(state)
+                start = merge(start, result)
+
+    return SweepResult(parameters, costs, depreciated_value)
+
+
+def _evaluate(arguments):
+    """Evaluates one chunk of scenarios, returning plain arrays rather than a `FleetCosts`.
+    With more than one step per year, the costs are summed into yearly totals."""
+    with profiling.stage("sweep.task"):
+        fleet = FleetCosts(**arguments)
+    result = fleet.rollup()
+    # the value at the start of each year is the value at its first step
+    result["depreciated_value"] = fleet.depreciated_value[:, :: fleet.steps_per_year]
+    return result
+
+
+def _evaluate_grid_chunk(grid, years, fixed, start, stop):
+    """Evaluates the grid scenarios from start to stop, in row-major grid order"""
+    shape = tuple(len(values) for values in grid.values())
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    arguments = dict(fixed, years=years)
+    for (name, values), index in zip(grid.items(), indices):
+        if name == "depreciation_rate":
+            arguments[name] = [values[i] for i in index]
+        else:
+            arguments[name] = np.asarray(values, dtype=float)[index]
+    return _evaluate(arguments)
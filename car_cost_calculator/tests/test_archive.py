@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from car_cost_calculator.archive import Archive, ArchiveWriter, write_archive
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.fleet_costs import FleetCosts, iter_fleet_costs
+
+KM_PER_YEAR = np.linspace(5000, 50000, 10)
+
+
+@pytest.fixture(name="fleet")
+def fleet_fixture():
+    return FleetCosts(km_per_year=KM_PER_YEAR, litres_per_100km=8.0, years=6)
+
+
+def test_lookup_by_key(fleet, tmp_path):
+    keys = np.array(["car{:02d}".format(i) for i in range(10)])[::-1]
+    write_archive(tmp_path / "archive", fleet, keys=keys)
+    archive = Archive(tmp_path / "archive")
+    assert len(archive) == 10
+    assert list(archive.keys) == sorted(keys)
+    assert list(archive.rows(["car09", "car00"])) == [0, 9]
+    assert "car03" in archive
+    assert "car99" not in archive
+    with pytest.raises(KeyError):
+        archive.rows(["car01", "car99"])
+
+    view = archive["car06"]
+    car_costs = CarCosts(km_per_year=KM_PER_YEAR[3], litres_per_100km=8.0, years=6)
+    assert_allclose(view.yearly_costs, car_costs.yearly_costs, atol=1e-6)
+    assert_allclose(view.depreciated_value, car_costs.depreciated_value)
+    assert view.parameters["km_per_year"] == KM_PER_YEAR[3]
+
+
+def test_zero_copy_slices(fleet, tmp_path):
+    write_archive(tmp_path / "archive", fleet)
+    archive = Archive(tmp_path / "archive")
+    fuel = archive.category("fuel")
+    assert isinstance(fuel, np.memmap)
+    assert fuel.shape == (6, 10)
+    assert fuel[4].flags.c_contiguous
+    assert_allclose(fuel.T, fleet.fuel_cost)
+    assert_allclose(archive.depreciated_value.T, fleet.depreciated_value)
+    assert_allclose(archive.store.total_cost, fleet.total_cost)
+
+
+def test_aggregates(fleet, tmp_path):
+    write_archive(tmp_path / "archive", fleet)
+    archive = Archive(tmp_path / "archive")
+    assert_allclose(archive.sum("fuel", chunk_size=3), fleet.fuel_cost.sum(axis=0))
+    assert_allclose(archive.mean("tyres", chunk_size=4), fleet.tyre_cost.mean(axis=0))
+    assert_allclose(archive.median("fuel", year=5), np.median(fleet.fuel_cost[:, 5]))
+    assert_allclose(
+        archive.quantile("service", [0.1, 0.9]),
+        np.quantile(fleet.service_cost, [0.1, 0.9], axis=0),
+    )
+
+
+def test_chunked_writer(tmp_path):
+    full = FleetCosts(km_per_year=KM_PER_YEAR, years=4)
+    with ArchiveWriter(tmp_path / "archive", 10, 4, ["km_per_year"]) as writer:
+        for start, chunk in iter_fleet_costs(
+            chunk_size=4, km_per_year=KM_PER_YEAR, years=4
+        ):
+            writer.write(chunk, keys=np.arange(start, start + chunk.scenarios) * 10)
+    archive = Archive(tmp_path / "archive")
+    assert archive.parameters.dtype.names == ("km_per_year",)
+    assert_allclose(archive[70].total_cost, full.total_cost[7])
+    assert_allclose(archive.parameters["km_per_year"], KM_PER_YEAR)
+
+
+def test_sub_yearly_results_are_rolled_up(fleet, tmp_path):
+    monthly = FleetCosts(
+        km_per_year=KM_PER_YEAR, litres_per_100km=8.0, years=6, steps_per_year=12
+    )
+    write_archive(tmp_path / "archive", monthly)
+    archive = Archive(tmp_path / "archive")
+    assert archive.years == 6
+    yearly = monthly.rollup()
+    assert_allclose(archive[4].total_cost, sum(yearly.values())[4])
+    assert_allclose(archive[4].depreciated_value, fleet.depreciated_value[4])
+
+
+def test_duplicate_keys(fleet, tmp_path):
+    with pytest.raises(ValueError):
+        write_archive(tmp_path / "archive", fleet, keys=np.zeros(10, dtype=int))
+
+
+def test_no_parameters(fleet, tmp_path):
+    write_archive(tmp_path / "archive", fleet, parameters=[])
+    assert Archive(tmp_path / "archive")[2].parameters == {}
+
+
+def test_rejects_other_versions(fleet, tmp_path):
+    write_archive(tmp_path / "archive", fleet)
+    header = tmp_path / "archive" / "header.json"
+    header.write_text(
+        header.read_text(encoding="utf-8").replace('"version": 2', '"version": 1'),
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError, match="format version 1"):
+        Archive(tmp_path / "archive")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+from numpy.testing import assert_allclose
+from car_cost_calculator.cache import CacheInfo, CostModelCache
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate, TwoStageRate
+from car_cost_calculator.energy_costs import EnergyModel, TimeOfUseTariff
+
+
+def test_rate_objects_compare_by_value():
+    assert FlatRate(0.2) == FlatRate(0.2)
+    assert FlatRate(0.2) != FlatRate(0.3)
+    assert hash(TwoStageRate(0.2, 0.1, 3)) == hash(TwoStageRate(0.2, 0.1, 3))
+    assert TwoStageRate(0.2, 0.1, 3) != TwoStageRate(0.2, 0.1, 4)
+    assert FlatRate(0.1) != TwoStageRate(0.1, 0.1, 3)
+
+
+def test_energy_models_compare_by_value():
+    def tariff(peak=0.45):
+        return TimeOfUseTariff([0, 7, 22], [0.15, peak, 0.15])
+
+    assert tariff() == tariff()
+    assert tariff() != tariff(0.5)
+    assert hash(EnergyModel(home_price=tariff())) == hash(
+        EnergyModel(home_price=tariff())
+    )
+    assert EnergyModel(electric_share=[0.5, 1.0]) == EnergyModel(
+        electric_share=[0.5, 1.0]
+    )
+    assert EnergyModel(home_price=tariff()) != EnergyModel(home_price=tariff(0.5))
+
+    cache = CostModelCache()
+    first = cache.car_costs(energy_model=EnergyModel(home_price=tariff()))
+    assert cache.car_costs(energy_model=EnergyModel(home_price=tariff())) is first
+
+
+def test_hits_and_misses():
+    cache = CostModelCache()
+    first = cache.car_costs(km_per_year=12000, depreciation_rate=TwoStageRate())
+    second = cache.car_costs(km_per_year=12000.0, depreciation_rate=TwoStageRate())
+    assert first is second
+    assert cache.cache_info()["car_costs"] == CacheInfo(1, 1, 128, 1)
+
+
+def test_defaults_are_normalised():
+    cache = CostModelCache()
+    assert cache.car_costs() is cache.car_costs(years=10, inflation=0.02)
+
+
+def test_matches_uncached_results():
+    cache = CostModelCache()
+    cached = cache.car_costs(years=4, km_per_year=25000, insurance_per_year=900)
+    expected = CarCosts(years=4, km_per_year=25000, insurance_per_year=900)
+    assert_allclose(cached.yearly_costs, expected.yearly_costs)
+
+
+def test_reuses_unchanged_components():
+    cache = CostModelCache()
+    first = cache.car_costs(km_per_year=10000)
+    second = cache.car_costs(km_per_year=20000)
+    assert first.standing_costs is second.standing_costs
+    assert first.running_costs is not second.running_costs
+    third = cache.car_costs(km_per_year=10000, insurance_per_year=700)
+    assert third.running_costs is first.running_costs
+    info = cache.cache_info()
+    assert info["standing_costs"].hits == 1
+    assert info["running_costs"].hits == 1
+
+
+def test_lru_eviction():
+    cache = CostModelCache(maxsize=2)
+    a = cache.running_costs(km_per_year=1000)
+    cache.running_costs(km_per_year=2000)
+    assert cache.running_costs(km_per_year=1000) is a
+    cache.running_costs(km_per_year=3000)  # evicts 2000, the least recently used
+    assert cache.running_costs(km_per_year=1000) is a
+    assert cache.cache_info()["running_costs"].currsize == 2
+    cache.running_costs(km_per_year=2000)
+    assert cache.cache_info()["running_costs"].misses == 4
+
+
+def test_clear():
+    cache = CostModelCache()
+    cache.standing_costs(years=3)
+    cache.clear()
+    assert cache.cache_info()["standing_costs"] == CacheInfo(0, 0, 128, 0)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from pytest import approx
+from car_cost_calculator.calibration import DepreciationCalibrator, calibrate
+from car_cost_calculator.depreciation import FlatRate, PiecewiseRate, TwoStageRate
+
+
+def _listings(listings=20000, seed=0):
+    generator = np.random.default_rng(seed)
+    make = generator.choice(["Mazda", "Toyota"], listings)
+    model = generator.choice(["small", "large"], listings)
+    age = generator.uniform(0, 12, listings)
+    km = age * 15000 * generator.uniform(0.5, 1.5, listings)
+    first_rate = np.where(make == "Mazda", 0.2, 0.15)
+    new_price = np.where(model == "small", 25000.0, 40000.0)
+    log_price = (
+        np.log(new_price)
+        + np.log(1 - first_rate) * np.minimum(age, 3)
+        + np.log(1 - 0.1) * np.maximum(age - 3, 0)
+        - 0.02 * km / 10000
+    )
+    price = np.exp(log_price + generator.normal(0, 0.01, listings))
+    return {"make": make, "model": model, "age": age, "km": km, "price": price}
+
+
+def test_recovers_two_stage_rates():
+    result = calibrate(_listings(), breakpoints=[3])
+    assert len(result) == 4
+    assert ("Mazda", "large") in result
+    rate = result["Mazda", "large"]
+    assert isinstance(rate, TwoStageRate)
+    assert rate(0) == approx(0.2, abs=0.002)
+    assert rate(5) == approx(0.1, abs=0.002)
+    assert result["Toyota", "small"](0) == approx(0.15, abs=0.002)
+    index = result.groups.index(("Toyota", "small"))
+    assert result.new_price[index] == approx(25000, rel=0.01)
+    assert_allclose(result.km_effect, -0.02, atol=0.001)
+    assert_allclose(result.residual_std, 0.01, rtol=0.1)
+    assert result.listings.sum() == 20000
+
+
+def test_rate_types():
+    listings = _listings()
+    assert isinstance(calibrate(listings)["Mazda", "small"], FlatRate)
+    rate = calibrate(listings, breakpoints=[3, 6])["Mazda", "small"]
+    assert isinstance(rate, PiecewiseRate)
+    assert rate(1) == approx(0.2, abs=0.002)
+    assert rate(4) == approx(0.1, abs=0.002)
+    assert rate(8) == approx(0.1, abs=0.002)
+
+
+def test_chunked_matches_single_pass():
+    listings = _listings()
+    expected = calibrate(listings, breakpoints=[3])
+    chunks = (
+        {name: values[start : start + 3000] for name, values in listings.items()}
+        for start in range(0, 20000, 3000)
+    )
+    result = calibrate(chunks, breakpoints=[3])
+    assert result.groups == expected.groups
+    assert_allclose(result.stage_rates, expected.stage_rates)
+    assert_allclose(result.new_price, expected.new_price)
+
+
+def test_merge():
+    listings = _listings()
+    expected = calibrate(listings, breakpoints=[3], group_by=["make"])
+    first = DepreciationCalibrator([3], group_by=["make"])
+    second = DepreciationCalibrator([3], group_by=["make"])
+    first.update({name: values[:5000] for name, values in listings.items()})
+    second.update({name: values[5000:] for name, values in listings.items()})
+    first.merge(second)
+    result = first.fit()
+    assert result.groups == expected.groups
+    assert_allclose(result.stage_rates, expected.stage_rates)
+    assert first.rejected == 0
+
+
+def test_rejects_invalid_listings():
+    listings = _listings(1000)
+    listings["price"][:10] = np.nan
+    listings["price"][10:20] = 0
+    listings["age"][20:25] = -1
+    calibrator = DepreciationCalibrator([3])
+    calibrator.update(listings)
+    assert calibrator.rejected == 25
+    assert calibrator.fit().listings.sum() == 975
+
+
+def test_min_listings_and_missing_stages():
+    listings = _listings()
+    # a new model with only young cars listed takes its later rate from all listings
+    young = _listings(50, seed=1)
+    young["make"][:] = "Kia"
+    young["age"] = young["age"] / 6
+    merged = {name: np.concatenate([listings[name], young[name]]) for name in listings}
+    result = calibrate(merged, breakpoints=[3], min_listings=100)
+    assert ("Kia", "small") not in result
+    result = calibrate(merged, breakpoints=[3], min_listings=1)
+    kia = [group for group in result.groups if group[0] == "Kia"]
+    assert kia
+    for group in kia:
+        assert result[group](5) == approx(0.1, abs=0.01)
+
+
+def test_without_km(tmp_path):
+    listings = _listings()
+    del listings["km"]
+    path = tmp_path / "listings.csv"
+    import pandas as pd  # pylint: disable=C0415
+
+    pd.DataFrame(listings).to_csv(path, index=False)
+    result = calibrate(path, breakpoints=[3], km=False, chunksize=5000)
+    assert result.km_effect is None
+    assert result.listings.sum() == 20000
+    frame = result.to_frame()
+    assert list(frame.columns) == [
+        "group",
+        "listings",
+        "rate_1",
+        "rate_2",
+        "new_price",
+        "residual_std",
+    ]
+    assert len(frame) == 4
@@ -38,3 +38,39 @@ def test_yearly_costs():
     assert approx(yc.fuel[5], abs=0.001) == 2235.764
     assert approx(yc.tyres[2], abs=0.001) == 1248.480
     assert approx(yc.service[3], abs=0.001) == 318.362
+
+
+def test_components_are_lazy():
+    car_costs = CarCosts(years=5)
+    assert "running_costs" not in vars(car_costs)
+    assert "yearly_costs" not in vars(car_costs)
+    assert len(car_costs.depreciated_value) == 5
+    assert "standing_costs" not in vars(car_costs)
+    assert "fuel_cost" not in vars(car_costs.running_costs)
+    assert car_costs.yearly_costs is car_costs.yearly_costs
+
+
+def test_input_change_invalidates_costs():
+    car_costs = CarCosts(years=3, km_per_year=10000, litres_per_100km=10.0)
+    assert approx(car_costs.yearly_costs.fuel[0]) == 1500.0
+    car_costs.litres_per_100km = 5.0
+    assert approx(car_costs.yearly_costs.fuel[0]) == 750.0
+    car_costs.years = 4
+    assert len(car_costs.yearly_costs) == 4
+    assert len(car_costs.depreciated_value) == 4
+
+
+def test_financing_cost():
+    car_costs = CarCosts(
+        years=6, loan_amount=20000, loan_interest_rate=0.06, loan_term_years=5
+    )
+    yc = car_costs.yearly_costs
+    assert list(yc.columns)[-1] == "financing"
+    assert approx(yc.financing[0], abs=0.001) == 1103.809
+    assert yc.financing[5] == 0
+    assert approx(yc.financing.sum(), abs=0.01) == 3199.36
+    assert approx(car_costs.total_cost.sum()) == yc.to_numpy().sum()
+    cash = CarCosts(years=3)
+    assert cash.yearly_costs.financing.sum() == 0
+    # no repayment schedule is built without a loan
+    assert "financing" not in vars(cash)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import csv
+import json
+import pytest
+from numpy.testing import assert_allclose
+from car_cost_calculator.cli import main
+from car_cost_calculator.depreciation import FlatRate
+from car_cost_calculator.fleet_costs import COST_CATEGORIES, FleetCosts
+
+
+def test_json_grid(tmp_path, capsys):
+    source = tmp_path / "grid.json"
+    source.write_text(
+        json.dumps(
+            {
+                "years": 4,
+                "grid": {
+                    "km_per_year": [10000, 20000],
+                    "depreciation_rate": [0.1, 0.2],
+                },
+                "inflation": 0.03,
+            }
+        )
+    )
+    assert main([str(source), "--format", "json", "--profile"]) == 0
+    out, err = capsys.readouterr()
+    rows = json.loads(out)
+    assert len(rows) == 4
+    assert [(r["km_per_year"], r["depreciation_rate"]) for r in rows] == [
+        (10000, 0.1),
+        (10000, 0.2),
+        (20000, 0.1),
+        (20000, 0.2),
+    ]
+    expected = FleetCosts(
+        years=4, km_per_year=20000, depreciation_rate=FlatRate(0.1), inflation=0.03
+    )
+    for category in COST_CATEGORIES:
+        assert_allclose(rows[2][category], expected.costs[category].sum())
+    assert_allclose(rows[2]["total"], expected.total_cost.sum())
+    assert "evaluate" in err
+
+
+def test_csv_scenarios(tmp_path):
+    source = tmp_path / "scenarios.csv"
+    source.write_text("km_per_year,depreciation_rate\n10000,0.1\n30000,0.25\n")
+    destination = tmp_path / "summary.csv"
+    assert main([str(source), "--years", "3", "-o", str(destination)]) == 0
+    with open(destination, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    expected = FleetCosts(years=3, km_per_year=30000, depreciation_rate=FlatRate(0.25))
+    assert_allclose(float(rows[1]["total"]), expected.total_cost.sum())
+    assert_allclose(float(rows[1]["depreciation_rate"]), 0.25)
+
+
+def test_scenario_list_with_workers(tmp_path, capsys):
+    source = tmp_path / "scenarios.json"
+    scenarios = [{"km_per_year": km} for km in range(5000, 55000, 5000)]
+    source.write_text(json.dumps({"scenarios": scenarios}))
+    assert main([str(source), "--workers", "2", "--chunk-size", "3"]) == 0
+    rows = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+    expected = FleetCosts(km_per_year=[s["km_per_year"] for s in scenarios])
+    assert_allclose(
+        [float(row["total"]) for row in rows], expected.total_cost.sum(axis=1)
+    )
+
+
+def test_fleet(tmp_path):
+    source = tmp_path / "fleet.csv"
+    source.write_text("rego,km_per_year\nABC123,12000\nXYZ789,40000\n")
+    destination = tmp_path / "costs.csv"
+    assert (
+        main(
+            [
+                str(source),
+                "--fleet",
+                "--id-column",
+                "rego",
+                "-o",
+                str(destination),
+                "--years",
+                "2",
+            ]
+        )
+        == 0
+    )
+    with open(destination, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["rego"] for row in rows] == ["ABC123", "ABC123", "XYZ789", "XYZ789"]
+
+
+def test_fleet_rejects_workers(tmp_path, capsys):
+    source = tmp_path / "fleet.csv"
+    source.write_text("km_per_year\n12000\n")
+    destination = tmp_path / "costs.csv"
+    with pytest.raises(SystemExit):
+        main([str(source), "--fleet", "-o", str(destination), "--workers", "2"])
+    assert "--workers" in capsys.readouterr().err
+    assert not destination.exists()
+
+
+def test_parquet_needs_output(tmp_path):
+    source = tmp_path / "scenarios.csv"
+    source.write_text("km_per_year\n10000\n")
+    with pytest.raises(SystemExit):
+        main([str(source), "--format", "parquet"])
+
+
+def test_trace(tmp_path, capsys):
+    source = tmp_path / "scenarios.csv"
+    source.write_text("km_per_year\n10000\n20000\n")
+    trace = tmp_path / "trace.json"
+    assert main([str(source), "--trace", str(trace), "--profile"]) == 0
+    err = capsys.readouterr().err
+    assert "cli.evaluate" in err
+    assert "fleet_costs.fuel" in err
+    names = {event["name"] for event in json.loads(trace.read_text())["traceEvents"]}
+    assert {"cli.load", "cli.evaluate", "cli.write", "sweep.task"} <= names
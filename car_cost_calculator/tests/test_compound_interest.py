@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0103, C0111
 
+import numpy as np
 from numpy.testing import assert_allclose
-from car_cost_calculator.compound_interest import compound_interest
+from car_cost_calculator.compound_interest import compound_interest, price_index
 
 
 def test_compound_interest_num_results():
@@ -13,3 +14,48 @@ def test_compound_interest():
     actual = compound_interest(8000, 0.073, 5)
     expected = [8000.0, 8584.0, 9210.632, 9883.008, 10604.468]
     assert_allclose(actual, expected)
+
+
+def test_compound_interest_broadcasts_principals_and_rates():
+    actual = compound_interest(np.array([100.0, 200.0]), np.array([[0.0], [0.1]]), 3)
+    assert actual.shape == (2, 2, 3)
+    assert_allclose(actual[0], [[100.0, 100.0, 100.0], [200.0, 200.0, 200.0]])
+    assert_allclose(actual[1, 1], [200.0, 220.0, 242.0])
+
+
+def test_compound_interest_rows_match_scalar():
+    principals = np.array([8000.0, 500.0, 12.5])
+    rates = np.array([0.073, 0.02, 0.0])
+    actual = compound_interest(principals, rates, 6)
+    for i, principal in enumerate(principals):
+        assert_allclose(actual[i], compound_interest(principal, rates[i], 6))
+
+
+def test_compound_interest_out_and_dtype():
+    out = np.empty((2, 4), dtype=np.float32)
+    actual = compound_interest([1.0, 2.0], 0.5, 4, out=out)
+    assert actual is out
+    assert_allclose(out[1], [2.0, 3.0, 4.5, 6.75])
+    assert compound_interest(1.0, 0.1, 3, dtype=np.float32).dtype == np.float32
+
+
+def test_price_index_constant_rate_matches_compound_interest():
+    assert_allclose(price_index(0.073, 5), compound_interest(1.0, 0.073, 5))
+    assert_allclose(
+        price_index([[0.0], [0.1]], 3), compound_interest(1.0, [0.0, 0.1], 3)
+    )
+
+
+def test_price_index_yearly_rates():
+    actual = price_index([0.1, 0.0, 0.5, 0.2], 4)
+    assert_allclose(actual, [1.0, 1.1, 1.1, 1.65])
+    rows = price_index([[0.1, 0.1, 0.1], [0.0, 0.2, 0.0]], 3)
+    assert_allclose(rows, [[1.0, 1.1, 1.21], [1.0, 1.0, 1.2]])
+
+
+def test_price_index_steps_compound_to_yearly_rates():
+    actual = price_index([0.1, 0.2], 2, steps_per_year=4)
+    assert actual.shape == (8,)
+    assert_allclose(actual[::4], [1.0, 1.1])
+    assert_allclose(actual[-1] * (1.2**0.25), 1.1 * 1.2)
+    assert price_index(0.1, 3, dtype=np.float32).dtype == np.float32
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0103, C0111
 
+import numpy as np
 from numpy.testing import assert_allclose
 from pytest import approx
-from car_cost_calculator.depreciation import FlatRate, TwoStageRate, calculate
+from car_cost_calculator.depreciation import FlatRate, PiecewiseRate, TwoStageRate, calculate
 
 FLAT_RATE_15 = FlatRate(0.15)
 TWO_STAGE_RATE = TwoStageRate(0.2, 0.11, 3)
@@ -83,3 +84,71 @@ def test_depreciation_on_10K_over_5_years_at_11percent():
     actual, _ = calculate(10000, years=5, initial_age=0, rate=FlatRate(0.11))
     expected = [10000.000, 8900.000, 7921.000, 7049.690, 6274.224]
     assert_allclose(actual, expected, atol=0.001)
+
+
+def test_flat_rate_rates():
+    assert_allclose(FlatRate(0.33).rates(np.arange(5)), [0.33] * 5)
+
+
+def test_two_stage_rates():
+    tsr = TwoStageRate(0.4, 0.2, 4)
+    assert_allclose(tsr.rates(np.arange(6)), [0.4, 0.4, 0.4, 0.4, 0.2, 0.2])
+
+
+def test_per_vehicle_rates():
+    rates = FlatRate(np.array([0.1, 0.2])).rates(np.zeros((2, 3)))
+    assert_allclose(rates, [[0.1, 0.1, 0.1], [0.2, 0.2, 0.2]])
+
+
+def test_vectorized_matches_per_year_callback():
+    def loop_rate(year):
+        return TWO_STAGE_RATE(year)
+
+    expected_dv, expected_loss = calculate(15000, years=8, initial_age=2, rate=loop_rate)
+    dv, loss = calculate(15000, years=8, initial_age=2, rate=TWO_STAGE_RATE)
+    assert_allclose(dv, expected_dv)
+    assert_allclose(loss, expected_loss)
+
+
+def test_many_initial_ages():
+    ages = np.array([0, 1, 3, 7])
+    dv, loss = calculate(10000, years=6, initial_age=ages, rate=TWO_STAGE_RATE)
+    assert dv.shape == (4, 6)
+    for i, age in enumerate(ages):
+        expected_dv, expected_loss = calculate(
+            10000, years=6, initial_age=age, rate=lambda year: TWO_STAGE_RATE(year)
+        )
+        assert_allclose(dv[i], expected_dv)
+        assert_allclose(loss[i], expected_loss)
+
+
+def test_many_initial_ages_with_plain_callable():
+    dv, _ = calculate(
+        np.array([100.0, 200.0]), years=3, initial_age=np.array([0, 5]), rate=lambda y: 0.5
+    )
+    assert_allclose(dv, [[100.0, 50.0, 25.0], [200.0, 100.0, 50.0]])
+
+
+def test_piecewise_rate():
+    rate = PiecewiseRate([0.25, 0.15, 0.1], [1, 4])
+    assert rate(0) == approx(0.25)
+    assert rate(1) == approx(0.15)
+    assert rate(3) == approx(0.15)
+    assert rate(4) == approx(0.1)
+    assert_allclose(rate(np.arange(6)), [0.25, 0.15, 0.15, 0.15, 0.1, 0.1])
+    assert rate == PiecewiseRate((0.25, 0.15, 0.1), (1, 4))
+    assert rate != PiecewiseRate((0.25, 0.15, 0.1), (2, 4))
+    assert hash(rate) == hash(PiecewiseRate((0.25, 0.15, 0.1), (1, 4)))
+
+
+def test_piecewise_rate_matches_two_stage_rate():
+    piecewise = PiecewiseRate([0.2, 0.11], [3])
+    dv, loss = calculate(15000, years=8, initial_age=1, rate=piecewise)
+    expected_dv, expected_loss = calculate(15000, years=8, initial_age=1, rate=TWO_STAGE_RATE)
+    assert_allclose(dv, expected_dv)
+    assert_allclose(loss, expected_loss)
+
+
+def test_piecewise_rate_per_vehicle():
+    rate = PiecewiseRate([[0.3, 0.1], [0.2, 0.05]], [2])
+    assert_allclose(rate.rates(np.array([[0, 2], [1, 5]])), [[0.3, 0.1], [0.2, 0.05]])
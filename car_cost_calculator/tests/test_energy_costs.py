@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from pytest import approx
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.energy_costs import (
+    OVERNIGHT_CHARGING,
+    EnergyModel,
+    TimeOfUseTariff,
+    energy_used,
+    yearly_energy_cost,
+)
+from car_cost_calculator.fleet_costs import FleetCosts, iter_fleet_costs
+from car_cost_calculator.running_costs import RunningCosts
+from car_cost_calculator.scenario import Scenario
+from car_cost_calculator.sweep import evaluate
+
+TARIFF = TimeOfUseTariff(
+    start_hours=[0, 7, 16, 21],
+    rates=[0.15, 0.25, 0.45, 0.25],
+    weekend_rates=[0.15, 0.20, 0.20, 0.20],
+)
+
+
+def test_energy_used():
+    assert energy_used(15000, 18.0) == 2700.0
+
+
+def test_rates_at():
+    hours = [0, 6.5, 7, 16, 20.99, 21, 23.5, 24 + 8, 5 * 24 + 17, 7 * 24 + 17]
+    assert_allclose(
+        TARIFF.rates_at(hours),
+        [0.15, 0.15, 0.25, 0.45, 0.45, 0.25, 0.25, 0.25, 0.20, 0.45],
+    )
+
+
+def test_cost_matches_hour_by_hour_reference():
+    generator = np.random.default_rng(0)
+    energy = generator.random((20, 24 * 14))
+    expected = [
+        sum(kwh * TARIFF.rates_at(hour) for hour, kwh in enumerate(row))
+        for row in energy
+    ]
+    assert_allclose(TARIFF.cost(energy), expected)
+    # starting on Saturday morning shifts every rate
+    assert TARIFF.cost(energy[0], start_hour=5 * 24 + 6) == approx(
+        energy[0] @ TARIFF.rates_at(5 * 24 + 6 + np.arange(24 * 14))
+    )
+
+
+def test_daily_cost_matches_hourly_cost():
+    generator = np.random.default_rng(1)
+    daily = generator.uniform(0, 30, (50, 365))
+    hourly = (daily[..., np.newaxis] * OVERNIGHT_CHARGING).reshape(50, -1)
+    assert_allclose(TARIFF.daily_cost(daily).sum(axis=1), TARIFF.cost(hourly))
+    assert_allclose(
+        TARIFF.daily_cost(daily, start_day=3).sum(axis=1),
+        TARIFF.cost(hourly, start_hour=3 * 24),
+    )
+
+
+def test_average_price():
+    weekday = 0.15 * 6 / 8 + 0.25 * 2 / 8
+    weekend = 0.15 * 6 / 8 + 0.20 * 2 / 8
+    assert_allclose(TARIFF.day_prices(), [weekday] * 5 + [weekend] * 2)
+    assert TARIFF.average_price() == approx((5 * weekday + 2 * weekend) / 7)
+    daytime = np.zeros(24)
+    daytime[12] = 1
+    assert TARIFF.average_price(daytime) == approx((5 * 0.25 + 2 * 0.20) / 7)
+
+
+def test_energy_model_prices():
+    model = EnergyModel(
+        kwh_per_100km=20.0, home_charging_share=0.75, home_price=0.2, public_price=0.6
+    )
+    assert model.electricity_price == approx(0.3)
+    assert model.cost_per_km(8.0, 2.0) == approx(0.2 * 0.3)
+    hybrid = EnergyModel(kwh_per_100km=20.0, electric_share=0.25, home_price=TARIFF)
+    electricity_price = 0.8 * TARIFF.average_price() + 0.2 * 0.6
+    assert hybrid.cost_per_km(8.0, 2.0) == approx(
+        0.75 * 0.16 + 0.25 * 0.2 * electricity_price
+    )
+
+
+def test_combustion_model_matches_fuel_cost():
+    fuel_only = RunningCosts(years=5, km_per_year=[10000, 12000, 8000, 8000, 9000])
+    model = RunningCosts(
+        years=5,
+        km_per_year=[10000, 12000, 8000, 8000, 9000],
+        energy_model=EnergyModel(electric_share=0.0),
+    )
+    assert_allclose(model.fuel_cost, fuel_only.fuel_cost)
+
+
+def test_running_costs_with_energy_model():
+    model = EnergyModel(kwh_per_100km=15.0, home_charging_share=1.0, home_price=0.2)
+    actual = RunningCosts(years=3, km_per_year=20000, inflation=0.1, energy_model=model)
+    assert_allclose(actual.fuel_cost, [600.0, 660.0, 726.0])
+    assert_allclose(
+        actual.fuel_cost, yearly_energy_cost(model, 20000, 3, 0.1, 10.0, 1.5)
+    )
+    actual.energy_model = None
+    assert actual.fuel_cost[0] == approx(3000.0)
+
+
+def test_chunked_fleet_with_per_scenario_energy_model():
+    model = EnergyModel(
+        kwh_per_100km=np.linspace(14, 22, 10),
+        electric_share=np.linspace(0, 1, 10),
+        home_price=TARIFF,
+    )
+    km_per_year = np.linspace(5000, 30000, 10)
+    full = FleetCosts(years=3, km_per_year=km_per_year, energy_model=model)
+    starts = []
+    for start, chunk in iter_fleet_costs(
+        chunk_size=4, years=3, km_per_year=km_per_year, energy_model=model
+    ):
+        starts.append(start)
+        assert_allclose(chunk.total_cost, full.total_cost[start : start + 4])
+    assert starts == [0, 4, 8]
+
+    result = evaluate(
+        {"km_per_year": km_per_year},
+        years=3,
+        workers=1,
+        chunk_size=4,
+        energy_model=model,
+    )
+    assert_allclose(result.total_cost, full.total_cost)
+
+
+def test_fleet_energy_models_match_car_costs():
+    share = np.array([0.0, 0.5, 1.0])
+    model = EnergyModel(
+        kwh_per_100km=[0.0, 17.0, 20.0],
+        electric_share=share,
+        home_charging_share=[1.0, 0.9, 0.5],
+        home_price=TARIFF,
+    )
+    km_per_year = np.array([[15000, 15000, 10000, 10000]])
+    fleet = FleetCosts(
+        years=4, km_per_year=km_per_year, litres_per_100km=[8, 5, 0], energy_model=model
+    )
+    for i in range(3):
+        car = CarCosts(
+            years=4,
+            km_per_year=km_per_year[0],
+            litres_per_100km=[8, 5, 0][i],
+            energy_model=EnergyModel(
+                kwh_per_100km=[0.0, 17.0, 20.0][i],
+                electric_share=share[i],
+                home_charging_share=[1.0, 0.9, 0.5][i],
+                home_price=TARIFF,
+            ),
+        )
+        assert_allclose(fleet.fuel_cost[i], car.yearly_costs.fuel)
+
+    monthly = FleetCosts(
+        years=4,
+        km_per_year=km_per_year,
+        litres_per_100km=[8, 5, 0],
+        energy_model=model,
+        steps_per_year="monthly",
+        inflation=0.0,
+    )
+    yearly = FleetCosts(
+        years=4,
+        km_per_year=km_per_year,
+        litres_per_100km=[8, 5, 0],
+        energy_model=model,
+        inflation=0.0,
+    )
+    assert_allclose(monthly.rollup()["fuel"], yearly.fuel_cost)
+
+
+def test_scenario_energy_model_change():
+    scenario = Scenario(years=4)
+    assert scenario.update(energy_model=EnergyModel()) == ("fuel",)
+    assert_allclose(
+        scenario.yearly_costs.fuel,
+        CarCosts(years=4, energy_model=EnergyModel()).yearly_costs.fuel,
+    )
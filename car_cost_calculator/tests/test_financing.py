@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from pytest import approx
+from car_cost_calculator.financing import Amortization, loan_payment, yearly_interest
+
+
+def test_loan_payment():
+    # $20,000 over 5 years at 6% p.a. monthly
+    assert loan_payment(20000, 0.06, 5) == approx(386.656, abs=0.001)
+    assert loan_payment(12000, 0.0, 1) == approx(1000.0)
+    # the balloon is paid separately, reducing the level repayment
+    assert loan_payment(12000, 0.0, 1, balloon=6000) == approx(500.0)
+    assert loan_payment(1000, 0.12, 1, periods_per_year=1) == approx(1120.0)
+
+
+def test_schedule():
+    loan = Amortization(20000, 0.06, 5)
+    assert loan.periods == 60
+    assert_allclose(
+        loan.opening_balance[0, :2], [20000.0, 20000 * 1.005 - 386.656], atol=1e-3
+    )
+    assert loan.interest[0, 0] == approx(100.0)
+    assert_allclose(
+        loan.closing_balance[0, :-1], loan.opening_balance[0, 1:], atol=1e-8
+    )
+    assert loan.closing_balance[0, -1] == 0
+    assert loan.principal_repaid.sum() == approx(20000.0)
+    assert loan.total_interest[0] == approx(60 * 386.656 - 20000, abs=0.1)
+
+
+def test_balloon():
+    loan = Amortization(30000, 0.08, 3, balloon=10000)
+    assert loan.opening_balance[0, -1] - loan.principal_repaid[0, -1] == approx(
+        0, abs=1e-6
+    )
+    assert loan.balloon_payment[0, -1] == 10000
+    assert loan.balloon_payment[0, :-1].sum() == 0
+    assert loan.payments[0, -1] == approx(loan.payment[0] + 10000)
+    assert loan.principal_repaid.sum() == approx(30000.0)
+
+
+def test_loan_book_matches_single_loans():
+    generator = np.random.default_rng(1)
+    count = 200
+    principal = generator.uniform(5000, 80000, count)
+    rate = generator.choice([0.0, 0.05, 0.09], count)
+    term = generator.choice([1, 2.5, 5, 7], count)
+    balloon = principal * generator.choice([0.0, 0.3], count)
+    book = Amortization(principal, rate, term, balloon)
+    assert book.periods == 84
+    assert book.interest.shape == (count, 84)
+    for i in (0, 17, 111, 199):
+        loan = Amortization(principal[i], rate[i], term[i], balloon[i], periods=84)
+        assert_allclose(book.interest[i], loan.interest[0])
+        assert_allclose(book.closing_balance[i], loan.closing_balance[0], atol=1e-6)
+    assert_allclose(book.principal_repaid.sum(axis=1), principal)
+    # nothing is owed or paid after each loan's term
+    finished = np.arange(1, 85) > book.repayments[:, np.newaxis]
+    assert not np.any(book.payments[finished])
+
+
+def test_resample():
+    loan = Amortization([20000, 10000], [0.06, 0.1], [5, 2])
+    yearly = loan.resample(loan.interest, 1, 6)
+    assert yearly.shape == (2, 6)
+    assert_allclose(yearly[:, 0], loan.interest[:, :12].sum(axis=1))
+    assert_allclose(yearly.sum(axis=1), loan.total_interest)
+    assert_allclose(yearly[1, 2:], 0)
+    for steps_per_year in (4, 12, 52):
+        steps = loan.resample(loan.interest, steps_per_year, 5 * steps_per_year)
+        assert_allclose(steps.sum(axis=1), loan.total_interest)
+    assert_allclose(loan.resample(loan.interest, 12, 60), loan.interest)
+    # a shorter horizon drops the later interest
+    assert_allclose(loan.resample(loan.interest, 1, 1), yearly[:, :1])
+
+
+def test_yearly_interest_skips_cash_purchases():
+    actual = yearly_interest([0.0, 20000.0], 0.06, 5, years=7)
+    assert actual.shape == (2, 7)
+    assert_allclose(actual[0], 0)
+    assert actual[1, 0] == approx(1103.809, abs=0.001)
+    assert_allclose(actual[1, 5:], 0)
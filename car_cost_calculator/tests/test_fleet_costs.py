@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate, TwoStageRate
+from car_cost_calculator.fleet_costs import (
+    COST_CATEGORIES,
+    FleetCosts,
+    iter_fleet_costs,
+)
+
+TWO_STAGE_RATE = TwoStageRate(stage_1_rate=0.15, stage_2_rate=0.1, breakpoint=3)
+
+
+def assert_matches_car_costs(fleet, scenario, car_costs):
+    for category in COST_CATEGORIES:
+        assert_allclose(
+            fleet.costs[category][scenario], car_costs.yearly_costs[category], atol=1e-6
+        )
+    assert_allclose(
+        fleet.depreciated_value[scenario], car_costs.depreciated_value, atol=1e-6
+    )
+
+
+def test_shapes():
+    fleet = FleetCosts(km_per_year=[10000, 20000, 30000], years=7)
+    assert fleet.scenarios == 3
+    for category in COST_CATEGORIES:
+        assert fleet.costs[category].shape == (3, 7)
+    assert fleet.total_cost.shape == (3, 7)
+
+
+def test_scalar_parameters_give_single_scenario():
+    fleet = FleetCosts(years=4)
+    assert fleet.scenarios == 1
+    assert_matches_car_costs(fleet, 0, CarCosts(years=4))
+
+
+def test_matches_car_costs():
+    km_per_year = [5000.0, 15000.0, 32000.0, 100000.0]
+    ages = [0, 2, 5, 1]
+    service_interval_years = [1.0, 0.5, 1.5, 1.0]
+    fleet = FleetCosts(
+        initial_vehicle_value=50000,
+        initial_vehicle_age=ages,
+        depreciation_rate=TWO_STAGE_RATE,
+        years=10,
+        km_per_year=km_per_year,
+        litres_per_100km=9.0,
+        initial_service_cost=300,
+        service_interval_km=[15000, 15000, 20000, 10000],
+        service_interval_years=service_interval_years,
+        tyre_replacement_interval=40000,
+    )
+    for i, km in enumerate(km_per_year):
+        car_costs = CarCosts(
+            initial_vehicle_value=50000,
+            initial_vehicle_age=ages[i],
+            depreciation_rate=TWO_STAGE_RATE,
+            years=10,
+            km_per_year=km,
+            litres_per_100km=9.0,
+            initial_service_cost=300,
+            service_interval_km=[15000, 15000, 20000, 10000][i],
+            service_interval_years=service_interval_years[i],
+            tyre_replacement_interval=40000,
+        )
+        assert_matches_car_costs(fleet, i, car_costs)
+
+
+def test_per_scenario_depreciation_rates():
+    rates = [FlatRate(0.2), TWO_STAGE_RATE, FlatRate(0.2)]
+    fleet = FleetCosts(initial_vehicle_age=[0, 1, 4], depreciation_rate=rates, years=6)
+    for i, rate in enumerate(rates):
+        car_costs = CarCosts(
+            initial_vehicle_age=[0, 1, 4][i], depreciation_rate=rate, years=6
+        )
+        assert_matches_car_costs(fleet, i, car_costs)
+
+
+def test_total_cost():
+    fleet = FleetCosts(km_per_year=[10000, 20000], years=5)
+    expected = np.sum([fleet.costs[c] for c in COST_CATEGORIES], axis=0)
+    assert_allclose(fleet.total_cost, expected)
+
+
+def test_to_frame_and_from_frame():
+    params = {"km_per_year": [10000.0, 25000.0], "litres_per_100km": [6.0, 12.0]}
+    fleet = FleetCosts.from_frame(params, years=3)
+    frame = fleet.to_frame()
+    assert len(frame) == 6
+    assert list(frame.columns) == ["scenario", "year"] + list(COST_CATEGORIES)
+    assert_allclose(frame.fuel[frame.scenario == 1], fleet.fuel_cost[1])
+
+
+def test_monthly_rollup_matches_yearly_without_inflation():
+    params = dict(
+        km_per_year=[12000, 31000],
+        initial_vehicle_age=[0, 2],
+        depreciation_rate=TWO_STAGE_RATE,
+        inflation=0.0,
+        service_interval_years=[1.0, 0.5],
+        tyre_replacement_interval=20000,
+        years=6,
+    )
+    yearly = FleetCosts(**params)
+    monthly = FleetCosts(steps_per_year="monthly", **params)
+    assert monthly.periods == 72
+    assert monthly.fuel_cost.shape == (2, 72)
+    rollup = monthly.rollup()
+    for category in COST_CATEGORIES:
+        assert_allclose(rollup[category], yearly.costs[category], atol=1e-6)
+    assert_allclose(monthly.depreciated_value[:, ::12], yearly.depreciated_value)
+
+
+def test_intra_year_inflation():
+    yearly = FleetCosts(inflation=0.05, years=3)
+    monthly = FleetCosts(inflation=0.05, years=3, steps_per_year=12)
+    assert_allclose(monthly.insurance_cost[0, ::12] * 12, yearly.insurance_cost[0])
+    assert np.all(np.diff(monthly.insurance_cost[0]) > 0)
+
+
+def test_daily_event_placement():
+    daily = FleetCosts(
+        km_per_year=36500, tyre_replacement_interval=10000, years=1, steps_per_year=365
+    )
+    assert_allclose(np.flatnonzero(daily.tyre_cost[0]), [99, 199, 299])
+
+
+def test_event_placement_with_default_inputs():
+    # default 15000 km per year with 15000 km tyre and service intervals: one event a year
+    for steps in ("daily", "weekly"):
+        for dtype in (np.float64, np.float32):
+            rollup = FleetCosts(
+                years=6, inflation=0, steps_per_year=steps, dtype=dtype
+            ).rollup()
+            assert_allclose(rollup["tyres"], [[1200] * 6])
+            assert_allclose(rollup["service"], [[400] * 6])
+
+
+def test_float32():
+    fleet = FleetCosts(km_per_year=[10000, 20000], steps_per_year=52, dtype=np.float32)
+    for category in COST_CATEGORIES:
+        assert fleet.costs[category].dtype == np.float32
+    assert fleet.depreciated_value.dtype == np.float32
+    expected = FleetCosts(km_per_year=[10000, 20000], steps_per_year=52)
+    assert_allclose(fleet.total_cost, expected.total_cost, rtol=1e-5)
+
+
+def test_iter_fleet_costs():
+    km_per_year = np.linspace(5000, 50000, 11)
+    rates = [FlatRate(r) for r in np.linspace(0.05, 0.25, 11)]
+    full = FleetCosts(km_per_year=km_per_year, depreciation_rate=rates, years=4)
+    starts = []
+    for start, chunk in iter_fleet_costs(
+        chunk_size=4, km_per_year=km_per_year, depreciation_rate=rates, years=4
+    ):
+        starts.append(start)
+        assert_allclose(chunk.total_cost, full.total_cost[start : start + 4])
+    assert starts == [0, 4, 8]
+
+
+def test_iter_fleet_costs_yearly_matrices():
+    km_per_year = np.linspace(5000, 50000, 100).reshape(20, 5)
+    inflation = np.array([[0.05, 0.04, 0.03, 0.02, 0.02]])
+    full = FleetCosts(km_per_year=km_per_year, inflation=inflation, years=5)
+    starts = []
+    for start, chunk in iter_fleet_costs(
+        chunk_size=7, km_per_year=km_per_year, inflation=inflation, years=5
+    ):
+        starts.append(start)
+        assert_allclose(chunk.total_cost, full.total_cost[start : start + 7])
+    assert starts == [0, 7, 14]
+
+
+def test_iter_fleet_costs_shared_path():
+    km_per_year = np.array([[20000, 20000, 8000, 8000]])
+    litres_per_100km = np.linspace(5, 12, 10)
+    full = FleetCosts(
+        km_per_year=km_per_year, litres_per_100km=litres_per_100km, years=4
+    )
+    chunks = list(
+        iter_fleet_costs(
+            chunk_size=4,
+            km_per_year=km_per_year,
+            litres_per_100km=litres_per_100km,
+            years=4,
+        )
+    )
+    assert [start for start, _ in chunks] == [0, 4, 8]
+    for start, chunk in chunks:
+        assert_allclose(chunk.total_cost, full.total_cost[start : start + 4])
+
+
+def test_yearly_parameter_matrices_match_car_costs():
+    km_per_year = np.array([[20000, 20000, 8000, 8000, 8000], [5000] * 5])
+    inflation = np.array([[0.05, 0.04, 0.03, 0.02, 0.02]])
+    litres_per_100km = [9.0, 6.5]
+    fleet = FleetCosts(
+        years=5,
+        km_per_year=km_per_year,
+        inflation=inflation,
+        litres_per_100km=litres_per_100km,
+        initial_fuel_price=np.array([[1.5, 1.6, 1.7, 1.8, 1.9]]),
+        tyre_replacement_interval=15000,
+    )
+    assert fleet.scenarios == 2
+    assert_allclose(fleet.parameters["km_per_year"], [12800, 5000])
+    assert fleet.price_index.shape == (2, 5)
+    for i in range(2):
+        car_costs = CarCosts(
+            years=5,
+            km_per_year=km_per_year[i],
+            inflation=inflation[0],
+            litres_per_100km=litres_per_100km[i],
+            initial_fuel_price=[1.5, 1.6, 1.7, 1.8, 1.9],
+            tyre_replacement_interval=15000,
+        )
+        assert_matches_car_costs(fleet, i, car_costs)
+
+
+def test_yearly_parameters_with_steps():
+    km_per_year = np.array([[12000.0, 6000.0, 6000.0]])
+    monthly = FleetCosts(
+        years=3,
+        km_per_year=km_per_year,
+        inflation=np.array([[0.0, 0.1, 0.0]]),
+        steps_per_year="monthly",
+    )
+    yearly = FleetCosts(
+        years=3, km_per_year=km_per_year, inflation=np.array([[0.0, 0.1, 0.0]])
+    )
+    assert_allclose(monthly.cumulative_distance[0, 11::12], [12000, 18000, 24000])
+    assert_allclose(monthly.price_index[0, ::12], yearly.price_index[0])
+    assert_allclose(monthly.price_index[0, -1], 1.1)
+    assert_allclose(monthly.rollup()["fuel"][:, 0], yearly.fuel_cost[:, 0])
+
+
+def test_loans_match_car_costs():
+    loan_amount = [0.0, 30000.0, 15000.0]
+    loan_term_years = [5, 3, 7]
+    loan_balloon = [0.0, 10000.0, 0.0]
+    fleet = FleetCosts(
+        years=6,
+        loan_amount=loan_amount,
+        loan_interest_rate=[0.05, 0.08, 0.0],
+        loan_term_years=loan_term_years,
+        loan_balloon=loan_balloon,
+    )
+    assert_allclose(fleet.financing_cost[0], 0)
+    assert_allclose(fleet.financing_cost[2], 0)
+    for i, rate in enumerate([0.05, 0.08, 0.0]):
+        car_costs = CarCosts(
+            years=6,
+            loan_amount=loan_amount[i],
+            loan_interest_rate=rate,
+            loan_term_years=loan_term_years[i],
+            loan_balloon=loan_balloon[i],
+        )
+        assert_matches_car_costs(fleet, i, car_costs)
+
+    monthly = FleetCosts(
+        years=6,
+        loan_amount=loan_amount,
+        loan_interest_rate=0.08,
+        loan_term_years=loan_term_years,
+        loan_balloon=loan_balloon,
+        steps_per_year="monthly",
+    )
+    assert_allclose(monthly.rollup()["financing"][1], fleet.financing_cost[1])
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0103, C0111
 
+import numpy as np
 from numpy.testing import assert_allclose
 from car_cost_calculator.fuel_costs import fuel_used, yearly_fuel_cost
 
@@ -38,3 +39,26 @@ def test_fuel_cost_over_10years():
         initial_fuel_price=1.5,
     )
     assert_allclose(actual, expected, atol=0.001)
+
+
+def test_fuel_cost_per_scenario():
+    actual = yearly_fuel_cost(
+        km_per_year=np.array([[15000], [10000]]),
+        litres_per_100km=np.array([[8.4], [5.0]]),
+        years=3,
+        inflation=np.array([0.021, 0.0]),
+        initial_fuel_price=1.5,
+    )
+    assert_allclose(actual[0], [1890.0, 1929.69, 1970.214], atol=0.001)
+    assert_allclose(actual[1], [750.0, 750.0, 750.0])
+
+
+def test_fuel_cost_per_year_distance():
+    actual = yearly_fuel_cost(
+        km_per_year=np.array([15000, 10000, 5000]),
+        litres_per_100km=10.0,
+        years=3,
+        inflation=0.0,
+        initial_fuel_price=2.0,
+    )
+    assert_allclose(actual, [3000.0, 2000.0, 1000.0])
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import json
+import subprocess
+import sys
+
+# Generous wall clock budget for importing the package, in seconds. NumPy alone takes
+# around a tenth of that, while pandas would add several times as much again.
+IMPORT_BUDGET = 1.0
+
+
+def run_python(code):
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_package_import_does_not_load_pandas():
+    result = run_python(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import car_cost_calculator\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps({'elapsed': elapsed, 'pandas': 'pandas' in sys.modules}))\n"
+    )
+    assert not result["pandas"]
+    assert result["elapsed"] < IMPORT_BUDGET
+
+
+def test_numpy_results_do_not_load_pandas():
+    result = run_python(
+        "import json, sys\n"
+        "from car_cost_calculator import CarCosts, FleetCosts\n"
+        "car_costs = CarCosts(years=3)\n"
+        "car_costs.running_costs.fuel_cost\n"
+        "car_costs.depreciated_value\n"
+        "FleetCosts(km_per_year=[1, 2]).total_cost\n"
+        "before = 'pandas' in sys.modules\n"
+        "car_costs.yearly_costs\n"
+        "print(json.dumps([before, 'pandas' in sys.modules]))\n"
+    )
+    assert result == [False, True]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from car_cost_calculator.interval_events import (
+    cumulative_distance,
+    event_counts,
+    interval_costs,
+    service_counts,
+)
+
+
+def digitized_counts(cumulative, interval):
+    """Reference per-milestone implementation"""
+    milestones = np.arange(interval, cumulative[-1] + 1, interval)
+    years = np.digitize(milestones, bins=cumulative, right=True)
+    return np.bincount(years[years < len(cumulative)], minlength=len(cumulative))
+
+
+def test_event_counts():
+    cumulative = np.array([10000.0, 20000.0, 30000.0])
+    assert_allclose(event_counts(cumulative, 3000), [3, 3, 4])
+
+
+def test_event_counts_time_interval():
+    assert_allclose(event_counts(np.arange(1, 6), 1.5), [0, 1, 1, 0, 1])
+
+
+def test_expected_event_counts():
+    cumulative = np.array([10000.0, 20000.0, 30000.0])
+    assert_allclose(event_counts(cumulative, 3000, expected=True), [10 / 3] * 3)
+
+
+def test_matches_reference():
+    for km_per_year in (3000.0, 10000.0, 15000.0, 100000.0):
+        for interval in (5000.0, 10000.0, 15000.0, 40000.0):
+            cumulative = km_per_year * np.arange(1, 21)
+            assert_allclose(
+                event_counts(cumulative, interval),
+                digitized_counts(cumulative, interval),
+            )
+
+
+def test_many_vehicles():
+    cumulative = np.multiply.outer([100000.0, 5000.0], np.arange(1, 5))
+    actual = event_counts(cumulative, [10000.0, 7500.0])
+    assert_allclose(actual, [[10, 10, 10, 10], [0, 1, 1, 0]])
+
+
+def test_interval_costs():
+    cumulative = np.array([10000.0, 20000.0, 30000.0])
+    actual = interval_costs(cumulative, 3000, np.array([1.0, 1.1, 1.21]))
+    assert_allclose(actual, [3.0, 3.3, 4.84])
+
+
+def test_cumulative_distance():
+    assert_allclose(cumulative_distance(10000, 3), [10000, 20000, 30000])
+    assert_allclose(cumulative_distance([20000, 15000, 5000], 3), [20000, 35000, 40000])
+    assert_allclose(
+        cumulative_distance([[1200.0], [2400.0]], 2, steps_per_year=12)[:, [11, 23]],
+        [[1200, 2400], [2400, 4800]],
+    )
+    assert_allclose(
+        cumulative_distance([1200, 2400], 2, steps_per_year=2), [600, 1200, 2400, 3600]
+    )
+
+
+def test_cumulative_distance_exact_at_year_ends():
+    daily = cumulative_distance(15000, 6, steps_per_year=365)
+    assert_allclose(daily[364::365], [15000, 30000, 45000, 60000, 75000, 90000], rtol=0)
+    per_year = cumulative_distance([15000, 10000], 2, steps_per_year=365)
+    assert_allclose(per_year[[364, 729]], [15000, 25000], rtol=0)
+
+
+def test_service_counts():
+    years = np.arange(1, 5)
+    # 20000 km a year reaches a 15000 km interval before a yearly one
+    distance = cumulative_distance(20000, 4)
+    assert_allclose(service_counts(distance, years, 20000, 15000, 1), [1, 1, 2, 1])
+    # 5000 km a year is serviced every year
+    distance = cumulative_distance(5000, 4)
+    assert_allclose(service_counts(distance, years, 5000, 15000, 1), [1, 1, 1, 1])
+    # per-vehicle rules, with usage that varies by year compared on average
+    distance = cumulative_distance([[20000], [5000]], 4)
+    assert_allclose(
+        service_counts(distance, years, [[20000], [5000]], 15000, [1, 2]),
+        [[1, 1, 2, 1], [0, 1, 0, 1]],
+    )
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from car_cost_calculator.fleet_costs import FleetCosts
+from car_cost_calculator.monte_carlo import (
+    RESULT_CATEGORIES,
+    Distribution,
+    Normal,
+    Triangular,
+    Uniform,
+    simulate,
+)
+
+UNCERTAIN = dict(
+    km_per_year=Uniform(5000, 30000),
+    initial_fuel_price=Triangular(1.2, 1.5, 2.2),
+    inflation=Uniform(0.0, 0.05),
+    depreciation_rate=Normal(0.15, 0.03),
+    initial_service_cost=Normal(400, 50),
+)
+
+
+def test_result_shapes():
+    result = simulate(samples=1000, years=4, percentiles=(10, 90), seed=1, **UNCERTAIN)
+    assert result.samples == 1000
+    for category in RESULT_CATEGORIES:
+        assert result.bands[category].shape == (2, 4)
+        assert result.mean[category].shape == (4,)
+        assert np.all(result.bands[category][0] <= result.bands[category][1])
+
+
+def test_reproducible():
+    first = simulate(samples=2000, years=3, seed=42, chunk_size=500, **UNCERTAIN)
+    second = simulate(samples=2000, years=3, seed=42, chunk_size=500, **UNCERTAIN)
+    for category in RESULT_CATEGORIES:
+        assert_allclose(first.bands[category], second.bands[category])
+
+
+def test_constant_parameters_give_point_estimate():
+    result = simulate(samples=100, years=5, seed=0, km_per_year=12000)
+    total = FleetCosts(years=5, km_per_year=12000).total_cost[0]
+    for band in result.bands["total"]:
+        assert_allclose(band, total, rtol=0.001)
+    assert_allclose(result.mean["total"], total)
+
+
+def test_percentiles_match_exact_values():
+    samples = 20000
+    result = simulate(
+        samples=samples,
+        years=3,
+        seed=7,
+        chunk_size=3000,
+        km_per_year=Uniform(5000, 30000),
+    )
+    # the same km samples, drawn from the parameter's own stream
+    generator = np.random.default_rng(np.random.SeedSequence(7).spawn(1)[0])
+    fleet = FleetCosts(years=3, km_per_year=generator.uniform(5000, 30000, samples))
+    expected = np.percentile(fleet.fuel_cost, result.percentiles, axis=0)
+    assert_allclose(result.bands["fuel"], expected, rtol=0.003)
+    assert_allclose(result.mean["fuel"], fleet.fuel_cost.mean(axis=0))
+
+
+def test_to_frame():
+    result = simulate(samples=500, years=2, percentiles=(50,), seed=3, **UNCERTAIN)
+    frame = result.to_frame()
+    assert list(frame.columns) == ["mean", "p50"]
+    assert len(frame) == len(RESULT_CATEGORIES) * 2
+    assert_allclose(frame.loc["fuel"].p50, result.bands["fuel"][0])
+
+
+def test_distribution_is_abstract():
+    with pytest.raises(TypeError):
+        Distribution()  # pylint: disable=E0110
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate
+from car_cost_calculator.energy_costs import EnergyModel, TimeOfUseTariff
+from car_cost_calculator.fleet_costs import FleetCosts
+from car_cost_calculator.optimizer import OwnershipComparison
+
+YEARLY_COST = [
+    [10.0, 10.0, 10.0, 10.0],
+    [4.0, 12.0, 12.0, 12.0],
+    [20.0, 5.0, 5.0, 5.0],
+]
+
+
+def test_cumulative_and_cheapest():
+    comparison = OwnershipComparison(YEARLY_COST, names=["a", "b", "c"])
+    assert_allclose(comparison.cumulative_cost[1], [4, 16, 28, 40])
+    # cumulative: a 10 20 30 40, b 4 16 28 40, c 20 25 30 35
+    assert list(comparison.cheapest) == [1, 1, 1, 2]
+    assert_allclose(comparison.cheapest_cost, [4, 16, 28, 35])
+
+
+def test_break_even():
+    comparison = OwnershipComparison(YEARLY_COST, km_per_year=[10000, 10000, 20000])
+    # c falls below a during the third year: 25 - 20 = 5 ahead, closing by 5 per year
+    assert_allclose(comparison.break_even(2, 0), 3.0)
+    assert_allclose(comparison.break_even(0, 2), 3.0)
+    # b starts 6 cheaper than a, and loses 2 per year: equal at the end of year 4
+    assert_allclose(comparison.break_even(1, 0), 4.0)
+    # c - b is 16, 9, 2, -5: crossing 2/7 of the way through year 4, in either order
+    assert_allclose(comparison.break_even([2, 1], [1, 2]), [3 + 2 / 7, 3 + 2 / 7])
+    assert_allclose(comparison.break_even_km(2, 0), 60000.0)
+
+
+def test_no_break_even():
+    comparison = OwnershipComparison([[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]])
+    assert np.isnan(comparison.break_even(0, 1))
+
+
+def test_optimal_replacement_year():
+    # falling depreciation against rising running costs gives a U-shaped average cost
+    comparison = OwnershipComparison([[10.0, 6.0, 4.0, 9.0, 12.0]])
+    assert_allclose(comparison.average_cost[0], [10, 8, 20 / 3, 29 / 4, 41 / 5])
+    assert comparison.optimal_replacement_year[0] == 3
+    assert_allclose(comparison.minimum_average_cost[0], 20 / 3)
+
+
+def test_from_car_costs():
+    candidates = [
+        CarCosts(initial_vehicle_value=20000, litres_per_100km=12.0, years=8),
+        CarCosts(
+            initial_vehicle_value=45000,
+            litres_per_100km=4.0,
+            depreciation_rate=FlatRate(0.2),
+            years=8,
+        ),
+    ]
+    comparison = OwnershipComparison.from_car_costs(candidates, names=["old", "new"])
+    for i, car in enumerate(candidates):
+        assert_allclose(comparison.yearly_cost[i], car.total_cost)
+    assert_allclose(comparison.km_per_year, 15000.0)
+    assert comparison.names == ["old", "new"]
+
+
+def test_from_car_costs_with_per_year_parameters():
+    candidates = [
+        CarCosts(years=4, km_per_year=[20000, 20000, 5000, 5000]),
+        CarCosts(years=4, km_per_year=12000, inflation=[0.05, 0.04, 0.03, 0.02]),
+    ]
+    comparison = OwnershipComparison.from_car_costs(candidates)
+    for i, car in enumerate(candidates):
+        assert_allclose(comparison.yearly_cost[i], car.total_cost)
+    assert_allclose(comparison.km_per_year, [12500, 12000])
+
+
+def test_from_car_costs_with_energy_models():
+    tariff = TimeOfUseTariff([0, 7, 22], [0.12, 0.35, 0.12])
+    candidates = [
+        CarCosts(years=5),
+        CarCosts(years=5, energy_model=EnergyModel()),
+        CarCosts(
+            years=5,
+            energy_model=EnergyModel(
+                kwh_per_100km=16, electric_share=0.6, home_price=tariff
+            ),
+        ),
+    ]
+    comparison = OwnershipComparison.from_car_costs(candidates)
+    for i, car in enumerate(candidates):
+        assert_allclose(comparison.yearly_cost[i], car.total_cost)
+
+
+def test_from_fleet_matches_per_horizon_runs():
+    fleet = FleetCosts(
+        initial_vehicle_value=[15000, 30000, 50000],
+        litres_per_100km=[11.0, 7.0, 3.0],
+        years=12,
+    )
+    comparison = OwnershipComparison.from_fleet(fleet)
+    for horizon in (1, 5, 12):
+        totals = FleetCosts(
+            initial_vehicle_value=[15000, 30000, 50000],
+            litres_per_100km=[11.0, 7.0, 3.0],
+            years=horizon,
+        ).total_cost.sum(axis=1)
+        assert comparison.cheapest[horizon - 1] == np.argmin(totals)
+        assert_allclose(comparison.cheapest_cost[horizon - 1], totals.min())
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import pandas as pd
+import pytest
+from numpy.testing import assert_allclose
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate
+from car_cost_calculator.fleet_costs import COST_CATEGORIES
+from car_cost_calculator.pipeline import read_fleet, run_pipeline
+
+FLEET = pd.DataFrame(
+    {
+        "rego": ["ABC123", "XYZ789", "CAR001", "VAN042", "UTE777"],
+        "initial_vehicle_value": [30000, 45000, 12000, 52000, 38000],
+        "initial_vehicle_age": [0, 2, 8, 1, 4],
+        "km_per_year": [12000, 18000, 9000, 60000, 25000],
+        "litres_per_100km": [6.5, 8.0, 9.5, 11.0, 10.2],
+        "depreciation_rate": [0.15, 0.12, 0.08, 0.2, 0.1],
+    }
+)
+
+
+def check_results(results, id_column, ids):
+    assert len(results) == len(FLEET) * 3
+    assert list(results.columns) == [id_column, "year"] + list(COST_CATEGORIES)
+    for i, row in FLEET.iterrows():
+        expected = CarCosts(
+            years=3,
+            inflation=0.03,
+            initial_vehicle_value=row.initial_vehicle_value,
+            initial_vehicle_age=row.initial_vehicle_age,
+            km_per_year=row.km_per_year,
+            litres_per_100km=row.litres_per_100km,
+            depreciation_rate=FlatRate(row.depreciation_rate),
+        ).yearly_costs
+        actual = results[results[id_column] == ids[i]]
+        assert_allclose(actual[list(COST_CATEGORIES)], expected, atol=1e-6)
+
+
+def test_csv_pipeline(tmp_path):
+    source = tmp_path / "fleet.csv"
+    destination = tmp_path / "costs.csv"
+    FLEET.to_csv(source, index=False)
+    count = run_pipeline(source, destination, years=3, chunksize=2, inflation=0.03)
+    assert count == len(FLEET)
+    check_results(pd.read_csv(destination), "vehicle", list(range(len(FLEET))))
+
+
+def test_id_column(tmp_path):
+    source = tmp_path / "fleet.csv"
+    destination = tmp_path / "costs.csv"
+    FLEET.to_csv(source, index=False)
+    run_pipeline(
+        source, destination, years=3, chunksize=3, id_column="rego", inflation=0.03
+    )
+    check_results(pd.read_csv(destination), "rego", list(FLEET.rego))
+
+
+def test_read_fleet_chunks(tmp_path):
+    source = tmp_path / "fleet.csv"
+    FLEET.to_csv(source, index=False)
+    assert [len(chunk) for chunk in read_fleet(source, chunksize=2)] == [2, 2, 1]
+
+
+def test_parquet_pipeline(tmp_path):
+    pytest.importorskip("pyarrow")
+    source = tmp_path / "fleet.parquet"
+    destination = tmp_path / "costs.parquet"
+    FLEET.to_parquet(source, index=False)
+    run_pipeline(source, destination, years=3, chunksize=2, inflation=0.03)
+    check_results(pd.read_parquet(destination), "vehicle", list(range(len(FLEET))))
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import json
+from car_cost_calculator import profiling
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.fleet_costs import FleetCosts
+from car_cost_calculator.profiling import Profiler, profiled, stage
+from car_cost_calculator.sweep import sweep
+
+
+def test_disabled_by_default():
+    assert not profiling.enabled()
+    assert profiling.current() is None
+    with stage("unused") as unused:
+        pass
+    assert unused is stage("another")
+
+
+def test_car_costs_stages():
+    with Profiler() as profiler:
+        assert profiling.current() is profiler
+        CarCosts(years=7).yearly_costs  # pylint: disable=W0104
+    assert not profiling.enabled()
+    stages = profiler.to_dict()["stages"]
+    for name in (
+        "car_costs.yearly_costs",
+        "car_costs.running_costs",
+        "car_costs.standing_costs",
+        "running_costs.depreciation",
+        "running_costs.fuel",
+        "running_costs.tyres",
+        "running_costs.service",
+        "standing_costs.insurance",
+        "standing_costs.detailing",
+    ):
+        assert stages[name]["calls"] == 1, name
+    assert stages["running_costs.fuel"]["elements"] == 7
+    assert stages["running_costs.depreciation"]["elements"] == 14
+    # stage times include nested stages
+    assert (
+        stages["car_costs.yearly_costs"]["seconds"]
+        >= stages["running_costs.fuel"]["seconds"]
+    )
+
+
+def test_fleet_costs_stages():
+    with Profiler() as profiler:
+        FleetCosts(km_per_year=[1000, 2000, 3000], years=4)
+    stages = profiler.to_dict()["stages"]
+    assert stages["fleet_costs.fuel"]["elements"] == 12
+    assert stages["fleet_costs.standing"]["calls"] == 1
+
+
+def test_decorator_statistics():
+    @profiled("test.square")
+    def square(x):
+        return x * x
+
+    assert square(3) == 9
+    with Profiler() as profiler:
+        for i in range(5):
+            square(i)
+    stats = profiler.to_dict()["stages"]["test.square"]
+    assert stats["calls"] == 5
+    assert stats["min_seconds"] <= stats["mean_seconds"] <= stats["max_seconds"]
+    assert len(profiler.events) == 5
+
+
+def test_nested_profilers_record_innermost():
+    with Profiler() as outer:
+        with Profiler() as inner:
+            with stage("inner"):
+                pass
+        with stage("outer"):
+            pass
+    assert list(inner.stats) == ["inner"]
+    assert list(outer.stats) == ["outer"]
+
+
+def test_exports(tmp_path):
+    with Profiler() as profiler:
+        CarCosts(years=3).total_cost  # pylint: disable=W0104
+    summary = json.loads(profiler.to_json(tmp_path / "summary.json"))
+    assert summary["processes"] == 1
+    assert json.loads((tmp_path / "summary.json").read_text()) == summary
+
+    profiler.write_chrome_trace(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    events = trace["traceEvents"]
+    assert len(events) == len(profiler.events)
+    assert {event["ph"] for event in events} == {"X"}
+    assert min(event["ts"] for event in events) == 0
+
+
+def test_max_events():
+    with Profiler(max_events=2) as profiler:
+        for _ in range(5):
+            with stage("repeated"):
+                pass
+    assert len(profiler.events) == 2
+    assert profiler.stats["repeated"][0] == 5
+
+
+def test_merges_worker_statistics():
+    with Profiler() as profiler:
+        sweep(
+            {"km_per_year": range(1000, 9000, 1000)}, years=3, workers=2, chunk_size=3
+        )
+    stages = profiler.to_dict()["stages"]
+    assert stages["sweep.task"]["calls"] == 3
+    assert stages["fleet_costs.fuel"]["elements"] == 8 * 3
+    assert profiler.to_dict()["processes"] >= 2
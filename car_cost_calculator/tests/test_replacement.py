@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import itertools
+import numpy as np
+from numpy.testing import assert_allclose
+from car_cost_calculator.depreciation import FlatRate, TwoStageRate, calculate
+from car_cost_calculator.replacement import cost_tables, solve
+
+
+def schedule_cost(schedule, age, price, value, operating, discount_rate=0.0):
+    """Cost of following a replacement schedule, calculated year by year"""
+    total = 0.0
+    for year, replaced in enumerate(schedule):
+        factor = (1 + discount_rate) ** -year
+        if replaced:
+            total += factor * (price - value[age])
+            age = 0
+        total += factor * operating[age]
+        age += 1
+    return total - (1 + discount_rate) ** -len(schedule) * value[age]
+
+
+def brute_force(age, horizon, max_age, price, value, operating, discount_rate=0.0):
+    best = np.inf
+    for schedule in itertools.product([False, True], repeat=horizon):
+        ages = age
+        feasible = True
+        for replaced in schedule:
+            ages = 1 if replaced else ages + 1
+            feasible &= ages <= max_age
+        if feasible:
+            best = min(
+                best,
+                schedule_cost(schedule, age, price, value, operating, discount_rate),
+            )
+    return best
+
+
+def test_matches_brute_force():
+    max_age, horizon = 6, 8
+    price = np.array([30000.0, 50000.0])
+    value = np.stack(
+        [
+            calculate(30000.0, max_age + 1, rate=FlatRate(0.2))[0],
+            calculate(50000.0, max_age + 1, rate=TwoStageRate(0.25, 0.1, 2))[0],
+        ]
+    )
+    operating = np.stack(
+        [3000 * 1.3 ** np.arange(max_age + 1), 2000 * 1.1 ** np.arange(max_age + 1)]
+    )
+    policy = solve(price, value, operating, horizon, discount_rate=0.05)
+    assert policy.replace.shape == (horizon, 2, max_age + 1)
+    for group in range(2):
+        for age in range(max_age + 1):
+            expected = brute_force(
+                age,
+                horizon,
+                max_age,
+                price[group],
+                value[group],
+                operating[group],
+                0.05,
+            )
+            assert_allclose(policy.cost[group, age], expected)
+            schedule = policy.schedule(age, group)[0]
+            assert_allclose(
+                schedule_cost(
+                    schedule, age, price[group], value[group], operating[group], 0.05
+                ),
+                expected,
+            )
+
+
+def test_max_age_forces_replacement():
+    # with no running costs and no depreciation, keeping is free until max_age
+    policy = solve(10000.0, np.full((1, 4), 10000.0), np.zeros((1, 4)), horizon=5)
+    assert list(policy.schedule(3)[0]) == [True, False, False, True, False]
+    assert list(policy.first_replacement([0, 2, 3])) == [3, 1, 0]
+
+
+def test_vectorized_schedule_matches_single():
+    price, value, operating = cost_tables(
+        max_age=12,
+        initial_vehicle_value=[25000, 60000],
+        depreciation_rate=[FlatRate(0.15), TwoStageRate()],
+        age_cost_growth=[0.12, 0.06],
+    )
+    policy = solve(price, value, operating, horizon=15)
+    ages = np.arange(13).repeat(2)
+    groups = np.tile([0, 1], 13)
+    schedules = policy.schedule(ages, groups)
+    for i, (age, group) in enumerate(zip(ages, groups)):
+        assert (schedules[i] == policy.schedule(age, group)[0]).all()
+
+
+def test_cost_tables():
+    price, value, operating = cost_tables(
+        max_age=5, initial_vehicle_value=20000, inflation=0.1, age_cost_growth=0.1
+    )
+    assert_allclose(price, [20000])
+    assert_allclose(value[0], calculate(20000, 6)[0])
+    # costs are in real terms, rising only with age
+    assert_allclose(operating[0, 1:] / operating[0, :-1], 1.1)
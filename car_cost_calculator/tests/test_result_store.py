@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.fleet_costs import COST_CATEGORIES, FleetCosts
+from car_cost_calculator.result_store import ResultStore, ScenarioView
+from car_cost_calculator.sweep import sweep
+
+KM_PER_YEAR = [8000.0, 15000.0, 40000.0]
+
+
+@pytest.fixture(name="store")
+def store_fixture():
+    return ResultStore.from_results(FleetCosts(km_per_year=KM_PER_YEAR, years=6))
+
+
+def test_views_match_car_costs(store):
+    assert len(store) == 3
+    assert store.costs.shape == (3, 6, len(COST_CATEGORIES))
+    for view, km in zip(store, KM_PER_YEAR):
+        car_costs = CarCosts(km_per_year=km, years=6)
+        assert_allclose(view.yearly_costs, car_costs.yearly_costs, atol=1e-6)
+        assert list(view.yearly_costs.columns) == list(COST_CATEGORIES)
+        assert_allclose(view.depreciated_value, car_costs.depreciated_value)
+        assert_allclose(view.total_cost, car_costs.total_cost)
+        assert view.parameters["km_per_year"] == km
+
+
+def test_views_are_slotted(store):
+    view = store[-1]
+    assert view.index == 2
+    assert not hasattr(view, "__dict__")
+    with pytest.raises(IndexError):
+        store[3]  # pylint: disable=W0104
+    assert isinstance(store[0], ScenarioView)
+
+
+def test_category_and_total(store):
+    assert_allclose(store.category("fuel")[1], store[1].yearly_costs.fuel)
+    assert_allclose(store.total_cost, [view.total_cost for view in store])
+
+
+def test_save_and_load(store, tmp_path):
+    store.save(tmp_path / "store")
+    loaded = ResultStore.load(tmp_path / "store")
+    assert isinstance(loaded.costs, np.memmap)
+    assert_allclose(loaded.costs, store.costs)
+    assert_allclose(loaded.depreciated_value, store.depreciated_value)
+    assert_allclose(loaded[2].total_cost, store[2].total_cost)
+    assert loaded[0].parameters == store[0].parameters
+
+    in_memory = ResultStore.load(tmp_path / "store", mmap_mode=None)
+    assert not isinstance(in_memory.costs, np.memmap)
+
+
+def test_from_sweep_without_parameters(tmp_path):
+    result = sweep({"litres_per_100km": [5.0, 10.0]}, years=3, workers=1)
+    store = ResultStore.from_results(result, dtype=np.float32)
+    assert store.costs.dtype == np.float32
+    assert_allclose(store.total_cost, result.total_cost, rtol=1e-6)
+
+    bare = ResultStore(store.costs, store.depreciated_value)
+    bare.save(tmp_path / "bare")
+    assert ResultStore.load(tmp_path / "bare")[1].parameters == {}
+
+
+def test_sub_yearly_results_are_rolled_up(store):
+    fleet = FleetCosts(km_per_year=KM_PER_YEAR, years=6, steps_per_year="monthly")
+    monthly = ResultStore.from_results(fleet)
+    assert monthly.costs.shape == store.costs.shape
+    assert_allclose(monthly.total_cost.sum(axis=1), fleet.total_cost.sum(axis=1))
+    assert_allclose(monthly.depreciated_value, store.depreciated_value)
+
+
+def test_only_varying_parameters_are_stored(store):
+    assert store.parameters.dtype.names == ("km_per_year",)
+
+
+def test_load_checks_format_version(store, tmp_path):
+    path = tmp_path / "store"
+    store.save(path)
+    (path / "header.json").unlink()
+    with pytest.raises(ValueError, match="format version 1"):
+        ResultStore.load(path)
@@ -165,3 +165,37 @@ def test_total_cost():
         6292.717,
     ]
     assert_allclose(actual.total_cost, expected, atol=0.001)
+
+
+def test_input_change_invalidates_costs():
+    actual = RunningCosts(years=3, inflation=0.0, km_per_year=10000.0)
+    assert_allclose(actual.tyre_cost, [0, 1200, 1200])
+    actual.tyre_replacement_interval = 10000
+    assert_allclose(actual.tyre_cost, [1200, 1200, 1200])
+    assert_allclose(actual.cumulative_distance, [10000, 20000, 30000])
+
+
+def test_yearly_usage_and_prices():
+    actual = RunningCosts(
+        years=4,
+        km_per_year=[20000, 20000, 5000, 5000],
+        litres_per_100km=[8.0, 8.0, 8.0, 10.0],
+        inflation=[0.1, 0.0, 0.0, 0.0],
+        initial_fuel_price=[1.0, 1.0, 2.0, 2.0],
+        tyre_replacement_interval=15000,
+        initial_cost_per_tyre=100,
+        service_interval_km=10000,
+        initial_service_cost=100,
+    )
+    assert_allclose(actual.price_index, [1.0, 1.1, 1.1, 1.1])
+    assert_allclose(actual.cumulative_distance, [20000, 40000, 45000, 50000])
+    assert_allclose(actual.fuel_cost, [1600, 1760, 880, 1100])
+    assert_allclose(actual.tyre_cost, [400, 440, 440, 0])
+    assert_allclose(actual.service_cost, [200, 220, 0, 110])
+
+
+def test_constant_paths_match_scalars():
+    scalar = RunningCosts(years=5, km_per_year=12000, inflation=0.03)
+    path = RunningCosts(years=5, km_per_year=[12000] * 5, inflation=[0.03] * 5)
+    for name in ("cumulative_distance", "fuel_cost", "tyre_cost", "service_cost"):
+        assert_allclose(getattr(path, name), getattr(scalar, name))
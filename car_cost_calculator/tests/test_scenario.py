@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import pytest
+from numpy.testing import assert_allclose
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import TwoStageRate
+from car_cost_calculator.scenario import Scenario
+
+PARAMS = dict(
+    initial_vehicle_value=50000,
+    depreciation_rate=TwoStageRate(stage_1_rate=0.15, stage_2_rate=0.1, breakpoint=3),
+    km_per_year=15000,
+    litres_per_100km=9.0,
+    initial_service_cost=300,
+    service_interval_years=0.5,
+    service_interval_km=20000,
+    tyre_replacement_interval=40000,
+)
+
+
+def assert_matches_car_costs(scenario, **params):
+    expected = CarCosts(**params)
+    assert_allclose(scenario.yearly_costs, expected.yearly_costs)
+    assert list(scenario.yearly_costs.columns) == list(expected.yearly_costs.columns)
+    assert_allclose(scenario.depreciated_value, expected.depreciated_value)
+
+
+def test_matches_car_costs():
+    assert_matches_car_costs(Scenario(**PARAMS), **PARAMS)
+
+
+def test_update_recalculates_only_affected_series():
+    scenario = Scenario(**PARAMS)
+    assert scenario.update(litres_per_100km=6.0) == ("fuel",)
+    assert scenario.update(insurance_per_year=900) == ("insurance",)
+    assert set(scenario.update(km_per_year=30000)) == {
+        "cumulative_distance",
+        "fuel",
+        "tyres",
+        "service",
+    }
+    assert_matches_car_costs(
+        scenario,
+        **dict(PARAMS, litres_per_100km=6.0, insurance_per_year=900, km_per_year=30000)
+    )
+
+
+def test_yearly_costs_is_patched_in_place():
+    scenario = Scenario(**PARAMS)
+    frame = scenario.yearly_costs
+    scenario.litres_per_100km = 4.5
+    assert scenario.yearly_costs is frame
+    assert_allclose(
+        frame.fuel, CarCosts(**dict(PARAMS, litres_per_100km=4.5)).yearly_costs.fuel
+    )
+
+
+def test_inflation_change():
+    scenario = Scenario(**PARAMS)
+    scenario.update(inflation=0.05, depreciation_rate=TwoStageRate(0.3, 0.05, 2))
+    assert_matches_car_costs(
+        scenario,
+        **dict(PARAMS, inflation=0.05, depreciation_rate=TwoStageRate(0.3, 0.05, 2))
+    )
+
+
+def test_years_change():
+    scenario = Scenario(**PARAMS)
+    scenario.years = 4
+    assert len(scenario.yearly_costs) == 4
+    assert_matches_car_costs(scenario, **dict(PARAMS, years=4))
+    assert_allclose(scenario.total_cost, scenario.yearly_costs.sum(axis=1))
+
+
+def test_inputs_are_attributes():
+    scenario = Scenario(km_per_year=1234)
+    assert scenario.km_per_year == 1234
+    try:
+        scenario.update(not_an_input=1)
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_yearly_paths_match_car_costs():
+    params = dict(
+        PARAMS,
+        years=4,
+        km_per_year=[20000, 20000, 5000, 5000],
+        inflation=[0.05, 0.03, 0.02, 0.02],
+        initial_fuel_price=[1.5, 1.6, 1.8, 1.7],
+    )
+    assert_matches_car_costs(Scenario(**params), **params)
+
+
+def test_loan_change():
+    scenario = Scenario(**PARAMS)
+    assert scenario.update(loan_amount=25000, loan_balloon=5000) == ("financing",)
+    assert scenario.yearly_costs.financing.sum() > 0
+    assert_matches_car_costs(
+        scenario, **dict(PARAMS, loan_amount=25000, loan_balloon=5000)
+    )
+
+
+def test_update_with_unknown_name_changes_nothing():
+    scenario = Scenario(**PARAMS)
+    with pytest.raises(AttributeError):
+        scenario.update(litres_per_100km=5, bogus=1)
+    assert scenario.litres_per_100km == PARAMS["litres_per_100km"]
+    assert_matches_car_costs(scenario, **PARAMS)
+
+
+def test_inflation_is_checked():
+    with pytest.raises(AssertionError):
+        Scenario(**dict(PARAMS, inflation=-0.01))
+    scenario = Scenario(**PARAMS)
+    with pytest.raises(AssertionError):
+        scenario.update(litres_per_100km=5, inflation=1.5)
+    assert scenario.inflation == 0.02
+    assert_matches_car_costs(scenario, **PARAMS)
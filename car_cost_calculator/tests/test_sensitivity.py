@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+import pytest
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate
+from car_cost_calculator.fleet_costs import SCENARIO_PARAMETERS
+from car_cost_calculator.monte_carlo import RESULT_CATEGORIES
+from car_cost_calculator.sensitivity import derivatives, morris, sobol
+
+TOTAL = RESULT_CATEGORIES.index("total")
+FUEL = RESULT_CATEGORIES.index("fuel")
+TYRES = RESULT_CATEGORIES.index("tyres")
+SERVICE = RESULT_CATEGORIES.index("service")
+
+
+def test_derivatives_match_analytic():
+    result = derivatives(years=5, inflation=0.03, depreciation_rate=0.2)
+    assert result.parameters == SCENARIO_PARAMETERS + ("depreciation_rate",)
+    derivative = result["derivative"]
+    price_index = 1.03 ** np.arange(5)
+    insurance = result.parameters.index("insurance_per_year")
+    assert_allclose(derivative[insurance, TOTAL], price_index.sum(), rtol=1e-6)
+    fuel_price = result.parameters.index("initial_fuel_price")
+    assert_allclose(
+        derivative[fuel_price, FUEL], (price_index * 15000 * 10 / 100).sum(), rtol=1e-6
+    )
+    # fuel cost is proportional to consumption
+    litres = result.parameters.index("litres_per_100km")
+    assert_allclose(result["elasticity"][litres, FUEL], 1.0, rtol=1e-6)
+
+
+def test_event_costs_are_differentiated_smoothly():
+    # the default distance is a whole number of tyre and service intervals, so whole
+    # event counts would jump by one event per year either side of it
+    result = derivatives(
+        ["km_per_year", "tyre_replacement_interval"],
+        years=5,
+        inflation=0.0,
+        service_interval_years=2.0,
+    )
+    elasticity = result["elasticity"]
+    # tyre and service costs are proportional to distance over the interval
+    assert_allclose(elasticity[0, [FUEL, TYRES, SERVICE]], 1.0, rtol=1e-6)
+    assert_allclose(elasticity[1, TYRES], -1.0, rtol=1e-4)
+    distance_costs = result.base[[FUEL, TYRES, SERVICE]].sum()
+    assert_allclose(
+        elasticity[0, TOTAL], distance_costs / result.base[TOTAL], rtol=1e-6
+    )
+
+
+def test_fixed_numeric_depreciation_rate():
+    result = derivatives(["insurance_per_year"], years=4, depreciation_rate=0.2)
+    expected = CarCosts(years=4, depreciation_rate=FlatRate(0.2)).total_cost.sum()
+    assert_allclose(result.base[TOTAL], expected)
+    ranges = {"insurance_per_year": (0, 1000)}
+    morris(ranges, trajectories=2, seed=0, years=4, depreciation_rate=0.2)
+    sobol(ranges, samples=8, seed=0, years=4, depreciation_rate=0.2)
+
+
+def test_rejects_per_year_point():
+    with pytest.raises(ValueError, match="km_per_year"):
+        derivatives(["km_per_year"], years=3, km_per_year=[10000, 12000, 14000])
+
+
+def test_base_matches_car_costs():
+    car_costs = CarCosts(years=6, km_per_year=22000, depreciation_rate=FlatRate(0.15))
+    result = derivatives(years=6, km_per_year=22000, depreciation_rate=0.15)
+    assert_allclose(result.base[TOTAL], car_costs.total_cost.sum())
+
+
+def test_derivative_at_zero_is_one_sided():
+    result = derivatives(["inflation"], years=3, inflation=0.0)
+    assert result["derivative"][0, TOTAL] > 0
+
+
+def test_ranking():
+    result = derivatives(
+        ["detailing_per_year", "insurance_per_year", "litres_per_100km"], years=5
+    )
+    # one litre per 100km costs more than a dollar per year of insurance or detailing
+    assert result.ranking("derivative")[0] == "litres_per_100km"
+    assert result.to_frame().shape == (3 * len(RESULT_CATEGORIES), 2)
+
+
+def test_morris_linear_effects():
+    ranges = {"insurance_per_year": (0, 1000), "detailing_per_year": (0, 500)}
+    result = morris(ranges, trajectories=10, seed=1, years=4, inflation=0.0)
+    assert_allclose(result["mu_star"][:, TOTAL], [4000, 2000])
+    assert_allclose(result["mu"][:, TOTAL], [4000, 2000])
+    assert_allclose(result["sigma"][:, TOTAL], 0, atol=1e-6)
+
+
+def test_morris_reproducible():
+    ranges = {"km_per_year": (5000, 40000), "depreciation_rate": (0.05, 0.3)}
+    first = morris(ranges, seed=3, years=5)
+    second = morris(ranges, seed=3, years=5)
+    assert_allclose(first["mu_star"], second["mu_star"])
+
+
+def test_sobol_additive_model():
+    ranges = {"insurance_per_year": (0, 1000), "detailing_per_year": (0, 500)}
+    result = sobol(ranges, samples=4096, seed=2, years=4, inflation=0.0)
+    # variance shares are 1000^2 : 500^2
+    assert_allclose(result["first_order"][:, TOTAL], [0.8, 0.2], atol=0.05)
+    assert_allclose(result["total_order"][:, TOTAL], [0.8, 0.2], atol=0.05)
+    # fuel does not vary at all
+    assert_allclose(result["first_order"][:, FUEL], 0.0)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import asyncio
+import json
+import numpy as np
+import pytest
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate
+from car_cost_calculator.fleet_costs import COST_CATEGORIES
+from car_cost_calculator.service import (
+    QuoteServer,
+    QuoteService,
+    ServiceOverloaded,
+    evaluate_quotes,
+)
+
+
+def test_evaluate_quotes_matches_car_costs():
+    quotes = [
+        {"km_per_year": 20000, "depreciation_rate": 0.2},
+        {"inflation": 0.05, "years": 4},
+        {"initial_vehicle_value": 25000, "depreciation_rate": FlatRate(0.15)},
+        {},
+    ]
+    results = evaluate_quotes(quotes, years=6)
+    expected = [
+        CarCosts(km_per_year=20000, depreciation_rate=FlatRate(0.2), years=6),
+        CarCosts(inflation=0.05, years=4),
+        CarCosts(
+            initial_vehicle_value=25000, depreciation_rate=FlatRate(0.15), years=6
+        ),
+        CarCosts(years=6),
+    ]
+    for result, car in zip(results, expected):
+        yearly = car.yearly_costs
+        assert result["years"] == len(yearly)
+        for category in COST_CATEGORIES:
+            np.testing.assert_allclose(
+                result["yearly_costs"][category], yearly[category]
+            )
+        np.testing.assert_allclose(result["total_cost"], car.total_cost)
+        assert result["total"] == pytest.approx(car.total_cost.sum())
+
+
+def test_concurrent_quotes_are_batched():
+    async def run():
+        async with QuoteService(max_wait=0.05) as service:
+            results = await asyncio.gather(
+                *(service.quote(km_per_year=1000.0 * (i + 1)) for i in range(20))
+            )
+        return results, service.stats.to_dict()
+
+    results, stats = asyncio.run(run())
+    assert stats["requests"] == 20
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 20
+    expected = evaluate_quotes([{"km_per_year": 1000.0 * (i + 1)} for i in range(20)])
+    assert results == expected
+
+
+def test_max_batch_size():
+    async def run():
+        async with QuoteService(max_batch_size=4, max_wait=0.05) as service:
+            await asyncio.gather(*(service.quote(years=3) for _ in range(10)))
+        return service.stats.to_dict()
+
+    stats = asyncio.run(run())
+    assert stats["requests"] == 10
+    assert stats["max_batch_size"] == 4
+    assert stats["batches"] == 3
+    assert stats["mean_batch_size"] == pytest.approx(10 / 3)
+    assert stats["max_latency"] >= stats["mean_latency"] > 0
+
+
+def test_backpressure():
+    async def run():
+        async with QuoteService(max_pending=2) as service:
+            results = await asyncio.gather(
+                *(service.quote(block=False) for _ in range(5)), return_exceptions=True
+            )
+        return results, service.stats.to_dict()
+
+    results, stats = asyncio.run(run())
+    rejected = [result for result in results if isinstance(result, ServiceOverloaded)]
+    assert len(rejected) == 3
+    assert stats["rejected"] == 3
+    assert stats["requests"] == 2
+
+
+def test_invalid_quotes():
+    async def run():
+        async with QuoteService() as service:
+            with pytest.raises(ValueError):
+                await service.quote(wheels=5)
+            with pytest.raises(ValueError):
+                await service.quote(km_per_year="far")
+            with pytest.raises(ValueError):
+                await service.quote(years=0)
+            for invalid in (
+                {"inflation": 2},
+                {"km_per_year": -5},
+                {"service_interval_km": 0},
+                {"depreciation_rate": 1.5},
+                {"insurance_per_year": float("nan")},
+                {"loan_amount": 1000, "loan_balloon": 2000},
+            ):
+                with pytest.raises(ValueError):
+                    await service.quote(**invalid)
+            return await service.quote(inflation=0.0)
+
+    assert asyncio.run(run())["years"] == 10
+    with pytest.raises(RuntimeError):
+        asyncio.run(QuoteService().quote())
+
+
+def _failing_rate(year):
+    raise ZeroDivisionError(year)
+
+
+def test_failed_quote_does_not_fail_batch():
+    async def run():
+        async with QuoteService(max_wait=0.05) as service:
+            return await asyncio.gather(
+                service.quote(depreciation_rate=_failing_rate),
+                service.quote(inflation=0.03),
+                return_exceptions=True,
+            )
+
+    failed, quote = asyncio.run(run())
+    assert isinstance(failed, ZeroDivisionError)
+    assert quote["total"] > 0
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else payload.encode()
+    writer.write(
+        "{} {} HTTP/1.1\r\nContent-Length: {}\r\nConnection: close\r\n\r\n".format(
+            method, path, len(body)
+        ).encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_http_server():
+    async def run():
+        async with QuoteService(max_wait=0.01) as service:
+            async with QuoteServer(service, port=0) as server:
+                port = server.port
+                return await asyncio.gather(
+                    _request(port, "POST", "/quote", '{"km_per_year": 20000}'),
+                    _request(port, "POST", "/quote", '[{"years": 2}, {"years": 3}]'),
+                    _request(port, "POST", "/quote", "not json"),
+                    _request(port, "POST", "/quote", '{"colour": "red"}'),
+                    _request(port, "GET", "/quote"),
+                    _request(port, "GET", "/missing"),
+                    _request(port, "POST", "/quote", '{"inflation": 2}'),
+                    _request(port, "POST", "/quote", '{"service_interval_km": 0}'),
+                    _request(port, "POST", "/quote", '{"km_per_year": -5}'),
+                    _request(port, "POST", "/quote", '{"km_per_year": NaN}'),
+                ), await _request(port, "GET", "/stats")
+
+    responses, (stats_status, stats) = asyncio.run(run())
+    (status, quote), (_, quotes) = responses[:2]
+    assert status == 200
+    assert quote["total"] == pytest.approx(CarCosts(km_per_year=20000).total_cost.sum())
+    assert [len(item["total_cost"]) for item in quotes] == [2, 3]
+    assert [status for status, _ in responses[2:]] == [400, 400, 405, 404] + [400] * 4
+    assert stats_status == 200
+    assert stats["requests"] == 3
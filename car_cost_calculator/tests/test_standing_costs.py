@@ -63,3 +63,10 @@ def test_standing_costs_rego_10_years():
         ]
     )
     assert_allclose(expected, actual.registration_cost, atol=0.001)
+
+
+def test_yearly_inflation():
+    sc = StandingCosts(years=3, inflation=[0.1, 0.5, 0.0], insurance_per_year=100)
+    assert_allclose(sc.price_index, [1.0, 1.1, 1.65])
+    assert_allclose(sc.insurance_cost, [100.0, 110.0, 165.0])
+    assert_allclose(sc.detailing_cost, sc.price_index * 120)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0103, C0111
+
+import numpy as np
+from numpy.testing import assert_allclose
+from car_cost_calculator.car_costs import CarCosts
+from car_cost_calculator.depreciation import FlatRate, TwoStageRate
+from car_cost_calculator.fleet_costs import COST_CATEGORIES, FleetCosts
+from car_cost_calculator.sweep import evaluate, sweep
+
+RATES = [FlatRate(0.12), TwoStageRate(0.2, 0.1, 3)]
+GRID = {
+    "initial_vehicle_value": [20000, 45000],
+    "initial_vehicle_age": [0, 4],
+    "km_per_year": [8000, 15000, 40000],
+    "depreciation_rate": RATES,
+}
+
+
+def assert_matches_car_costs(result, scenario, car_costs):
+    for category in COST_CATEGORIES:
+        assert_allclose(
+            result.costs[category][scenario],
+            car_costs.yearly_costs[category],
+            atol=1e-6,
+        )
+    assert_allclose(
+        result.depreciated_value[scenario], car_costs.depreciated_value, atol=1e-6
+    )
+
+
+def check_grid(result):
+    assert result.scenarios == 24
+    assert result.years == 5
+    for scenario in range(result.scenarios):
+        params = {
+            name: result.parameters[name][scenario]
+            for name in ("initial_vehicle_value", "initial_vehicle_age", "km_per_year")
+        }
+        rate = RATES[result.parameters["depreciation_rate"][scenario]]
+        car_costs = CarCosts(
+            years=5, depreciation_rate=rate, litres_per_100km=7.5, **params
+        )
+        assert_matches_car_costs(result, scenario, car_costs)
+
+
+def test_sweep_in_process():
+    check_grid(sweep(GRID, years=5, workers=1, chunk_size=5, litres_per_100km=7.5))
+
+
+def test_sweep_process_pool():
+    check_grid(sweep(GRID, years=5, workers=2, chunk_size=7, litres_per_100km=7.5))
+
+
+def test_sweep_row_major_order():
+    result = sweep({"km_per_year": [1, 2], "litres_per_100km": [5, 6, 7]}, workers=1)
+    assert_allclose(result.parameters["km_per_year"], [1, 1, 1, 2, 2, 2])
+    assert_allclose(result.parameters["litres_per_100km"], [5, 6, 7, 5, 6, 7])
+
+
+def test_evaluate_table():
+    table = {"km_per_year": np.array([5000, 12000, 30000]), "other": [1, 2, 3]}
+    result = evaluate(table, years=4, workers=2, chunk_size=2, inflation=0.03)
+    assert sorted(result.parameters) == ["km_per_year"]
+    for scenario, km in enumerate(table["km_per_year"]):
+        car_costs = CarCosts(years=4, km_per_year=km, inflation=0.03)
+        assert_matches_car_costs(result, scenario, car_costs)
+    assert_allclose(
+        result.total_cost,
+        [
+            CarCosts(years=4, km_per_year=km, inflation=0.03).total_cost
+            for km in table["km_per_year"]
+        ],
+    )
+
+
+def test_sweep_with_time_steps():
+    result = sweep(
+        {"km_per_year": [5000, 12000, 30000]},
+        years=3,
+        workers=1,
+        chunk_size=2,
+        steps_per_year="monthly",
+    )
+    fleet = FleetCosts(km_per_year=[5000, 12000, 30000], years=3, steps_per_year=12)
+    assert result.years == 3
+    for category, cost in fleet.rollup().items():
+        assert_allclose(result.costs[category], cost)
+    yearly = FleetCosts(km_per_year=[5000, 12000, 30000], years=3)
+    assert_allclose(result.depreciated_value, yearly.depreciated_value)
@@ -22,12 +22,18 @@ setup(
     author="DC23",
     author_email="jugglindan@gmail.com",
     license="MIT",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     include_package_data=True,
     platforms="any",
     install_requires=["numpy", "pandas"],
+    entry_points={
+        "console_scripts": [
+            "car-cost=car_cost_calculator.cli:main",
+            "car-cost-service=car_cost_calculator.service:main",
+        ]
+    },
     extras_require={
-        "dev": ["bumpversion", "check-manifest", "pylint", "wheel", "yapf"],
+        "dev": ["black", "bumpversion", "check-manifest", "pylint", "wheel", "yapf"],
         "test": ["pytest", "pytest-sugar"],
     },
 )